@@ -0,0 +1,260 @@
+"""
+오프라인 벤치마크
+픽스처 서버를 띄운 뒤 각 백엔드(ktx / srt / srt2)를 그대로 실행해서
+영수증당 저장 지연(p50/p90/p99), 분당 처리량, 최대 메모리(RSS)를 측정합니다.
+
+실제 로그인/네트워크 없이 같은 DOM 구조를 재현하므로 변경 전후 성능을 반복해서 비교할 수 있습니다.
+브라우저 백엔드(pywebview / Chrome)는 각 도구의 requirements.txt가 설치되어 있어야 합니다.
+
+사용 예:
+    python bench.py --backend ktx --receipts 40
+    python bench.py --backend srt2 --receipts 40 --latency-ms 100 --json result.json
+    python bench.py --backend srt --fast-enumerate   # SRT HTTP 목록 조회(FAST_ENUMERATE) 경로 측정
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixture_server import start_server
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".pdf")
+
+# Selenium SRT: same calls as the launcher (search range included), minus the PyQt UI
+SRT_SNIPPET = """
+import sys
+from config import Config
+Config.USE_LEDGER = False
+Config.FAST_ENUMERATE = sys.argv[4] == "1"
+from srt_manager import SRTManager
+manager = SRTManager()
+try:
+    if manager.wait_for_login():
+        manager.goto_receipt_page()
+        manager.capture_with_checkbox(start_date=sys.argv[1], end_date=sys.argv[2], save_dir=sys.argv[3])
+finally:
+    manager.close()
+"""
+
+# nodriver SRT v2: same flow as main.run_automation, minus the PyQt UI
+SRT2_SNIPPET = """
+import asyncio, sys
+from config import Config
+Config.USE_LEDGER = False
+from srt_manager import SRTManager
+
+async def run(start_date, end_date, save_dir):
+    manager = SRTManager()
+    try:
+        if await manager.wait_for_login():
+            await manager.set_date_range(start_date, end_date)
+            await manager.click_search_button()
+            await manager.capture_receipts(save_dir)
+    finally:
+        await manager.close()
+
+asyncio.run(run(sys.argv[1], sys.argv[2], sys.argv[3]))
+"""
+
+
+def backend_command(backend, start_date, end_date, save_dir, fast_enumerate=False):
+    """Returns (cwd, argv) for running one backend against the fixture server."""
+    fast_flag = "1" if fast_enumerate else "0"
+    if backend == "ktx":
+        cwd = os.path.join(ROOT_DIR, "receipt_automation_ktx")
+        return cwd, [sys.executable, "korail_webview.py", "--start_date", start_date, "--end_date", end_date,
+                     "--save_path", save_dir, "--recapture"]
+    if backend == "srt":
+        cwd = os.path.join(ROOT_DIR, "receipt_automation_srt")
+        return cwd, [sys.executable, "-c", SRT_SNIPPET, start_date, end_date, save_dir, fast_flag]
+    if backend == "srt2":
+        cwd = os.path.join(ROOT_DIR, "receipt_automation_srt2")
+        return cwd, [sys.executable, "-c", SRT2_SNIPPET, start_date, end_date, save_dir]
+    raise ValueError(f"unknown backend: {backend}")
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(c) for c in f.read().split()]
+    except OSError:
+        return []
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def tree_rss_mb(pid):
+    """RSS of the process and all its descendants (browser processes included), in MB."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil:
+        try:
+            proc = psutil.Process(pid)
+            procs = [proc] + proc.children(recursive=True)
+        except psutil.Error:
+            return 0.0
+        total = 0
+        for p in procs:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+    # /proc fallback (Linux)
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total_kb += _rss_kb(current)
+        stack.extend(_children(current))
+    return total_kb / 1024
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_backend(backend, base_url, expected, start_date, end_date, timeout, fast_enumerate=False,
+                poll_interval=0.05):
+    save_dir = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+    scratch_dir = tempfile.mkdtemp(prefix="bench_profile_")
+    env = dict(os.environ)
+    env.update({
+        "KORAIL_BASE_URL": base_url,
+        "SRT_BASE_URL": base_url,
+        "HTML2CANVAS_URL": f"{base_url}/static/html2canvas.min.js",
+        "KORAIL_VENDOR_DIR": os.path.join(scratch_dir, "vendor"),
+        # Fresh browser profiles so cached sessions/pages don't skew the numbers
+        "TEMP": scratch_dir,
+    })
+
+    cwd, argv = backend_command(backend, start_date, end_date, save_dir, fast_enumerate)
+    started = time.perf_counter()
+    proc = subprocess.Popen(argv, cwd=cwd, env=env)
+
+    seen = {}
+    peak_rss = 0.0
+    try:
+        while True:
+            now = time.perf_counter()
+            for name in os.listdir(save_dir):
+                if name not in seen and name.lower().endswith(IMAGE_EXTENSIONS):
+                    seen[name] = now - started
+            peak_rss = max(peak_rss, tree_rss_mb(proc.pid))
+
+            if len(seen) >= expected or proc.poll() is not None or now - started > timeout:
+                break
+            time.sleep(poll_interval)
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    # Per-receipt latency = gap between consecutive saves (the first one includes startup + login)
+    stamps = sorted(seen.values())
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    elapsed = stamps[-1] if stamps else time.perf_counter() - started
+    span = stamps[-1] - stamps[0] if len(stamps) > 1 else 0
+
+    return {
+        "backend": backend,
+        "expected": expected,
+        "captured": len(stamps),
+        "exit_code": proc.returncode,
+        "first_receipt_s": round(stamps[0], 3) if stamps else None,
+        "total_s": round(elapsed, 3),
+        "p50_s": _round(percentile(gaps, 50)),
+        "p90_s": _round(percentile(gaps, 90)),
+        "p99_s": _round(percentile(gaps, 99)),
+        "receipts_per_min": round((len(stamps) - 1) / span * 60, 2) if span else None,
+        "peak_rss_mb": round(peak_rss, 1),
+        "save_dir": save_dir,
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline receipt capture benchmark")
+    parser.add_argument("--backend", choices=["ktx", "srt", "srt2", "all"], default="all")
+    parser.add_argument("--receipts", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=int, default=0, help="simulated server/render latency")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds per backend")
+    parser.add_argument("--keep", action="store_true", help="keep the captured files")
+    parser.add_argument("--fast-enumerate", action="store_true",
+                        help="Selenium SRT: enumerate the list pages over HTTP first (Config.FAST_ENUMERATE)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+
+    server, base_url = start_server(0, args.receipts, args.page_size, args.latency_ms)
+    print(f"Fixture server: {base_url}")
+
+    today = datetime.date.today()
+    start_date = (today - datetime.timedelta(days=args.receipts - 1)).strftime("%Y%m%d")
+    end_date = today.strftime("%Y%m%d")
+
+    backends = ["ktx", "srt", "srt2"] if args.backend == "all" else [args.backend]
+    results = []
+    try:
+        for backend in backends:
+            print(f"\n=== {backend} ===")
+            result = run_backend(backend, base_url, args.receipts, start_date, end_date, args.timeout,
+                                 args.fast_enumerate)
+            if not args.keep:
+                shutil.rmtree(result["save_dir"], ignore_errors=True)
+            results.append(result)
+    finally:
+        server.shutdown()
+
+    print()
+    header = f"{'backend':<8}{'saved':>8}{'p50(s)':>9}{'p90(s)':>9}{'p99(s)':>9}{'rcpt/min':>10}{'peakMB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        cells = [r["p50_s"], r["p90_s"], r["p99_s"], r["receipts_per_min"]]
+        p50, p90, p99, rpm = ("-" if c is None else c for c in cells)
+        saved = f"{r['captured']}/{r['expected']}"
+        print(f"{r['backend']:<8}{saved:>8}{p50:>9}{p90:>9}{p99:>9}{rpm:>10}{r['peak_rss_mb']:>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    # Non-zero when any backend missed receipts, so the benchmark can gate CI runs
+    return 0 if all(r["captured"] >= r["expected"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,458 @@
+"""
+오프라인 재현용 픽스처 서버
+코레일 영수증 페이지와 SRT 이용내역(selectBreakdownList.do) 페이지, 인쇄 팝업/모달을
+실제 사이트와 같은 DOM 구조(XPath/CSS 선택자 기준)로 흉내 냅니다.
+
+- 로그인 페이지는 잠시 후 메인 페이지로 자동 이동합니다 (수동 로그인 대체).
+- 영수증 개수, 페이지 크기, 응답 지연을 옵션으로 조절할 수 있습니다.
+
+사용 예:
+    python fixture_server.py --port 8765 --receipts 60 --latency-ms 150
+    KORAIL_BASE_URL=http://127.0.0.1:8765 python ../receipt_automation_ktx/korail_webview.py ...
+    SRT_BASE_URL=http://127.0.0.1:8765 python ../receipt_automation_srt2/main.py
+"""
+import argparse
+import datetime
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WEEKDAYS = "월화수목금토일"
+STATIONS = [("서울", "부산"), ("수서", "나주"), ("용산", "광주송정"), ("수서", "동대구"), ("서울", "강릉")]
+
+
+class FixtureData:
+    """Generated receipts, newest first (one trip per day going back from today)."""
+
+    def __init__(self, receipts=20, page_size=10, today=None):
+        self.page_size = page_size
+        today = today or datetime.date.today()
+        self.receipts = []
+        for i in range(receipts):
+            day = today - datetime.timedelta(days=i)
+            dep, arr = STATIONS[i % len(STATIONS)]
+            hour = 6 + (i * 3) % 14
+            self.receipts.append({
+                "id": i + 1,
+                "date": day,
+                "train_no": 100 + (i * 7) % 800,
+                "dep": dep,
+                "arr": arr,
+                "dep_time": f"{hour:02d}:{(i * 11) % 60:02d}",
+                "arr_time": f"{hour + 2:02d}:{(i * 17) % 60:02d}",
+                "price": 20000 + (i * 1300) % 40000,
+            })
+
+    def in_range(self, start, end):
+        return [r for r in self.receipts if start <= r["date"] <= end]
+
+
+# --------------------------------------------------------------------------
+# Korail
+# --------------------------------------------------------------------------
+
+KORAIL_LOGIN = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Korail Login</title></head>
+<body><div><p>픽스처 로그인 페이지 - 잠시 후 메인 페이지로 이동합니다.</p></div>
+<script>setTimeout(function() { location.href = '/ticket/main'; }, 300);</script>
+</body></html>"""
+
+# MAIN_LOGOUT_LINK = /html/body/div[1]/header/div/div[1]/div[2]/div[1]/div/ul[2]/li[2]/a
+KORAIL_MAIN = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Korail Main</title></head>
+<body><div><header><div><div><div></div><div><div><div>
+<ul><li><a href="#">마이페이지</a></li></ul>
+<ul><li><a href="#">회원정보</a></li><li><a href="/ticket/login">로그아웃</a></li></ul>
+</div></div></div></div></div></header></div>
+</body></html>"""
+
+# RECEIPT_* XPaths are rooted at /html/body/div[1]/div[3]/div/div/div/div/div[2]
+# RECEIPT_MODAL_* XPaths are rooted at /html/body/div[5]/div/div/div
+KORAIL_RECEIPT = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Korail Receipt</title>
+<style>.tckList { border: 1px solid #ccc; margin: 4px; padding: 8px; } .modal li { width: 360px; padding: 16px; }</style>
+</head><body>
+<div>
+  <div></div><div></div>
+  <div><div><div><div><div>
+    <div></div>
+    <div>
+      <div><div><div><ul><li><a>1주일</a></li><li><a>15일</a></li><li><button id="btn1m">1개월</button></li></ul></div></div></div>
+      <div><button id="btnInquiry">조회하기</button></div>
+      <div>
+        <div><div></div><div><button id="btnPrint">선택 영수증 인쇄</button></div></div>
+        <div id="resultList"></div>
+      </div>
+    </div>
+  </div></div></div></div></div>
+</div>
+<div></div><div></div><div></div>
+<div id="modalRoot" class="modal"></div>
+<script>
+var LATENCY = __LATENCY__;
+var PAGE_SIZE = __PAGE_SIZE__;
+var RECEIPTS = __RECEIPTS__;
+var loaded = 0;
+
+function renderPage() {
+  var list = document.getElementById('resultList');
+  var slice = RECEIPTS.slice(loaded, loaded + PAGE_SIZE);
+  slice.forEach(function(r) {
+    var div = document.createElement('div');
+    div.className = 'tckList';
+    div.setAttribute('data-id', r.id);
+    div.innerHTML =
+      '<input type="checkbox">' +
+      '<div class="tit_box"><span class="flag_wrap">' + r.train + '</span></div>' +
+      '<span class="dt">' + r.date + '</span>' +
+      '<div class="data_box"><h3>' + r.dep + ' → ' + r.arr + '(' + r.dep_time + ' ~ ' + r.arr_time + ') 어른</h3></div>' +
+      '<p><span>' + r.price + '</span></p>' +
+      '<p><span>인쇄완료</span></p>';
+    list.appendChild(div);
+  });
+  loaded += slice.length;
+  var container = list.parentNode;
+  var more = container.querySelector(':scope > a');
+  if (loaded < RECEIPTS.length && !more) {
+    more = document.createElement('a');
+    more.textContent = '더보기';
+    more.href = 'javascript:void(0)';
+    more.onclick = function() { setTimeout(renderPage, LATENCY); };
+    container.appendChild(more);
+  } else if (loaded >= RECEIPTS.length && more) {
+    more.remove();
+  }
+}
+
+document.getElementById('btnInquiry').onclick = function() {
+  document.getElementById('resultList').innerHTML = '';
+  loaded = 0;
+  setTimeout(renderPage, LATENCY);
+};
+
+document.getElementById('btnPrint').onclick = function() {
+  var checked = Array.prototype.filter.call(document.querySelectorAll('.tckList'), function(item) {
+    return item.querySelector('input[type="checkbox"]').checked;
+  });
+  if (checked.length === 0) return;
+  setTimeout(function() {
+    var lis = checked.map(function(item) {
+      return '<li><div><div><h2>승차권 영수증</h2><p>' + item.innerText.replace(/\\n/g, '<br>') + '</p></div></div></li>';
+    }).join('');
+    document.getElementById('modalRoot').innerHTML =
+      '<div><div><div>' +
+      '<div><button id="btnClose">닫기</button></div>' +
+      '<div><div><ul>' + lis + '</ul></div></div>' +
+      '</div></div></div>';
+    document.getElementById('btnClose').onclick = function() {
+      document.getElementById('modalRoot').innerHTML = '';
+    };
+  }, LATENCY);
+};
+</script>
+</body></html>"""
+
+
+def korail_receipt_page(data, latency_ms):
+    receipts = []
+    for r in data.receipts:
+        receipts.append({
+            "id": r["id"],
+            "train": f"KTX {r['train_no']}",
+            "date": r["date"].strftime("%Y년 %m월 %d일"),
+            "dep": r["dep"],
+            "arr": r["arr"],
+            "dep_time": r["dep_time"],
+            "arr_time": r["arr_time"],
+            "price": f"{r['price']:,}원",
+        })
+    return (KORAIL_RECEIPT
+            .replace("__LATENCY__", str(latency_ms))
+            .replace("__PAGE_SIZE__", str(data.page_size))
+            .replace("__RECEIPTS__", json.dumps(receipts, ensure_ascii=False)))
+
+
+# Stand-in for html2canvas: paints the element's text onto a canvas of the same size
+HTML2CANVAS_STUB = """
+window.html2canvas = function(element) {
+  return new Promise(function(resolve) {
+    var rect = element.getBoundingClientRect();
+    var canvas = document.createElement('canvas');
+    canvas.width = Math.max(1, Math.ceil(rect.width));
+    canvas.height = Math.max(1, Math.ceil(rect.height));
+    var ctx = canvas.getContext('2d');
+    ctx.fillStyle = '#fff';
+    ctx.fillRect(0, 0, canvas.width, canvas.height);
+    ctx.fillStyle = '#000';
+    ctx.font = '14px sans-serif';
+    element.innerText.split('\\n').forEach(function(line, i) { ctx.fillText(line, 8, 20 + i * 18); });
+    resolve(canvas);
+  });
+};
+"""
+
+
+# --------------------------------------------------------------------------
+# SRT
+# --------------------------------------------------------------------------
+
+SRT_LOGIN = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>SRT Login</title></head>
+<body><div id="wrap"><p>픽스처 로그인 페이지 - 잠시 후 메인 페이지로 이동합니다.</p></div>
+<script>setTimeout(function() { location.href = '/main.do'; }, 300);</script>
+</body></html>"""
+
+# MY_PAGE_BTN = //button[@class='btn-navi my drop-btn']
+SRT_MAIN = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>SRT Main</title></head>
+<body><div id="wrap"><header><button class="btn-navi my drop-btn">마이페이지</button></header></div>
+</body></html>"""
+
+# Layout follows both backends' selectors:
+#   #wrap > div.container.container-e > div > div.sub_con_area > div.tal_c > button (print, srt2 CSS)
+#   //*[@id='wrap']/div[4]/div/div[4]/div[4] (pagination, Selenium XPath) -> 4th div of sub_con_area
+#   //*[@id='list-form']/fieldset/div/table/tbody/tr[n]/td[1]/input
+SRT_LIST = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>SRT 이용내역</title></head>
+<body><div id="wrap">
+<div></div><div></div><div></div>
+<div class="container container-e"><div>
+  <div></div><div></div><div></div>
+  <div class="sub_con_area">
+    <form id="search-form" method="get" action="/hpg/hta/03/selectBreakdownList.do"><fieldset>
+      <input type="hidden" name="pageId" value="TK0102030100">
+      __DATE_SELECTS__
+      <div class="tal_c"><button type="submit" class="btn_large btn_blue val_m">조회하기</button></div>
+    </fieldset></form>
+    <div></div>
+    <div class="total">총 <span id="totalCount">__TOTAL__</span>건</div>
+    <form id="list-form"><fieldset><div><table>
+      <thead><tr><th></th><th>승차일</th><th>열차</th><th>출발</th><th>도착</th><th>좌석</th><th>인원</th><th>결제일</th><th>상태</th><th>금액</th><th>비고</th></tr></thead>
+      <tbody>__ROWS__</tbody>
+    </table></div></fieldset></form>
+    <div class="tal_c"><button type="button" class="btn_large btn_emerald fs18 val_m" onclick="printReceipts()">영수증 인쇄</button></div>
+    <div class="paging">__PAGING__</div>
+  </div>
+</div></div>
+</div>
+<script>
+function printReceipts() {
+  var ids = Array.prototype.filter.call(document.querySelectorAll('#list-form tbody input[type=checkbox]'), function(c) {
+    return c.checked;
+  }).map(function(c) { return c.value; });
+  if (ids.length === 0) { alert('영수증을 선택하세요.'); return; }
+  window.open('/hpg/hta/03/selectReceiptPrint.do?ids=' + ids.join(','), 'receipt_' + Date.now(), 'width=760,height=900');
+}
+</script>
+</body></html>"""
+
+# POPUP_CONTENT = //*[@id='wrap']/div[2]/div[1]; srt2: div.stlm table tbody tr:first-child td, div.jrny > ul > li
+SRT_POPUP = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>영수증</title>
+<style>.receipt { width: 640px; padding: 24px; border: 1px solid #333; margin-bottom: 12px; }</style></head>
+<body><div id="wrap">
+<div><h1>승차권 영수증</h1></div>
+<div>__RECEIPTS__</div>
+</div>
+<script>
+window.addEventListener('load', function() { setTimeout(function() { window.print(); }, 10); });
+</script>
+</body></html>"""
+
+SRT_POPUP_RECEIPT = """<div class="receipt">
+  <div class="jrny"><ul><li>__JOURNEY__</li></ul></div>
+  <div class="stlm"><table><tbody><tr><td>__AMOUNT__원</td></tr><tr><td>카드결제</td></tr></tbody></table></div>
+</div>"""
+
+
+def _srt_date_selects(start, end):
+    def select(name, values, selected):
+        options = "".join(
+            f'<option value="{v}"{" selected" if v == selected else ""}>{v}</option>' for v in values
+        )
+        return f'<select id="{name}" name="{name}">{options}</select>'
+
+    years = [str(y) for y in range(start.year - 2, datetime.date.today().year + 1)]
+    months = [f"{m:02d}" for m in range(1, 13)]
+    days = [f"{d:02d}" for d in range(1, 32)]
+    return "".join([
+        select("dptDtFromY", years, start.strftime("%Y")),
+        select("dptDtFromM", months, start.strftime("%m")),
+        select("dptDtFromD", days, start.strftime("%d")),
+        select("dptDtToY", years, end.strftime("%Y")),
+        select("dptDtToM", months, end.strftime("%m")),
+        select("dptDtToD", days, end.strftime("%d")),
+    ])
+
+
+def _parse_srt_range(query, data):
+    def get_date(prefix, default):
+        try:
+            return datetime.date(
+                int(query[f"{prefix}Y"][0]), int(query[f"{prefix}M"][0]), int(query[f"{prefix}D"][0])
+            )
+        except (KeyError, ValueError, IndexError):
+            return default
+
+    # Without a search the list covers every generated receipt
+    today = datetime.date.today()
+    oldest = data.receipts[-1]["date"] if data.receipts else today
+    return get_date("dptDtFrom", oldest), get_date("dptDtTo", today)
+
+
+def srt_list_page(query, data):
+    start, end = _parse_srt_range(query, data)
+    receipts = data.in_range(start, end)
+    page_count = max(1, (len(receipts) + data.page_size - 1) // data.page_size)
+    try:
+        page = min(max(1, int(query.get("pageNo", ["1"])[0])), page_count)
+    except ValueError:
+        page = 1
+
+    rows = []
+    for r in receipts[(page - 1) * data.page_size: page * data.page_size]:
+        d = r["date"]
+        rows.append(
+            "<tr>"
+            f'<td><input type="checkbox" name="chk" value="{r["id"]}"></td>'
+            f"<td>{d.month}월 {d.day}일<br>({WEEKDAYS[d.weekday()]})</td>"
+            f"<td>SRT<br>{r['train_no']}</td>"
+            f"<td>{r['dep']}<br>{r['dep_time']}</td>"
+            f"<td>{r['arr']}<br>{r['arr_time']}</td>"
+            "<td>일반실</td><td>1명</td>"
+            f"<td>{d.strftime('%Y.%m.%d')}</td>"
+            "<td>발권완료</td>"
+            f"<td>{r['price']:,}</td>"
+            "<td></td>"
+            "</tr>"
+        )
+
+    base_params = "".join(
+        f"{k}={v[0]}&" for k, v in query.items() if k.startswith("dptDt") or k == "pageId"
+    )
+
+    def link(n, label, cls=""):
+        cls_attr = f' class="{cls}"' if cls else ""
+        return f'<a{cls_attr} href="?{base_params}pageNo={n}">{label}</a>'
+
+    numbers = "".join(
+        f"<strong>{n}</strong>" if n == page else link(n, str(n)) for n in range(1, page_count + 1)
+    )
+    # a[4] is "next" (NEXT_PAGE_BTN_INDEX); on the last page it points at the same page like the real site
+    paging = (
+        link(1, "처음", "first") + link(max(1, page - 10), "이전10", "prev10") + link(max(1, page - 1), "이전", "prev")
+        + link(min(page_count, page + 1), "다음", "next")
+        + f'<span class="num">{numbers}</span>'
+        + link(min(page_count, page + 10), "다음10", "next10") + link(page_count, "마지막", "last")
+    )
+
+    return (SRT_LIST
+            .replace("__DATE_SELECTS__", _srt_date_selects(start, end))
+            .replace("__TOTAL__", str(len(receipts)))
+            .replace("__ROWS__", "".join(rows))
+            .replace("__PAGING__", paging))
+
+
+def srt_popup_page(query, data):
+    ids = set()
+    for part in query.get("ids", [""])[0].split(","):
+        if part.isdigit():
+            ids.add(int(part))
+    blocks = []
+    for r in data.receipts:
+        if r["id"] in ids:
+            journey = (
+                f"{r['date'].isoformat()} SRT {r['train_no']} 일반실 "
+                f"{r['dep']}({r['dep_time']}) → {r['arr']}({r['arr_time']})"
+            )
+            blocks.append(
+                SRT_POPUP_RECEIPT
+                .replace("__JOURNEY__", html.escape(journey))
+                .replace("__AMOUNT__", f"{r['price']:,}")
+            )
+    return SRT_POPUP.replace("__RECEIPTS__", "".join(blocks))
+
+
+# --------------------------------------------------------------------------
+# Server
+# --------------------------------------------------------------------------
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    data = None
+    latency_ms = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200):
+        payload = body.encode("utf-8")
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self, query):
+        path = urlparse(self.path).path
+        if path == "/ticket/login":
+            return self._send(KORAIL_LOGIN)
+        if path == "/ticket/main":
+            return self._send(KORAIL_MAIN)
+        if path.startswith("/ticket/mypage/ticketInfo/receipt"):
+            return self._send(korail_receipt_page(self.data, self.latency_ms))
+        if path == "/static/html2canvas.min.js":
+            return self._send(HTML2CANVAS_STUB, "application/javascript")
+        if path == "/cmc/01/selectLoginForm.do":
+            return self._send(SRT_LOGIN)
+        if path == "/main.do":
+            return self._send(SRT_MAIN)
+        if path == "/hpg/hta/03/selectBreakdownList.do":
+            return self._send(srt_list_page(query, self.data))
+        if path == "/hpg/hta/03/selectReceiptPrint.do":
+            return self._send(srt_popup_page(query, self.data))
+        return self._send("not found", "text/plain", 404)
+
+    def do_GET(self):
+        self._route(parse_qs(urlparse(self.path).query))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        query = parse_qs(urlparse(self.path).query)
+        query.update(parse_qs(body))
+        self._route(query)
+
+
+def start_server(port=0, receipts=20, page_size=10, latency_ms=0):
+    """픽스처 서버를 백그라운드 스레드로 시작하고 (server, base_url)을 반환합니다."""
+    handler = type("Handler", (FixtureHandler,), {
+        "data": FixtureData(receipts=receipts, page_size=page_size),
+        "latency_ms": latency_ms,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Korail/SRT offline fixture server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--receipts", type=int, default=20, help="number of receipts (one per day back from today)")
+    parser.add_argument("--page-size", type=int, default=10, help="rows per list page / load-more step")
+    parser.add_argument("--latency-ms", type=int, default=0, help="delay per request and per in-page load")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.receipts, args.page_size, args.latency_ms)
+    print(f"Fixture server running at {base_url} (Ctrl+C to stop)")
+    print(f"  KORAIL_BASE_URL={base_url}")
+    print(f"  SRT_BASE_URL={base_url}")
+    print(f"  HTML2CANVAS_URL={base_url}/static/html2canvas.min.js")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
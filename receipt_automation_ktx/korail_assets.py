@@ -0,0 +1,112 @@
+# Korail 자동화에 필요한 정적 리소스(html2canvas) 로더
+# 패키지에 포함된 vendor/html2canvas.min.js를 사용하고, 없을 때만 한 번 내려받아 디스크에 캐시합니다.
+# 기본 URL의 파일은 고정된 해시로 검증하고 (내려받은 내용도 저장 전에 확인),
+# HTML2CANVAS_URL로 바꾼 경우에만 파일 옆의 .sha256 체크섬으로 손상/부분 저장된 캐시를 걸러냅니다.
+
+import base64
+import hashlib
+import os
+
+HTML2CANVAS_VERSION = "1.4.1"
+HTML2CANVAS_DEFAULT_URL = (
+    f"https://cdnjs.cloudflare.com/ajax/libs/html2canvas/{HTML2CANVAS_VERSION}/html2canvas.min.js"
+)
+HTML2CANVAS_URL = os.environ.get("HTML2CANVAS_URL", HTML2CANVAS_DEFAULT_URL)
+# Subresource Integrity digest cdnjs publishes for html2canvas 1.4.1 (html2canvas.min.js)
+HTML2CANVAS_INTEGRITY = (
+    "sha512-BNaRQnYJYiPSqHHDb58B0yaPfCu+Wgds8Gp/gU33kqBtgNS4tSPHuGibyoeqMV/TJlSKda6FXzoEyYGjTe+vXA=="
+)
+
+# KORAIL_VENDOR_DIR keeps test/benchmark copies out of the packaged vendor directory
+VENDOR_DIR = os.environ.get(
+    "KORAIL_VENDOR_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor"),
+)
+HTML2CANVAS_PATH = os.path.join(VENDOR_DIR, "html2canvas.min.js")
+HTML2CANVAS_SHA256_PATH = HTML2CANVAS_PATH + ".sha256"
+
+DOWNLOAD_TIMEOUT = 10 # seconds
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def html2canvas_integrity():
+    """Pinned SRI digest when the default URL is used; None for an overridden HTML2CANVAS_URL."""
+    return HTML2CANVAS_INTEGRITY if HTML2CANVAS_URL == HTML2CANVAS_DEFAULT_URL else None
+
+
+def _matches_integrity(data, integrity):
+    algorithm, expected = integrity.split("-", 1)
+    return base64.b64encode(hashlib.new(algorithm, data).digest()).decode('ascii') == expected
+
+
+def _read_cached():
+    """Returns the cached script if present and matching its pinned hash (or checksum), else None."""
+    if not os.path.exists(HTML2CANVAS_PATH):
+        return None
+
+    with open(HTML2CANVAS_PATH, 'rb') as f:
+        data = f.read()
+
+    integrity = html2canvas_integrity()
+    if integrity:
+        return data.decode('utf-8') if _matches_integrity(data, integrity) else None
+
+    if os.path.exists(HTML2CANVAS_SHA256_PATH):
+        with open(HTML2CANVAS_SHA256_PATH, 'r', encoding='utf-8') as f:
+            expected = f.read().strip()
+        if expected != _sha256(data):
+            return None
+    else:
+        # Shipped without a checksum file: record it so later corruption is detected
+        _write(HTML2CANVAS_SHA256_PATH, _sha256(data).encode('utf-8'))
+
+    return data.decode('utf-8')
+
+
+def _write(path, data):
+    # Write to a temp file first so an interrupted download never leaves a partial cache
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _download():
+    import requests
+    resp = requests.get(HTML2CANVAS_URL, timeout=DOWNLOAD_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.content
+
+    integrity = html2canvas_integrity()
+    if integrity and not _matches_integrity(data, integrity):
+        # Truncated or altered download: never cache or run it
+        raise ValueError(f"{HTML2CANVAS_URL} 내용이 html2canvas {HTML2CANVAS_VERSION}의 해시와 다릅니다")
+
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    _write(HTML2CANVAS_PATH, data)
+    if not integrity:
+        _write(HTML2CANVAS_SHA256_PATH, _sha256(data).encode('utf-8'))
+    return data.decode('utf-8')
+
+
+def load_html2canvas(log=print):
+    """
+    Returns the html2canvas source, reading the on-disk copy when available.
+    The network is only used when no valid copy exists yet. Returns None on failure.
+    """
+    try:
+        script = _read_cached()
+        if script:
+            return script
+    except OSError as e:
+        log(f"html2canvas 캐시 읽기 실패: {e}")
+
+    log("html2canvas 캐시가 없어 다운로드합니다 (최초 1회)...")
+    try:
+        return _download()
+    except Exception as e:
+        log(f"html2canvas 다운로드 실패: {e}")
+        return None
@@ -0,0 +1,368 @@
+# Korail WebView Bridge
+# 페이지가 스스로 상태 변화(URL, 결과 리스트, 모달, 캡처 완료)를 Python에 알려주는 push 방식 브리지입니다.
+# MutationObserver가 DOM 변화를 감지하고 pywebview js_api(window.pywebview.api.notify)로 전달합니다.
+# 대상 요소는 선택자 레지스트리(korail_selectors)로 찾으므로 변경이 없을 때는 XPath를 다시 평가하지 않습니다.
+
+import base64
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+
+from korail_selectors import SELECTOR_JS
+import common_path  # repo root on sys.path (receipt_common)
+from receipt_common.run_trace import RunTrace
+from receipt_common.wait_log import WaitLog
+
+# 페이지 상태 감시 스크립트 (문서당 한 번만 설치됨)
+# 상태 스냅샷이 실제로 바뀐 경우에만 Python으로 전달하므로 유휴 상태에서는 호출이 발생하지 않습니다.
+OBSERVER_JS = f"""
+(function() {{
+    if (window.__korailBridge) {{
+        window.__korailBridge.report(true);
+        return 'ALREADY_INSTALLED';
+    }}
+
+    {SELECTOR_JS}
+
+    var pending = [];
+    function send(event, detail) {{
+        var api = window.pywebview && window.pywebview.api;
+        if (api && api.notify) {{
+            api.notify(event, detail || '');
+        }} else {{
+            // js_api가 아직 준비되지 않았으면 pywebviewready 이후 전달
+            pending.push([event, detail]);
+        }}
+    }}
+    window.addEventListener('pywebviewready', function() {{
+        var queued = pending;
+        pending = [];
+        for (var i=0; i<queued.length; i++) send(queued[i][0], queued[i][1]);
+    }});
+
+    function snapshot() {{
+        var logout = sel('MAIN_LOGOUT_LINK');
+        return {{
+            "url": location.href,
+            "ready": document.readyState,
+            "logged_in": !!(logout && logout.innerText.indexOf('로그아웃') !== -1),
+            "items": document.querySelectorAll('.tckList').length,
+            "more": !!sel('RECEIPT_MORE_BTN'),
+            "modal": !!sel('RECEIPT_MODAL_AREA')
+        }};
+    }}
+
+    var lastReported = null;
+    var scheduled = false;
+    function report(force) {{
+        scheduled = false;
+        var snap = JSON.stringify(snapshot());
+        if (!force && snap === lastReported) return;
+        lastReported = snap;
+        send('state', snap);
+    }}
+    // DOM 변경이 몰려서 발생해도 한 번만 검사 (debounce)
+    function schedule() {{
+        if (scheduled) return;
+        scheduled = true;
+        setTimeout(function() {{ report(false); }}, 50);
+    }}
+
+    new MutationObserver(schedule).observe(document.documentElement, {{ childList: true, subtree: true }});
+
+    // SPA 라우팅(history API)으로 인한 URL 변경 감지
+    ['pushState', 'replaceState'].forEach(function(name) {{
+        var original = history[name];
+        history[name] = function() {{
+            var ret = original.apply(this, arguments);
+            schedule();
+            return ret;
+        }};
+    }});
+    window.addEventListener('popstate', schedule);
+    document.addEventListener('readystatechange', schedule);
+
+    window.__korailBridge = {{ report: report, send: send }};
+    report(true);
+    return 'INSTALLED';
+}})()
+"""
+
+# Raw bytes per js_api call when streaming a captured image to Python
+CAPTURE_CHUNK_SIZE = 256 * 1024
+# Seconds a capture stream may take from begin_capture() to capture_end before it is abandoned
+CAPTURE_TIMEOUT = 30
+
+# 캡처 이미지 전송 함수 (캡처 스크립트에 포함해서 사용)
+# canvas.toBlob으로 PNG를 만든 뒤 바이트를 청크 단위로 Python에 보내고, JS 쪽 버퍼는 즉시 해제합니다.
+# 전체 base64 data URL 문자열이 페이지 힙이나 Python 메모리에 한 번에 만들어지지 않습니다.
+CAPTURE_STREAM_JS = f"""
+function chunkToBase64(bytes) {{
+    var binary = '';
+    for (var i=0; i<bytes.length; i+=8192) {{
+        binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 8192));
+    }}
+    return btoa(binary);
+}}
+
+function streamCanvas(canvas, token) {{
+    var api = window.pywebview.api;
+    canvas.toBlob(function(blob) {{
+        // Release the canvas backing store as soon as the PNG is encoded
+        canvas.width = 0;
+        canvas.height = 0;
+        if (!blob) {{
+            api.capture_end(token, 'toBlob failed');
+            return;
+        }}
+        blob.arrayBuffer().then(function(buffer) {{
+            blob = null;
+            var bytes = new Uint8Array(buffer);
+            var offset = 0;
+            function next() {{
+                if (offset >= bytes.length) {{
+                    bytes = null;
+                    api.capture_end(token, '');
+                    return;
+                }}
+                var chunk = bytes.subarray(offset, offset + {CAPTURE_CHUNK_SIZE});
+                offset += {CAPTURE_CHUNK_SIZE};
+                api.capture_chunk(token, chunkToBase64(chunk)).then(next, function(err) {{
+                    bytes = null;
+                    api.capture_end(token, '' + err);
+                }});
+            }}
+            next();
+        }}, function(err) {{
+            api.capture_end(token, '' + err);
+        }});
+    }}, 'image/png');
+}}
+
+function captureNode(target, token) {{
+    var api = window.pywebview.api;
+    if (!target) {{
+        api.capture_end(token, 'Target element not found');
+        return;
+    }}
+    if (typeof html2canvas === 'undefined') {{
+        api.capture_end(token, 'html2canvas not loaded');
+        return;
+    }}
+    // Render only after web fonts are applied, otherwise the PNG shows fallback glyphs
+    var fontsReady = document.fonts ? document.fonts.ready : Promise.resolve();
+    fontsReady.then(function() {{
+        return html2canvas(target);
+    }}).then(function(canvas) {{
+        streamCanvas(canvas, token);
+    }}).catch(function(err) {{
+        api.capture_end(token, '' + err);
+    }});
+}}
+"""
+
+
+class KorailBridge:
+    """
+    Receives page notifications from JS and lets the monitor thread block until something changes.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._state = {}
+        self._unseen = False      # True if a notification arrived since the last wait()
+        self._signals = set()     # One-shot named events (e.g. 'html2canvas_loaded')
+        self.generation = 0       # Incremented on every document load
+        self._captures = {}       # token -> in-flight capture stream
+        self._capture_ids = itertools.count(1)
+        self.window = None
+        self.waits = WaitLog()    # Actual duration of every named wait
+        self.trace = RunTrace("ktx")  # Per-phase spans (every wait + capture render/transfer)
+
+    def attach(self, window):
+        """Exposes notify() to the page and installs the observer on every page load."""
+        self.window = window
+        window.expose(self.notify, self.capture_chunk, self.capture_end)
+        window.events.loaded += self._on_loaded
+
+    def _on_loaded(self, *args):
+        self.generation += 1
+        try:
+            self.window.evaluate_js(OBSERVER_JS)
+        except Exception:
+            pass
+        self._push('loaded')
+
+    # --- JS -> Python ---
+    def notify(self, event, detail=None):
+        """Called from the page as window.pywebview.api.notify(event, detail)."""
+        if event == 'state':
+            try:
+                state = json.loads(detail)
+            except (TypeError, ValueError):
+                return
+            with self._cond:
+                self._state = state
+                self._unseen = True
+                self._cond.notify_all()
+        else:
+            self._push(event)
+
+    def capture_chunk(self, token, data):
+        """Called from the page with one base64 chunk of a capture; written straight to disk."""
+        raw = base64.b64decode(data)
+        # Under the lock so abort_capture() cannot close the file mid-write
+        with self._cond:
+            capture = self._captures.get(token)
+            if not capture or capture['result'] is not None:
+                return False
+            if capture['size'] == 0:
+                # First chunk: html2canvas render + PNG encode are done, the rest is transfer + write
+                self.trace.end(capture['span'])
+                capture['span'] = self.trace.begin('transfer_write', token=token)
+            capture['file'].write(raw)
+            capture['sha256'].update(raw)
+            capture['size'] += len(raw)
+        return True
+
+    def capture_end(self, token, error=''):
+        """Called from the page when a capture stream finished (error is '' on success)."""
+        with self._cond:
+            capture = self._captures.get(token)
+            if not capture or capture['result'] is not None:
+                return False
+            capture['file'].close()
+            self.trace.end(capture['span'], bytes=capture['size'], **({'error': error} if error else {}))
+            part_path = capture['path'] + '.part'
+            if error:
+                os.remove(part_path)
+                result = {'error': error}
+            else:
+                os.replace(part_path, capture['path'])
+                result = {'path': capture['path'], 'size': capture['size'], 'sha256': capture['sha256'].hexdigest()}
+            capture['result'] = result
+            self._unseen = True
+            self._cond.notify_all()
+        return True
+
+    def _push(self, event):
+        with self._cond:
+            self._signals.add(event)
+            self._unseen = True
+            self._cond.notify_all()
+
+    # --- Python side ---
+    @property
+    def state(self):
+        with self._cond:
+            return dict(self._state)
+
+    def wait(self, timeout):
+        """Blocks until any notification arrives (or timeout). Returns True if something changed."""
+        with self._cond:
+            if not self._unseen:
+                self._cond.wait(timeout)
+            changed = self._unseen
+            self._unseen = False
+            return changed
+
+    def wait_for(self, predicate, timeout, name="state"):
+        """
+        Blocks until predicate(state) is true (or timeout). Returns the final predicate result.
+        The notification stays unseen, so the monitor's next wait() returns at once and handles it.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        with self.trace.span(name), self._cond:
+            ok = True
+            while not predicate(self._state):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    ok = False
+                    break
+                self._cond.wait(remaining)
+        self.waits.record(name, time.monotonic() - start, ok)
+        return ok
+
+    def begin_capture(self, path, timeout=CAPTURE_TIMEOUT):
+        """
+        Opens a capture stream that writes to path. Returns the token to pass to captureNode().
+        The stream is abandoned if capture_end has not arrived within timeout seconds.
+        """
+        token = f"cap{next(self._capture_ids)}"
+        self._captures[token] = {
+            'path': path,
+            'deadline': time.monotonic() + timeout,
+            'file': open(path + '.part', 'wb'),
+            'sha256': hashlib.sha256(),
+            'size': 0,
+            'result': None,
+            'span': self.trace.begin('render_encode', token=token, file=os.path.basename(path)),
+        }
+        return token
+
+    def wait_capture(self, token, timeout):
+        """
+        Blocks until the capture stream finishes (or timeout).
+        Returns {'path', 'size', 'sha256'} or {'error'}; None if still running.
+        A stream past its begin_capture() deadline is abandoned and returns {'error': 'timeout'}.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        with self.trace.span('wait_capture'), self._cond:
+            capture = self._captures.get(token)
+            if capture is None:
+                return {'error': 'unknown capture'}
+            result = None
+            while capture['result'] is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            else:
+                del self._captures[token]
+                result = capture['result']
+        if result is None and time.monotonic() >= capture['deadline']:
+            # capture_end never came (stream stalled or the page navigated away)
+            self.abort_capture(token, 'timeout')
+            result = {'error': 'timeout'}
+        self.waits.record('capture', time.monotonic() - start, result is not None)
+        return result
+
+    def abort_capture(self, token, reason='aborted'):
+        """Drops an unfinished capture stream: closes the file and removes the .part file."""
+        with self._cond:
+            capture = self._captures.pop(token, None)
+            if capture is None or capture['result'] is not None:
+                return
+            capture['result'] = {'error': reason}
+            capture['file'].close()
+        self.trace.end(capture['span'], bytes=capture['size'], error=reason)
+        try:
+            os.remove(capture['path'] + '.part')
+        except OSError:
+            pass
+
+    def clear_signal(self, name):
+        with self._cond:
+            self._signals.discard(name)
+
+    def wait_signal(self, name, timeout):
+        """Blocks until the named one-shot event is received (or timeout). Consumes it."""
+        start = time.monotonic()
+        deadline = start + timeout
+        with self.trace.span(name), self._cond:
+            ok = True
+            while name not in self._signals:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    ok = False
+                    break
+                self._cond.wait(remaining)
+            if ok:
+                self._signals.discard(name)
+        self.waits.record(name, time.monotonic() - start, ok)
+        return ok
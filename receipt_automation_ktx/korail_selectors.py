@@ -0,0 +1,214 @@
+# Korail Selector Registry
+# 논리 대상(버튼, 리스트, 모달 등)마다 탐색 전략을 순서대로 등록해 둡니다: XPath -> CSS -> 텍스트 -> ARIA role.
+# 페이지 레이아웃이 바뀌어 절대 XPath가 깨져도 다음 전략으로 같은 요소를 찾습니다.
+#
+# 해석 결과(노드)는 문서 안에서 캐시되며, DOM 변경(MutationObserver) 시 분리된 노드/찾지 못한 결과만 무효화됩니다.
+# 대상별로 어떤 전략이 맞았는지, 해석에 걸린 시간은 얼마인지 기록합니다 (window.__korailSelectors.stats()).
+
+import json
+
+import korail_xpath
+
+# Strategy keys:
+#   xpath          - document.evaluate
+#   css            - document.querySelector
+#   text (+ tag)   - first element matching tag whose normalized innerText equals text
+#                    ("match": "contains" for a substring match)
+#   role (+ name)  - [role=...] or the implicit role's elements, with the accessible name containing name
+SELECTORS = {
+    "MAIN_LOGOUT_LINK": [
+        {"xpath": korail_xpath.MAIN_LOGOUT_LINK},
+        {"text": "로그아웃", "tag": "a"},
+        {"role": "link", "name": "로그아웃"},
+    ],
+    "RECEIPT_1MONTH_BTN": [
+        {"xpath": korail_xpath.RECEIPT_1MONTH_BTN},
+        {"text": "1개월", "tag": "button, a, li"},
+        {"role": "button", "name": "1개월"},
+    ],
+    "RECEIPT_INQUIRY_BTN": [
+        {"xpath": korail_xpath.RECEIPT_INQUIRY_BTN},
+        {"text": "조회하기", "tag": "button, a"},
+        {"role": "button", "name": "조회"},
+    ],
+    "RECEIPT_RESULT_LIST": [
+        {"xpath": korail_xpath.RECEIPT_RESULT_LIST},
+        {"css": "div:has(> .tckList)"},
+    ],
+    "RECEIPT_MORE_BTN": [
+        {"xpath": korail_xpath.RECEIPT_MORE_BTN},
+        {"text": "더보기", "tag": "a, button"},
+    ],
+    "RECEIPT_PRINT_BTN": [
+        {"xpath": korail_xpath.RECEIPT_PRINT_BTN},
+        {"text": "영수증 인쇄", "tag": "button", "match": "contains"},
+        {"role": "button", "name": "영수증 인쇄"},
+    ],
+    # Modal targets have no text fallback: they are looked up on every state report while absent
+    "RECEIPT_MODAL_AREA": [
+        {"xpath": korail_xpath.RECEIPT_MODAL_AREA},
+        {"css": "[role='dialog'] ul > li > div > div"},
+    ],
+    "RECEIPT_MODAL_LIST": [
+        {"xpath": korail_xpath.RECEIPT_MODAL_LIST},
+        {"css": "[role='dialog'] ul"},
+    ],
+    "RECEIPT_MODAL_CLOSE_BTN": [
+        {"xpath": korail_xpath.RECEIPT_MODAL_CLOSE_BTN},
+        {"role": "button", "name": "닫기"},
+    ],
+}
+
+# 선택자 해석 스크립트 (문서당 한 번 설치, 이후 포함되어도 재설치하지 않음)
+# 스크립트 안에서 sel('RECEIPT_PRINT_BTN')처럼 논리 이름으로 요소를 얻습니다.
+SELECTOR_JS = f"""
+if (!window.__korailSelectors) {{
+    window.__korailSelectors = (function() {{
+        var REGISTRY = {json.dumps(SELECTORS, ensure_ascii=False)};
+        var IMPLICIT_ROLES = {{
+            "button": "button, input[type=button], input[type=submit]",
+            "link": "a[href]",
+            "dialog": "dialog"
+        }};
+
+        var cache = {{}};      // name -> resolved node (or null = miss for this DOM version)
+        var cacheVersion = {{}}; // name -> DOM version a cached miss belongs to
+        var version = 0;      // bumped on every DOM mutation batch
+        var stats = {{}};
+
+        function invalidate() {{
+            version++;
+            for (var name in cache) {{
+                // Nodes still in the document stay valid; misses are retried on the new DOM
+                if (!cache[name] || !cache[name].isConnected) delete cache[name];
+            }}
+        }}
+        var observer = new MutationObserver(invalidate);
+        observer.observe(document.documentElement, {{ childList: true, subtree: true }});
+
+        function norm(s) {{
+            return (s || '').replace(/\\s+/g, ' ').trim();
+        }}
+
+        function byXPath(xpath) {{
+            try {{
+                return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            }} catch (e) {{
+                return null;
+            }}
+        }}
+
+        function byCss(css) {{
+            try {{
+                return document.querySelector(css);
+            }} catch (e) {{
+                return null; // e.g. :has() unsupported
+            }}
+        }}
+
+        function byText(text, tag, match) {{
+            var nodes = document.querySelectorAll(tag || '*');
+            for (var i=0; i<nodes.length; i++) {{
+                var t = norm(nodes[i].innerText);
+                if (match === 'contains' ? t.indexOf(text) !== -1 : t === text) return nodes[i];
+            }}
+            return null;
+        }}
+
+        function byRole(role, name) {{
+            var css = '[role="' + role + '"]' + (IMPLICIT_ROLES[role] ? ', ' + IMPLICIT_ROLES[role] : '');
+            var nodes = document.querySelectorAll(css);
+            for (var i=0; i<nodes.length; i++) {{
+                if (!name) return nodes[i];
+                var label = norm(nodes[i].getAttribute('aria-label') || nodes[i].innerText || nodes[i].title);
+                if (label.indexOf(name) !== -1) return nodes[i];
+            }}
+            return null;
+        }}
+
+        function run(s) {{
+            if (s.xpath) return byXPath(s.xpath);
+            if (s.css) return byCss(s.css);
+            if (s.text) return byText(s.text, s.tag, s.match);
+            if (s.role) return byRole(s.role, s.name);
+            return null;
+        }}
+
+        function strategyName(s, index) {{
+            var kind = s.xpath ? 'xpath' : s.css ? 'css' : s.text ? 'text' : 'role';
+            return index + ':' + kind;
+        }}
+
+        function entry(name) {{
+            return stats[name] || (stats[name] = {{ "hits": {{}}, "cached": 0, "misses": 0, "ms": 0, "last": null }});
+        }}
+
+        function resolve(name) {{
+            // Mutations made earlier in the same script have not reached the observer callback yet
+            if (observer.takeRecords().length) invalidate();
+
+            var st = entry(name);
+            if (name in cache) {{
+                var node = cache[name];
+                if (node ? node.isConnected : cacheVersion[name] === version) {{
+                    st.cached++;
+                    return node;
+                }}
+            }}
+
+            var strategies = REGISTRY[name] || [];
+            var t0 = performance.now();
+            for (var i=0; i<strategies.length; i++) {{
+                var found = run(strategies[i]);
+                if (found) {{
+                    var label = strategyName(strategies[i], i);
+                    st.hits[label] = (st.hits[label] || 0) + 1;
+                    st.ms += performance.now() - t0;
+                    st.last = label;
+                    cache[name] = found;
+                    return found;
+                }}
+            }}
+            st.misses++;
+            st.ms += performance.now() - t0;
+            st.last = null;
+            cache[name] = null;
+            cacheVersion[name] = version;
+            return null;
+        }}
+
+        return {{
+            "resolve": resolve,
+            "invalidate": invalidate,
+            "stats": function() {{ return JSON.stringify(stats); }}
+        }};
+    }})();
+}}
+function sel(name) {{
+    return window.__korailSelectors.resolve(name);
+}}
+"""
+
+# 선택자 통계 조회 스크립트 (JSON 문자열 반환, 설치 전이면 null)
+SELECTOR_STATS_JS = "window.__korailSelectors ? window.__korailSelectors.stats() : null"
+
+
+def format_selector_stats(stats_json):
+    """
+    Summarizes the page's selector stats, one line per target.
+    Targets resolved by a fallback strategy are marked so the primary XPath can be updated.
+    """
+    try:
+        stats = json.loads(stats_json) if stats_json else {}
+    except (TypeError, ValueError):
+        return []
+
+    lines = []
+    for name, st in sorted(stats.items()):
+        hits = ", ".join(f"{label}={count}" for label, count in sorted(st.get("hits", {}).items()))
+        fallback = any(not label.startswith("0:") for label in st.get("hits", {}))
+        lines.append(
+            f"{name}: {hits or '-'} cached={st.get('cached', 0)} misses={st.get('misses', 0)} "
+            f"{st.get('ms', 0):.1f}ms{' (fallback)' if fallback else ''}"
+        )
+    return lines
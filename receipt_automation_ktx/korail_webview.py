@@ -1,15 +1,64 @@
 import webview
 import threading
-import time
 import os
+import time
 
 # Define the target URLs
-LOGIN_URL = "https://www.korail.com/ticket/login"
-MAIN_PAGE_URL = "https://www.korail.com/ticket/main"
-RECEIPT_PAGE_URL = "https://www.korail.com/ticket/mypage/ticketInfo/receipt"
+# KORAIL_BASE_URL points the automation at another host (e.g. the offline_replay fixture server)
+KORAIL_BASE_URL = os.environ.get("KORAIL_BASE_URL", "https://www.korail.com")
+LOGIN_URL = f"{KORAIL_BASE_URL}/ticket/login"
+MAIN_PAGE_URL = f"{KORAIL_BASE_URL}/ticket/main"
+RECEIPT_PAGE_URL = f"{KORAIL_BASE_URL}/ticket/mypage/ticketInfo/receipt"
+
+# Receipt key helpers (shared by the extraction and print scripts)
+# Each '.tckList' row is tagged once with a stable key derived from its content
+# (date, train, journey, price), so the print step can find it with a single attribute lookup.
+JS_RECEIPT_KEY_HELPERS = """
+function receiptKeyBase(item) {
+    function txt(sel) {
+        var el = item.querySelector(sel);
+        return el ? el.innerText.replace(/\\s+/g, ' ').trim() : '';
+    }
+    var price = '';
+    var allEls = item.querySelectorAll('*');
+    for (var k=0; k<allEls.length; k++) {
+        if (allEls[k].children.length === 0 && allEls[k].innerText.includes('원')) {
+            price = allEls[k].innerText.trim();
+            break;
+        }
+    }
+    return [txt('.dt'), txt('.tit_box .flag_wrap'), txt('.data_box h3'), price].join('|');
+}
+
+function receiptKeyHash(str) {
+    // FNV-1a (32bit)
+    var h = 0x811c9dc5;
+    for (var i=0; i<str.length; i++) {
+        h ^= str.charCodeAt(i);
+        h = Math.imul(h, 0x01000193) >>> 0;
+    }
+    return ('0000000' + h.toString(16)).slice(-8);
+}
+
+// Tags every row with data-receipt-key. Identical rows get an occurrence suffix (-2, -3, ...).
+function tagReceiptKeys(listItems) {
+    var seen = {};
+    for (var i=0; i<listItems.length; i++) {
+        var key = 'r' + receiptKeyHash(receiptKeyBase(listItems[i]));
+        seen[key] = (seen[key] || 0) + 1;
+        if (seen[key] > 1) key += '-' + seen[key];
+        listItems[i].setAttribute('data-receipt-key', key);
+    }
+}
+"""
 
-import korail_xpath
 import json
+from korail_bridge import KorailBridge, CAPTURE_STREAM_JS
+from korail_selectors import SELECTOR_JS, SELECTOR_STATS_JS, format_selector_stats
+from korail_assets import HTML2CANVAS_URL, html2canvas_integrity, load_html2canvas
+import common_path  # repo root on sys.path (receipt_common)
+from receipt_common.receipt_ledger import ReceiptLedger
+from receipt_common.run_trace import default_trace_path
 
 import datetime
 
@@ -17,520 +66,718 @@ def log_message(msg):
     timestamp = datetime.datetime.now().strftime("%H:%M:%S")
     print(f"[{timestamp}] {msg}")
 
-def monitor_logic(window, start_date, end_date, save_path):
+# Monitor states
+STATE_WAIT_LOGIN = "WAIT_LOGIN"
+STATE_SEARCH = "SEARCH"
+STATE_PROCESS = "PROCESS"
+STATE_DONE = "DONE"
+
+# 페이지에서 아무 알림이 없을 때 상태를 다시 확인하는 주기 (초)
+# 정상 흐름은 KorailBridge 알림으로 즉시 진행되며, 이 값은 알림 누락 시의 안전장치입니다.
+IDLE_TIMEOUT = 5
+
+# 조회 버튼을 모든 선택자 전략으로 찾지 못한 상태가 이 시간(초) 이상 지속되면 재시도를 멈춥니다.
+MISSING_TARGET_TIMEOUT = 30
+
+class KorailMonitor:
     """
-    Monitors the current URL and checks for login status on the main page.
+    Event-driven state machine for the Korail receipt flow.
+    The page pushes state changes through KorailBridge; each fixed sleep of the old
+    polling loop is now an upper bound that ends as soon as the expected change arrives.
     """
-    log_message("Monitor logic started. Waiting for window initialization...")
-    time.sleep(2)
-    
-    log_message(f"Target Range: {start_date} ~ {end_date}")
 
-    # Using manual login now, so we just monitor for main page and receipt page.
-    log_message("Waiting for manual login...")
-    
-    recepit_automation_done = False
-    receipt_queue = [] # Queue of details to process
-    current_processing_index = -1
-    capture_started_index = -1 # Track if we triggered capture for current item
-    
-    # Pre-load html2canvas (will be injected when needed)
-    HTML2CANVAS_URL = "https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"
-    html2canvas_script = None 
-    
-    try:
-        import requests
-        resp = requests.get(HTML2CANVAS_URL)
-        if resp.status_code == 200:
-            html2canvas_script = resp.text
-            log_message("html2canvas script loaded in memory.")
+    def __init__(self, window, bridge, start_date, end_date, save_path, batch_size=1, ledger=None, trace_path=None):
+        self.window = window
+        self.bridge = bridge
+        self.start_date = start_date
+        self.end_date = end_date
+        self.save_path = save_path
+        self.batch_size = max(1, batch_size) # Receipts printed together in one modal
+        self.ledger = ledger # Skips receipts captured in earlier runs (None = capture everything)
+        self.trace = bridge.trace # Per-phase spans of this run
+        self.trace_path = trace_path # Where the trace is written when the run ends (None = not written)
+        self.login_span = None # Open span from window init until the receipt page is reached
+        self.batch_span = None # Open span from the print click until the batch is finished
+
+        self.state = STATE_WAIT_LOGIN
+        self.receipt_queue = [] # Queue of receipt keys to process
+        self.receipt_index = {} # receipt key -> details
+        self.current_processing_index = 0
+        self.loading_done = False # True once no further "더보기" pages are needed
+        self.batch_keys = [] # Receipt keys shown in the currently open print modal
+        self.batch_pos = 0 # Index of the receipt being captured within the batch
+        self.capture_token = None # Bridge capture stream of the current receipt (None = not started)
+        self.missing_since = None # monotonic time the search buttons were first not found
+
+        # Pre-load html2canvas (will be injected when needed)
+        self.html2canvas_script = None
+        self.html2canvas_generation = -1 # Document generation that already has html2canvas
+
+    def run(self):
+        log_message("Monitor logic started. Waiting for window initialization...")
+        self.bridge.wait_for(lambda s: bool(s), 2, 'window_init')
+        self.login_span = self.trace.begin('login')
+
+        log_message(f"Target Range: {self.start_date} ~ {self.end_date}")
+
+        # Using manual login now, so we just monitor for main page and receipt page.
+        log_message("Waiting for manual login...")
+
+        self.html2canvas_script = load_html2canvas(log=log_message)
+        if self.html2canvas_script:
+            log_message("html2canvas script loaded from disk cache.")
         else:
-            log_message("Failed to download html2canvas. Screenshot might fail.")
-    except ImportError:
-        log_message("Request module missing? Will try to inject via script tag if possible, or fail.")
-        html2canvas_script = None
+            log_message("html2canvas unavailable locally. Will inject via CDN script tag.")
 
-    while True:
-        try:
-            current_url = window.get_current_url()
-            
-            # --- Main Page Logic ---
-            if current_url == MAIN_PAGE_URL:
-                js_chk = f"""
+        while self.state != STATE_DONE:
+            try:
+                previous_state = self.state
+                self._tick(self.window.get_current_url())
+                if self.state == STATE_DONE:
+                    break
+                if self.state != previous_state:
+                    # Internal transition (e.g. SEARCH -> PROCESS): the next step needs no page event
+                    continue
+                # 다음 상태 변화 알림까지 대기 (폴링 없음) - 이미 도착한 알림이 있으면 바로 반환
+                self.bridge.wait(IDLE_TIMEOUT)
+
+            except Exception as e:
+                log_message(f"Error in monitoring loop: {e}")
+                self.bridge.wait(1)
+
+        self._save_trace()
+
+    def _ensure_html2canvas(self):
+        """
+        Injects html2canvas once per document as a persistent <script> element.
+        The script survives modal open/close cycles, so it is never re-sent for a document
+        that already has it (documents are counted by the bridge's page-load generation).
+        """
+        generation = self.bridge.generation
+        if self.html2canvas_generation == generation:
+            return True
+
+        if not self.window.evaluate_js("typeof html2canvas !== 'undefined'"):
+            self.bridge.clear_signal('html2canvas_loaded')
+            if self.html2canvas_script:
+                js_inject = f"""
                 (function() {{
-                    var result = document.evaluate('{korail_xpath.MAIN_LOGOUT_LINK}', document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-                    return result.singleNodeValue ? result.singleNodeValue.innerText : null;
+                    var script = document.createElement('script');
+                    script.id = 'korail-html2canvas';
+                    script.textContent = {json.dumps(self.html2canvas_script)};
+                    document.head.appendChild(script);
+                    return typeof html2canvas !== 'undefined';
                 }})()
                 """
-                text_content = window.evaluate_js(js_chk)
-                
-                if text_content and "로그아웃" in text_content:
-                    log_message(f"로그인 성공 확인 ('{text_content}'). 영수증 페이지로 이동합니다...")
-                    window.load_url(RECEIPT_PAGE_URL)
-                    time.sleep(2) # 네비게이션 대기 (속도 개선)
-            
-            # --- Receipt Page Logic ---
-            if current_url and current_url.startswith(RECEIPT_PAGE_URL) and not recepit_automation_done:
-                # If we are processing the queue, don't re-run the search logic
-                if len(receipt_queue) > 0 and current_processing_index < len(receipt_queue):
-                    # We are in the loop, logic handled below
-                    pass
-                else: 
-                     # Wait for load
-                    ready_state = window.evaluate_js("document.readyState")
-                    if ready_state != 'complete':
-                        time.sleep(1)
-                        continue
-                    
-                    # Logic: Click '1 Month' -> Inquiry -> Load All Pages -> Parse Results -> Filter '인쇄완료' -> Return Details
-                    js_receipt = f"""
-                    (function() {{
-                        function getOne(xpath) {{
-                            try {{
-                                var res = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-                                return res.singleNodeValue;
-                            }} catch (e) {{
-                                return null;
-                            }}
-                        }}
+                self.window.evaluate_js(js_inject)
+            else:
+                # Try script tag injection (the browser checks the pinned hash for the default URL)
+                js_inject_cdn = f"""
+                (function() {{
+                    var script = document.createElement('script');
+                    script.id = 'korail-html2canvas';
+                    var integrity = {json.dumps(html2canvas_integrity())};
+                    if (integrity) {{
+                        script.integrity = integrity;
+                        script.crossOrigin = 'anonymous';
+                    }}
+                    script.src = "{HTML2CANVAS_URL}";
+                    script.onload = function() {{
+                        if (window.__korailBridge) window.__korailBridge.send('html2canvas_loaded');
+                    }};
+                    document.head.appendChild(script);
+                }})()
+                """
+                self.window.evaluate_js(js_inject_cdn)
+                self.bridge.wait_signal('html2canvas_loaded', 5)
 
-                        var btn1MonthNode = getOne("{korail_xpath.RECEIPT_1MONTH_BTN}");
-                        var btnInquiry = getOne("{korail_xpath.RECEIPT_INQUIRY_BTN}");
-                        
-                        if (!btn1MonthNode || !btnInquiry) return 'MISSING_BUTTONS';
-                        
-                        // 1. Initial Search Click
-                        if (!window.receiptSearchClicked) {{
-                            // Click logic: try child button/a, else self
-                            var clickable = btn1MonthNode.querySelector('button, a') || btn1MonthNode;
-                            clickable.click();
-                            
-                            window.receiptSearchClicked = true;
-                            // Use string for setTimeout to avoid scope issues in strict mode if any
-                            setTimeout(function() {{ btnInquiry.click(); }}, 500);
-                            return 'CLICKED_SEARCH';
-                        }}
-                        
-                        // 2. Load All Pages (Click "More" until gone)
-                        var moreBtn = getOne("{korail_xpath.RECEIPT_MORE_BTN}");
-                        
-                        if (moreBtn) {{
-                            moreBtn.click();
-                            return 'LOADING_MORE';
-                        }}
-                        
-                        // 3. Extraction & Filtering
-                        var listItems = document.querySelectorAll('.tckList');
-                        
-                        // Debug Container
-                        var resultContainer = getOne("{korail_xpath.RECEIPT_RESULT_LIST}");
-                        
-                        if (listItems.length === 0) {{
-                             if (resultContainer) {{
-                                 return 'DEBUG_HTML|||' + resultContainer.outerHTML; 
-                             }}
-                             return 'WAITING_RESULTS';
-                        }}
-                        
-                        var targetStart = parseInt('{start_date}');
-                        var targetEnd = parseInt('{end_date}');
-                        var matchedItems = [];
-                        
-                        for (var i=0; i<listItems.length; i++) {{
-                            var item = listItems[i];
-                            
-                            // Filter: Must contain '인쇄완료'
-                            if (!item.innerText.includes('인쇄완료')) {{
-                                continue;
-                            }}
-                            
-                            var dtSpan = item.querySelector('.dt');
-                            if (!dtSpan) continue;
-                            
-                            var txt = dtSpan.innerText;
-                            var parts = txt.match(/(\d{{4}})년\s*(\d{{2}})월\s*(\d{{2}})일/);
-                            if (!parts) continue;
-                            
-                            var dateNum = parseInt(parts[1] + parts[2] + parts[3]);
-                            
-                            if (dateNum >= targetStart && dateNum <= targetEnd) {{
-                                // Extract Details
-                                var trainInfo = "";
-                                var journeyInfo = "";
-                                var source = "Unknown";
-                                var destination = "Unknown";
-                                var extractionTime = "Unknown";
-                                var price = "Unknown";
-                                
-                                // Train Info (ex: KTX-산천 419)
-                                var trainEl = item.querySelector('.tit_box .flag_wrap');
-                                if (trainEl) trainInfo = trainEl.innerText.replace(/\\s+/g, ' ').trim();
-                                
-                                // Journey Info (ex: 서울 -> 부산(13:30 ~ 15:34))
-                                var journeyEl = item.querySelector('.data_box h3');
-                                if (journeyEl) {{
-                                    journeyInfo = journeyEl.innerText.replace(/\\s+/g, ' ').trim();
-                                    
-                                    // Standardize arrow and parse
-                                    var safeJourney = journeyInfo.replace('→', '->');
-                                    var splitArrow = safeJourney.split('->');
-                                    
-                                    if (splitArrow.length >= 2) {{
-                                        source = splitArrow[0].trim();
-                                        
-                                        var rightPart = splitArrow[1].trim();
-                                        // rightPart ex: "부산 (12:30 ~ 15:34) 어른"
-                                        
-                                        var parenSplit = rightPart.split('(');
-                                        if (parenSplit.length >= 2) {{
-                                            destination = parenSplit[0].trim();
-                                            
-                                            // content inside parens: "13:30 ~ 15:34) 어른"
-                                            var timeBlob = parenSplit[1];
-                                            if (timeBlob.includes(')')) {{
-                                                extractionTime = timeBlob.split(')')[0].trim();
-                                            }} else {{
-                                                extractionTime = timeBlob.trim();
-                                            }}
-                                        }} else {{
-                                            destination = rightPart;
-                                        }}
-                                    }}
-                                }}
-                                
-                                // Price extraction (find element containing '원' and no children)
-                                var allEls = item.querySelectorAll('*');
-                                for (var k=0; k<allEls.length; k++) {{
-                                    if (allEls[k].children.length === 0 && allEls[k].innerText.includes('원')) {{
-                                        price = allEls[k].innerText.trim();
-                                        break;
-                                    }}
+            if not self.window.evaluate_js("typeof html2canvas !== 'undefined'"):
+                return False
+
+        self.html2canvas_generation = generation
+        return True
+
+    def _tick(self, current_url):
+        # --- Main Page Logic ---
+        if current_url == MAIN_PAGE_URL:
+            self._check_login()
+
+        # --- Receipt Page Logic ---
+        if current_url and current_url.startswith(RECEIPT_PAGE_URL) and self.state == STATE_WAIT_LOGIN:
+            self.trace.end(self.login_span)
+            self.state = STATE_SEARCH
+
+        if self.state == STATE_SEARCH and current_url and current_url.startswith(RECEIPT_PAGE_URL):
+            self._search_step()
+
+        # --- Processing Queue Loop ---
+        if self.state == STATE_PROCESS:
+            if self.current_processing_index < len(self.receipt_queue):
+                self._process_step(current_url)
+
+            if self.current_processing_index >= len(self.receipt_queue):
+                if self.loading_done:
+                    log_message("모든 영수증 처리가 완료되었습니다.")
+                    self._log_selector_stats()
+                    self.state = STATE_DONE
+                    self._save_trace() # The monitor thread ends with the window
+                    self.window.destroy()  # Auto-close window
+                else:
+                    # Queue drained while more pages may still hold receipts in range
+                    self.state = STATE_SEARCH
+
+    def _log_selector_stats(self):
+        """Logs which strategy resolved each target (and how long it took), then the wait totals."""
+        try:
+            lines = format_selector_stats(self.window.evaluate_js(SELECTOR_STATS_JS))
+        except Exception:
+            lines = []
+        if lines:
+            log_message("선택자 통계 (대상: 전략=횟수, 캐시 적중, 실패, 누적 시간):")
+            for line in lines:
+                log_message(f"  {line}")
+        if self.bridge.waits.records:
+            log_message("대기 통계:")
+            for line in self.bridge.waits.summary():
+                log_message(f"  {line}")
+
+    def _save_trace(self):
+        """Writes the run trace once (Chrome trace .json or .jsonl, by extension) and logs the phase totals."""
+        if not self.trace_path:
+            return
+        try:
+            path = self.trace.save(self.trace_path)
+        except OSError as e:
+            log_message(f"트레이스 저장 실패: {e}")
+        else:
+            log_message(f"실행 트레이스 저장: {path}")
+            for line in self.trace.summary():
+                log_message(f"  {line}")
+        self.trace_path = None
+
+    def _check_login(self):
+        js_chk = f"""
+        (function() {{
+            {SELECTOR_JS}
+            var logout = sel('MAIN_LOGOUT_LINK');
+            return logout ? logout.innerText : null;
+        }})()
+        """
+        text_content = self.window.evaluate_js(js_chk)
+
+        if text_content and "로그아웃" in text_content:
+            log_message(f"로그인 성공 확인 ('{text_content}'). 영수증 페이지로 이동합니다...")
+            self.window.load_url(RECEIPT_PAGE_URL)
+            # 네비게이션 대기: 영수증 페이지 URL이 보고되는 즉시 진행
+            self.bridge.wait_for(lambda s: s.get('url', '').startswith(RECEIPT_PAGE_URL), 2, 'receipt_page')
+
+    def _search_step(self):
+        start_date = self.start_date
+        end_date = self.end_date
+
+        # Wait for load
+        ready_state = self.window.evaluate_js("document.readyState")
+        if ready_state != 'complete':
+            self.bridge.wait_for(lambda s: s.get('ready') == 'complete', 1, 'document_ready')
+            return
+
+        # Logic: Click '1 Month' -> Inquiry -> Parse each loaded page -> Filter '인쇄완료' -> Return Details
+        # Pages are parsed as they load ("더보기"), and matched items are queued for capture right away.
+        # Since the list is ordered by date (newest first), loading stops once the oldest row is before start_date.
+        js_receipt = f"""
+        (function() {{
+            {JS_RECEIPT_KEY_HELPERS}
+            {SELECTOR_JS}
+
+            var btn1MonthNode = sel('RECEIPT_1MONTH_BTN');
+            var btnInquiry = sel('RECEIPT_INQUIRY_BTN');
+
+            if (!btn1MonthNode || !btnInquiry) {{
+                var missing = [];
+                if (!btn1MonthNode) missing.push('RECEIPT_1MONTH_BTN');
+                if (!btnInquiry) missing.push('RECEIPT_INQUIRY_BTN');
+                return 'MISSING_BUTTONS|||' + missing.join(',');
+            }}
+
+            // 1. Initial Search Click
+            if (!window.receiptSearchClicked) {{
+                // Click logic: try child button/a, else self
+                var clickable = btn1MonthNode.querySelector('button, a') || btn1MonthNode;
+                clickable.click();
+
+                window.receiptSearchClicked = true;
+                // Use string for setTimeout to avoid scope issues in strict mode if any
+                setTimeout(function() {{ btnInquiry.click(); }}, 500);
+                return 'CLICKED_SEARCH';
+            }}
+
+            // 2. Extraction & Filtering of the rows loaded since the last call
+            var listItems = document.querySelectorAll('.tckList');
+
+            // Debug Container
+            var resultContainer = sel('RECEIPT_RESULT_LIST');
+
+            if (listItems.length === 0) {{
+                 if (resultContainer) {{
+                     return 'DEBUG_HTML|||' + resultContainer.outerHTML;
+                 }}
+                 return 'WAITING_RESULTS';
+            }}
+
+            var targetStart = parseInt('{start_date}');
+            var targetEnd = parseInt('{end_date}');
+            var matchedItems = [];
+            var parsedCount = 0;
+            var oldestDate = null;
+
+            // Tag each row once; the print step looks rows up by this key
+            tagReceiptKeys(listItems);
+
+            for (var i=0; i<listItems.length; i++) {{
+                var item = listItems[i];
+
+                // Skip rows parsed on a previous page
+                if (item.hasAttribute('data-receipt-parsed')) continue;
+                item.setAttribute('data-receipt-parsed', '1');
+                parsedCount++;
+
+                var dtSpan = item.querySelector('.dt');
+                if (!dtSpan) continue;
+
+                var txt = dtSpan.innerText;
+                var parts = txt.match(/(\d{{4}})년\s*(\d{{2}})월\s*(\d{{2}})일/);
+                if (!parts) continue;
+
+                var dateNum = parseInt(parts[1] + parts[2] + parts[3]);
+                if (oldestDate === null || dateNum < oldestDate) oldestDate = dateNum;
+
+                // Filter: Must contain '인쇄완료'
+                if (!item.innerText.includes('인쇄완료')) {{
+                    continue;
+                }}
+
+                if (dateNum >= targetStart && dateNum <= targetEnd) {{
+                    // Extract Details
+                    var trainInfo = "";
+                    var journeyInfo = "";
+                    var source = "Unknown";
+                    var destination = "Unknown";
+                    var extractionTime = "Unknown";
+                    var price = "Unknown";
+
+                    // Train Info (ex: KTX-산천 419)
+                    var trainEl = item.querySelector('.tit_box .flag_wrap');
+                    if (trainEl) trainInfo = trainEl.innerText.replace(/\\s+/g, ' ').trim();
+
+                    // Journey Info (ex: 서울 -> 부산(13:30 ~ 15:34))
+                    var journeyEl = item.querySelector('.data_box h3');
+                    if (journeyEl) {{
+                        journeyInfo = journeyEl.innerText.replace(/\\s+/g, ' ').trim();
+
+                        // Standardize arrow and parse
+                        var safeJourney = journeyInfo.replace('→', '->');
+                        var splitArrow = safeJourney.split('->');
+
+                        if (splitArrow.length >= 2) {{
+                            source = splitArrow[0].trim();
+
+                            var rightPart = splitArrow[1].trim();
+                            // rightPart ex: "부산 (12:30 ~ 15:34) 어른"
+
+                            var parenSplit = rightPart.split('(');
+                            if (parenSplit.length >= 2) {{
+                                destination = parenSplit[0].trim();
+
+                                // content inside parens: "13:30 ~ 15:34) 어른"
+                                var timeBlob = parenSplit[1];
+                                if (timeBlob.includes(')')) {{
+                                    extractionTime = timeBlob.split(')')[0].trim();
+                                }} else {{
+                                    extractionTime = timeBlob.trim();
                                 }}
-                                
-                                matchedItems.push({{
-                                    "date": parts[0],
-                                    "source": source,
-                                    "destination": destination,
-                                    "time": extractionTime,
-                                    "price": price,
-                                    "train": trainInfo
-                                }});
+                            }} else {{
+                                destination = rightPart;
                             }}
                         }}
-                        
-                        if (matchedItems.length > 0) {{
-                            return 'MATCHED_DETAILS|||' + JSON.stringify(matchedItems);
-                        }}
-                        
-                        // If we found 'in-print' items but couldn't extract details, or found nothing matching date...
-                        // Return container HTML to debug why parsing failed or logic skipped
-                        if (resultContainer) {{
-                             return 'DEBUG_HTML|||' + resultContainer.outerHTML; 
+                    }}
+
+                    // Price extraction (find element containing '원' and no children)
+                    var allEls = item.querySelectorAll('*');
+                    for (var k=0; k<allEls.length; k++) {{
+                        if (allEls[k].children.length === 0 && allEls[k].innerText.includes('원')) {{
+                            price = allEls[k].innerText.trim();
+                            break;
                         }}
-                        
-                        return 'NO_MATCHES';
-                    }})()
-                    """
-                    
-                    result = window.evaluate_js(js_receipt)
-                    
-                    if result == 'CLICKED_SEARCH':
-                        log_message("'1개월' 버튼과 '조회' 버튼을 클릭했습니다. 결과를 기다리는 중...")
-                        time.sleep(2)
-                    elif result == 'LOADING_MORE':
-                        log_message("'더보기' 버튼을 찾았습니다. 다음 페이지 로드 중...")
-                        time.sleep(1.5)
-                    elif result and result.startswith('DEBUG_HTML|||'):
-                        html_content = result.split('DEBUG_HTML|||')[1]
-                        log_message("!!! 디버그 HTML 캡처됨 !!!")
-                        log_message("아래 내용을 복사해서 공유해주세요:")
-                        log_message(html_content)
-                        log_message("!!! 디버그 HTML 종료 !!!")
-                        recepit_automation_done = True 
-                    elif result == 'CLICKED_MORE':
-                        log_message("현재 화면에 매칭 항목 없음. '더보기' 클릭. 추가 결과 대기 중...")
-                        time.sleep(2)
-                    elif result and result.startswith('MATCHED_DETAILS|||'):
-                        json_str = result.split('MATCHED_DETAILS|||')[1]
-                        try:
-                            details = json.loads(json_str)
-                            log_message(f"기간 내 영수증 {len(details)}개 선택됨 ({start_date}~{end_date}):")
-                            log_message("----------------------------------------")
-                            for item in details:
-                                log_message(f" > 날짜: {item.get('date')}, 시간: {item.get('time')}")
-                                log_message(f"   열차: {item.get('train')}")
-                                log_message(f"   여정: {item.get('source')} -> {item.get('destination')}")
-                                log_message(f"   가격: {item.get('price')}")
-                                log_message("----------------------------------------")
-                        except Exception as e:
-                            log_message(f"항목을 선택했으나 상세 정보 파싱 실패: {e}")
-                            
-                        # Instead of finishing, start processing queue
-                        if details:
-                             receipt_queue = details
-                             current_processing_index = 0
-                             log_message(f"총 {len(receipt_queue)}개의 영수증 처리를 시작합니다. 하나씩 인쇄 및 저장합니다...")
-                        else:
-                             recepit_automation_done = True
-
-                    elif result and result.startswith('NO_MATCHES'):
-                        debug_info = ""
-                        if '|||' in result:
-                            debug_info = result.split('|||')[1]
-                        log_message(f"검색 완료. 지정된 날짜 범위 내 영수증이 없습니다. 디버그(처음 5개 상태): {debug_info}")
-                        recepit_automation_done = True
-                    elif result == 'MISSING_BUTTONS':
-                         log_message("조회 버튼이나 기간 설정 버튼을 찾을 수 없습니다.")
-                    else:
-                         pass
-            
-            # --- Processing Queue Loop ---
-            if len(receipt_queue) > 0 and current_processing_index < len(receipt_queue):
-                 item = receipt_queue[current_processing_index]
-                 
-                 # Step 1: Select Item and Open Print (Hijack window.open)
-                 # We need to target the specific item by index in the list.
-                 # The 'details' we got might not have index, so we assume order matches.
-                 # Actually, let's just use the index `current_processing_index` and map it to DOM.
-                 # BUT, we filtered by '인쇄완료'. We need to know which DOM index corresponds to this item.
-                 # To simplify, we will re-scan DOM for '인쇄완료' and pick the N-th one.
-                 
-                 js_process = f"""
-                 (function() {{
-                     // Suppress print dialog
-                     window.print = function() {{ console.log('Print dialog suppressed'); }};
-
-                     var listItems = document.querySelectorAll('.tckList');
-                     var targetIndex = -1;
-                     var matchCount = 0;
-                     var targetStart = parseInt('{start_date}');
-                     var targetEnd = parseInt('{end_date}');
-                     
-                     for (var i=0; i<listItems.length; i++) {{
-                         var item = listItems[i];
-
-                         // 1. Check '인쇄완료'
-                         if (!item.innerText.includes('인쇄완료')) {{
-                             continue;
-                         }}
-
-                         // 2. Check Date (Same logic as extraction)
-                         var dtSpan = item.querySelector('.dt');
-                         if (!dtSpan) continue;
-                         
-                         var txt = dtSpan.innerText;
-                         var parts = txt.match(/(\d{{4}})년\s*(\d{{2}})월\s*(\d{{2}})일/);
-                         if (!parts) continue;
-                         
-                         var dateNum = parseInt(parts[1] + parts[2] + parts[3]);
-                         
-                         if (dateNum < targetStart || dateNum > targetEnd) {{
-                             continue;
-                         }}
-
-                         // If passed both filters, it counts as a match
-                         if (matchCount === {current_processing_index}) {{
-                             targetIndex = i;
-                             break;
-                         }}
-                         matchCount++;
-                     }}
-                     
-                     if (targetIndex === -1) return 'ITEM_NOT_FOUND';
-                     
-                     // Uncheck all first
-                     var allChecks = document.querySelectorAll('input[type="checkbox"]');
-                     for (var i=0; i<allChecks.length; i++) allChecks[i].checked = false;
-                     
-                     // Check target
-                     var targetItem = listItems[targetIndex];
-                     var chk = targetItem.querySelector('input[type="checkbox"]');
-                     if (chk) chk.click(); // Click to trigger events? or just checked=true
-                     if (chk && !chk.checked) chk.checked = true;
-                     
-                     // Hijack window.open just in case, but keep in same window
-                     window.open = function(url, name, specs) {{
-                         // If it's a URL, we might want to follow it OR just let the modal appear if it's in-page.
-                         // User report suggests 'modal appears'. If it's a real popup, window.open is used.
-                         // We will redirect SELF to the URL if it's not empty.
-                         if (url) window.location.href = url;
-                         return window;
-                     }};
-                     
-                     // Click Print Button
-                     var printBtn = document.evaluate("{korail_xpath.RECEIPT_PRINT_BTN}", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                     if (printBtn) {{
-                         printBtn.click();
-                         return 'CLICKED_PRINT';
-                     }}
-                     return 'PRINT_BTN_NOT_FOUND';
-                 }})()
-                 """
-                 
-                 # Only run this if we are on the LIST page (RECEIPT_PAGE_URL)
-                 if current_url.startswith(RECEIPT_PAGE_URL):
-                     res_proc = window.evaluate_js(js_process)
-                     if res_proc == 'CLICKED_PRINT':
-                         log_message(f"영수증 {current_processing_index+1}/{len(receipt_queue)} 선택 및 인쇄 클릭. 모달 대기...")
-                         time.sleep(2) 
-                     elif res_proc == 'ITEM_NOT_FOUND':
-                         log_message("처리할 항목을 DOM에서 찾을 수 없습니다. (인덱스 불일치?)")
-                         current_processing_index += 1 # Skip
-                     else:
-                         pass
-                 
-                 # Step 2: Check for Modal and Save
-                 # We simply check if the Modal Area exists in the current DOM (whether redirected or not)
-                 js_check_modal = f"""
-                 (function() {{
-                     var modalEntry = document.evaluate("{korail_xpath.RECEIPT_MODAL_AREA}", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                     return modalEntry ? 'FOUND' : 'NOT_FOUND';
-                 }})()
-                 """
-                 modal_status = window.evaluate_js(js_check_modal)
-                 
-                 if modal_status == 'FOUND':
-                     # Ensure html2canvas is loaded
-                     # Retry download if needed
-                     if not html2canvas_script:
-                         try:
-                             import requests
-                             resp = requests.get(HTML2CANVAS_URL)
-                             if resp.status_code == 200:
-                                 html2canvas_script = resp.text
-                         except:
-                             pass
-
-                     # Injection Loop
-                     for _ in range(5):
-                         js_check_h2c = "typeof html2canvas !== 'undefined'"
-                         is_loaded = window.evaluate_js(js_check_h2c)
-                         if is_loaded:
-                             break
-                         
-                         if html2canvas_script:
-                             # Try evaluate
-                             window.evaluate_js(html2canvas_script)
-                         else:
-                             # Try script tag injection
-                             js_inject_cdn = f"""
-                             var script = document.createElement('script');
-                             script.src = "{HTML2CANVAS_URL}";
-                             document.head.appendChild(script);
-                             """
-                             window.evaluate_js(js_inject_cdn)
-                         
-                         time.sleep(1)
-                     
-                     # Final Check
-                     if not window.evaluate_js("typeof html2canvas !== 'undefined'"):
-                         log_message("html2canvas 라이브러리 로드 실패. 캡처를 건너뜁니다.")
-                         current_processing_index += 1
-                         continue
-
-                     # Construct Filename
-                     
-                     # Construct Filename
-                     d = item.get('date', '0000년00월00일')
-                     # Change yyyy -> yy
-                     if len(d) >= 4 and d[:4].isdigit():
-                         d = d[2:]
-                     d = d.replace(" ", "")
-                     
-                     t = item.get('time', '00:00')
-                     # Change HH:MM ~ HH:MM -> HHMM-HHMM
-                     safe_time = t.replace(":", "").replace("~", "-").replace(" ", "")
-                     
-                     src = item.get('source', 'Unknown')
-                     dst = item.get('destination', 'Unknown')
-                     prc = item.get('price', '0').replace(",", "").replace("원", "")
-                     
-                     filename = f"ktx_{d}({safe_time})_{src}_{dst}_{prc}.png"
-                     filename = "".join([c for c in filename if c.isalnum() or c in (' ', '.', '_', '(', ')', '-')]).strip()
-                     full_save_path = os.path.join(save_path, filename)
-                     
-                     # Capture Logic with Polling
-                     # 1. Trigger Capture if not started
-                     if capture_started_index != current_processing_index:
-                         log_message(f"이미지 생성 요청: {filename}")
-                         
-                         js_trigger = f"""
-                         (function() {{
-                             window._captureResult = null;
-                             window._captureDone = false;
-                             
-                             var target = document.evaluate("{korail_xpath.RECEIPT_MODAL_AREA}", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                             if (!target) {{
-                                 window._captureResult = "ERROR:Target element not found";
-                                 window._captureDone = true;
-                                 return;
-                             }}
-                             
-                             html2canvas(target).then(canvas => {{
-                                 window._captureResult = canvas.toDataURL('image/png');
-                                 window._captureDone = true;
-                             }}).catch(err => {{
-                                 window._captureResult = 'ERROR:' + err;
-                                 window._captureDone = true;
-                             }});
-                         }})()
-                         """
-                         window.evaluate_js(js_trigger)
-                         capture_started_index = current_processing_index
-                     
-                     # 2. Poll for Result
-                     base64_data = window.evaluate_js("window._captureResult")
-                     
-                     if base64_data and base64_data.startswith('data:image/png;base64,'):
-                         import base64
-                         img_data = base64.b64decode(base64_data.split(',')[1])
-                         
-                         if os.path.exists(full_save_path):
-                             log_message(f"이미 파일이 존재합니다. 덮어쓰기 수행: {full_save_path}")
-
-                         with open(full_save_path, 'wb') as f:
-                             f.write(img_data)
-                         log_message(f"저장 완료: {full_save_path}")
-                         
-                         # Close Modal
-                         log_message("모달 닫기 시도...")
-                         js_close = f"""
-                         (function() {{
-                             var closeBtn = document.evaluate("{korail_xpath.RECEIPT_MODAL_CLOSE_BTN}", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                             if (closeBtn) {{
-                                 closeBtn.click();
-                                 return 'CLICKED_CLOSE';
-                             }}
-                             // Fallback: history back if we navigated?
-                             return 'NO_CLOSE_BTN';
-                         }})()
-                         """
-                         res_close = window.evaluate_js(js_close)
-                         
-                         if res_close == 'NO_CLOSE_BTN':
-                             # If we navigated away, maybe we need to go back
-                             window.evaluate_js("window.history.back()")
-                             
-                         current_processing_index += 1
-                         time.sleep(2) 
-                     elif base64_data and str(base64_data).startswith('ERROR'):
-                         log_message(f"캡처 실패: {base64_data}")
-                         current_processing_index += 1
-                     else:
-                         log_message("캡처 데이터 대기 중... (처리 중)")
-                         time.sleep(1)
-
-            if len(receipt_queue) > 0 and current_processing_index >= len(receipt_queue):
-                log_message("모든 영수증 처리가 완료되었습니다.")
-                recepit_automation_done = True
-                window.destroy()  # Auto-close window
-                break
-                
-            time.sleep(1)
-            
-        except Exception as e:
-            log_message(f"Error in monitoring loop: {e}")
-            time.sleep(1)
+                    }}
+
+                    matchedItems.push({{
+                        "key": item.getAttribute('data-receipt-key'),
+                        "date": parts[0],
+                        "source": source,
+                        "destination": destination,
+                        "time": extractionTime,
+                        "price": price,
+                        "train": trainInfo
+                    }});
+                }}
+            }}
+
+            return 'PAGE|||' + JSON.stringify({{
+                "items": matchedItems,
+                "parsed": parsedCount,
+                "oldest": oldestDate,
+                "more": !!sel('RECEIPT_MORE_BTN')
+            }});
+        }})()
+        """
+
+        with self.trace.span('search_step') as span:
+            result = self.window.evaluate_js(js_receipt)
+            span['result'] = result.split('|||')[0] if result else None
+
+        if result == 'CLICKED_SEARCH':
+            self.missing_since = None
+            log_message("'1개월' 버튼과 '조회' 버튼을 클릭했습니다. 결과를 기다리는 중...")
+            # 결과 리스트가 렌더링되는 즉시 진행
+            self.bridge.wait_for(lambda s: s.get('items', 0) > 0, 2, 'search_results')
+        elif result and result.startswith('DEBUG_HTML|||'):
+            html_content = result.split('DEBUG_HTML|||')[1]
+            log_message("!!! 디버그 HTML 캡처됨 !!!")
+            log_message("아래 내용을 복사해서 공유해주세요:")
+            log_message(html_content)
+            log_message("!!! 디버그 HTML 종료 !!!")
+            self.state = STATE_DONE
+        elif result and result.startswith('PAGE|||'):
+            try:
+                page = json.loads(result.split('PAGE|||')[1])
+            except Exception as e:
+                log_message(f"항목을 선택했으나 상세 정보 파싱 실패: {e}")
+                return
+            self.missing_since = None
+            self._handle_page(page)
+        elif result and result.startswith('MISSING_BUTTONS|||'):
+            missing = result.split('|||')[1]
+            now = time.monotonic()
+            if self.missing_since is None:
+                self.missing_since = now
+                log_message(f"조회 버튼이나 기간 설정 버튼을 찾을 수 없습니다. (대상: {missing}) 페이지 로딩을 기다립니다...")
+            elif now - self.missing_since > MISSING_TARGET_TIMEOUT:
+                # 모든 전략이 실패하면 레이아웃이 바뀐 것으로 보고 무한 재시도 대신 종료
+                log_message(f"{MISSING_TARGET_TIMEOUT}초 동안 대상을 찾지 못했습니다: {missing}")
+                log_message("페이지 구조가 변경되었을 수 있습니다. korail_selectors.py의 선택자를 확인해주세요.")
+                self._log_selector_stats()
+                self.state = STATE_DONE
+        else:
+             pass
+
+    def _handle_page(self, page):
+        details = [item for item in page['items'] if item['key'] not in self.receipt_index]
+        if self.ledger:
+            captured = [item for item in details if self.ledger.is_captured('ktx', item['key'])]
+            for item in captured:
+                log_message(f"이미 저장된 영수증 건너뜀: {item.get('date')} {item.get('source')} -> {item.get('destination')}")
+                self.receipt_index[item['key']] = item
+            details = [item for item in details if item not in captured]
+        if details:
+            log_message(f"기간 내 영수증 {len(details)}개 선택됨 ({self.start_date}~{self.end_date}):")
+            log_message("----------------------------------------")
+            for item in details:
+                log_message(f" > 날짜: {item.get('date')}, 시간: {item.get('time')}")
+                log_message(f"   열차: {item.get('train')}")
+                log_message(f"   여정: {item.get('source')} -> {item.get('destination')}")
+                log_message(f"   가격: {item.get('price')}")
+                log_message("----------------------------------------")
+                self.receipt_index[item['key']] = item
+                self.receipt_queue.append(item['key'])
+
+        # Stop paging once the list reaches dates before the requested range
+        oldest = page.get('oldest')
+        if oldest is not None and oldest < int(self.start_date):
+            if page.get('more'):
+                log_message(f"조회 시작일 이전 항목({oldest})에 도달했습니다. '더보기'를 중단합니다.")
+            self.loading_done = True
+        elif not page.get('more'):
+            self.loading_done = True
+
+        if details:
+            # Hand the new items to the capture queue before loading further pages
+            if self.batch_size > 1:
+                log_message(f"총 {len(self.receipt_queue)}개의 영수증 처리를 시작합니다. {self.batch_size}개씩 묶어서 인쇄 및 저장합니다...")
+            else:
+                log_message(f"총 {len(self.receipt_queue)}개의 영수증 처리를 시작합니다. 하나씩 인쇄 및 저장합니다...")
+            self.state = STATE_PROCESS
+        elif not self.loading_done:
+            self._load_more()
+        elif not self.receipt_queue:
+            if self.receipt_index:
+                log_message("검색 완료. 기간 내 영수증이 모두 이미 저장되어 있습니다.")
+            else:
+                log_message("검색 완료. 지정된 날짜 범위 내 영수증이 없습니다.")
+            self.state = STATE_DONE
+        else:
+            self.state = STATE_PROCESS
+
+    def _load_more(self):
+        js_more = f"""
+        (function() {{
+            {SELECTOR_JS}
+            var moreBtn = sel('RECEIPT_MORE_BTN');
+            if (moreBtn) {{
+                moreBtn.click();
+                return 'LOADING_MORE';
+            }}
+            return 'NO_MORE';
+        }})()
+        """
+        items_before = self.bridge.state.get('items', 0)
+        if self.window.evaluate_js(js_more) == 'LOADING_MORE':
+            log_message("'더보기' 버튼을 찾았습니다. 다음 페이지 로드 중...")
+            # 리스트가 늘어나거나 '더보기' 버튼이 사라지는 즉시 진행
+            self.bridge.wait_for(lambda s: s.get('items', 0) != items_before or not s.get('more'), 1.5, 'load_more')
+
+    def _receipt_filename(self, item):
+        d = item.get('date', '0000년00월00일')
+        # Change yyyy -> yy
+        if len(d) >= 4 and d[:4].isdigit():
+            d = d[2:]
+        d = d.replace(" ", "")
+
+        t = item.get('time', '00:00')
+        # Change HH:MM ~ HH:MM -> HHMM-HHMM
+        safe_time = t.replace(":", "").replace("~", "-").replace(" ", "")
+
+        src = item.get('source', 'Unknown')
+        dst = item.get('destination', 'Unknown')
+        prc = item.get('price', '0').replace(",", "").replace("원", "")
+
+        filename = f"ktx_{d}({safe_time})_{src}_{dst}_{prc}.png"
+        filename = "".join([c for c in filename if c.isalnum() or c in (' ', '.', '_', '(', ')', '-')]).strip()
+        return filename
+
+    def _process_step(self, current_url):
+        # Current batch: up to batch_size queued receipts printed together in one modal
+        batch_end = min(self.current_processing_index + self.batch_size, len(self.receipt_queue))
+        batch_keys = self.receipt_queue[self.current_processing_index:batch_end]
+
+        # Step 1: Select Items and Open Print (Hijack window.open)
+        # The extraction pass tagged each row with data-receipt-key, so the target rows are
+        # attribute lookups. If the list re-rendered (e.g. after a modal closed) the tags are
+        # re-applied once from the row contents and the lookup is retried.
+
+        js_process = f"""
+        (function() {{
+            {JS_RECEIPT_KEY_HELPERS}
+            {SELECTOR_JS}
+
+            // Suppress print dialog
+            window.print = function() {{ console.log('Print dialog suppressed'); }};
+
+            var keys = {json.dumps(batch_keys)};
+            function findRow(key) {{
+                return document.querySelector('.tckList[data-receipt-key="' + key + '"]');
+            }}
+            for (var i=0; i<keys.length; i++) {{
+                if (!findRow(keys[i])) {{
+                    tagReceiptKeys(document.querySelectorAll('.tckList'));
+                    break;
+                }}
+            }}
+
+            var targetItems = [];
+            var foundKeys = [];
+            for (var i=0; i<keys.length; i++) {{
+                var row = findRow(keys[i]);
+                if (row) {{
+                    targetItems.push(row);
+                    foundKeys.push(keys[i]);
+                }}
+            }}
+
+            if (targetItems.length === 0) return 'ITEM_NOT_FOUND';
+
+            // Uncheck all first
+            var allChecks = document.querySelectorAll('input[type="checkbox"]');
+            for (var i=0; i<allChecks.length; i++) allChecks[i].checked = false;
+
+            // Check targets
+            for (var i=0; i<targetItems.length; i++) {{
+                var chk = targetItems[i].querySelector('input[type="checkbox"]');
+                if (chk) chk.click(); // Click to trigger events? or just checked=true
+                if (chk && !chk.checked) chk.checked = true;
+            }}
+
+            // Hijack window.open just in case, but keep in same window
+            window.open = function(url, name, specs) {{
+                // If it's a URL, we might want to follow it OR just let the modal appear if it's in-page.
+                // User report suggests 'modal appears'. If it's a real popup, window.open is used.
+                // We will redirect SELF to the URL if it's not empty.
+                if (url) window.location.href = url;
+                return window;
+            }};
+
+            // Click Print Button
+            var printBtn = sel('RECEIPT_PRINT_BTN');
+            if (printBtn) {{
+                printBtn.click();
+                return 'CLICKED_PRINT|||' + JSON.stringify(foundKeys);
+            }}
+            return 'PRINT_BTN_NOT_FOUND';
+        }})()
+        """
+
+        # Only run this if we are on the LIST page (RECEIPT_PAGE_URL)
+        # (skip while the modal of this batch is already being captured)
+        if current_url.startswith(RECEIPT_PAGE_URL) and self.batch_pos == 0 and self.capture_token is None:
+            with self.trace.span('select_print'):
+                res_proc = self.window.evaluate_js(js_process)
+            if res_proc and res_proc.startswith('CLICKED_PRINT|||'):
+                self.batch_keys = json.loads(res_proc.split('|||')[1])
+                if self.batch_span is None:
+                    self.batch_span = self.trace.begin('batch', first=self.current_processing_index + 1, size=len(self.batch_keys))
+                for key in batch_keys:
+                    if key not in self.batch_keys:
+                        log_message(f"처리할 항목을 DOM에서 찾을 수 없습니다. (키: {key})")
+                if len(batch_keys) > 1:
+                    log_message(f"영수증 {self.current_processing_index+1}~{batch_end}/{len(self.receipt_queue)} ({len(self.batch_keys)}건) 선택 및 인쇄 클릭. 모달 대기...")
+                else:
+                    log_message(f"영수증 {self.current_processing_index+1}/{len(self.receipt_queue)} 선택 및 인쇄 클릭. 모달 대기...")
+                # 모달이 열리는 즉시 진행
+                self.bridge.wait_for(lambda s: s.get('modal'), 2, 'modal_open')
+            elif res_proc == 'ITEM_NOT_FOUND':
+                log_message(f"처리할 항목을 DOM에서 찾을 수 없습니다. (키: {', '.join(batch_keys)})")
+                self.current_processing_index = batch_end # Skip
+                return
+            else:
+                pass
+
+        # Step 2: Check for Modal and Save
+        # We simply check if the Modal Area exists in the current DOM (whether redirected or not)
+        js_check_modal = f"""
+        (function() {{
+            {SELECTOR_JS}
+            var modalEntry = sel('RECEIPT_MODAL_AREA');
+            if (!modalEntry) return 'NOT_FOUND';
+            var modalList = sel('RECEIPT_MODAL_LIST');
+            return 'FOUND|||' + (modalList ? modalList.children.length : 1);
+        }})()
+        """
+        modal_status = self.window.evaluate_js(js_check_modal)
+
+        if not modal_status or not modal_status.startswith('FOUND'):
+            return
+
+        if self.batch_pos == 0 and self.capture_token is None:
+            receipt_count = int(modal_status.split('|||')[1])
+            if receipt_count != len(self.batch_keys):
+                log_message(f"경고: 선택한 {len(self.batch_keys)}건 중 모달에 {receipt_count}건의 영수증이 표시되었습니다.")
+
+        # Ensure html2canvas is loaded (once per document)
+        if not self._ensure_html2canvas():
+            log_message("html2canvas 라이브러리 로드 실패. 캡처를 건너뜁니다.")
+            self._finish_batch(batch_end)
+            return
+
+        # Capture each receipt <li> of the modal in turn (the page streams each PNG in chunks)
+        # The modal lists the selected receipts in list order, which is also the queue order.
+        while self.batch_pos < len(self.batch_keys):
+            item = self.receipt_index[self.batch_keys[self.batch_pos]]
+            filename = self._receipt_filename(item)
+            full_save_path = os.path.join(self.save_path, filename)
+
+            # 1. Trigger Capture if not started
+            if self.capture_token is None:
+                log_message(f"이미지 생성 요청: {filename}")
+
+                if os.path.exists(full_save_path):
+                    log_message(f"이미 파일이 존재합니다. 덮어쓰기 수행: {full_save_path}")
+
+                self.capture_token = self.bridge.begin_capture(full_save_path)
+                js_trigger = f"""
+                (function() {{
+                    {CAPTURE_STREAM_JS}
+                    {SELECTOR_JS}
+
+                    var target = null;
+                    var modalList = sel('RECEIPT_MODAL_LIST');
+                    if (modalList && modalList.children[{self.batch_pos}]) {{
+                        target = modalList.children[{self.batch_pos}].querySelector(':scope > div > div');
+                    }} else if ({self.batch_pos} === 0) {{
+                        target = sel('RECEIPT_MODAL_AREA');
+                    }}
+                    captureNode(target, '{self.capture_token}');
+                }})()
+                """
+                self.window.evaluate_js(js_trigger)
+
+            # 2. Wait for the stream to finish (file is already written when this returns)
+            capture_result = self.bridge.wait_capture(self.capture_token, 1)
+
+            if capture_result is None:
+                log_message("캡처 데이터 대기 중... (처리 중)")
+                return
+
+            self.capture_token = None
+            if 'path' in capture_result:
+                log_message(f"저장 완료: {full_save_path}")
+                if self.ledger:
+                    self.ledger.record(
+                        'ktx', self.batch_keys[self.batch_pos],
+                        travel_date=item.get('date', ''),
+                        route=f"{item.get('source', '')}-{item.get('destination', '')}",
+                        price=item.get('price', ''),
+                        file_path=full_save_path,
+                        image_hash=capture_result['sha256'],
+                    )
+            elif capture_result['error'] == 'html2canvas not loaded':
+                # Document was replaced without a load notification; inject again and retry
+                self.html2canvas_generation = -1
+                return
+            else:
+                log_message(f"캡처 실패: {capture_result['error']}")
+            self.batch_pos += 1
+
+        # Close Modal
+        log_message("모달 닫기 시도...")
+        close_span = self.trace.begin('modal_close')
+        js_close = f"""
+        (function() {{
+            {SELECTOR_JS}
+            var closeBtn = sel('RECEIPT_MODAL_CLOSE_BTN');
+            if (closeBtn) {{
+                closeBtn.click();
+                return 'CLICKED_CLOSE';
+            }}
+            // Fallback: history back if we navigated?
+            return 'NO_CLOSE_BTN';
+        }})()
+        """
+        res_close = self.window.evaluate_js(js_close)
+
+        if res_close == 'NO_CLOSE_BTN':
+            # If we navigated away, maybe we need to go back
+            self.window.evaluate_js("window.history.back()")
+
+        self._finish_batch(batch_end)
+        # 모달이 사라지는 즉시 다음 항목 진행
+        self.bridge.wait_for(lambda s: not s.get('modal'), 2, 'modal_gone')
+        self.trace.end(close_span)
+
+    def _finish_batch(self, batch_end):
+        if self.batch_span is not None:
+            self.trace.end(self.batch_span)
+            self.batch_span = None
+        self.current_processing_index = batch_end
+        self.batch_keys = []
+        self.batch_pos = 0
+        if self.capture_token is not None:
+            self.bridge.abort_capture(self.capture_token, 'batch finished')
+        self.capture_token = None
+
+def monitor_logic(window, bridge, start_date, end_date, save_path, batch_size=1, ledger=None, trace_path=None):
+    """
+    Monitors the current URL and checks for login status on the main page.
+    """
+    KorailMonitor(window, bridge, start_date, end_date, save_path, batch_size, ledger, trace_path).run()
 
 import argparse
 
@@ -541,6 +788,10 @@ def main():
     parser.add_argument("--start_date", help="YYYYMMDD", default=today_str)
     parser.add_argument("--end_date", help="YYYYMMDD", default=today_str)
     parser.add_argument("--save_path", help="Path to save receipts", default=".")
+    parser.add_argument("--batch_size", help="Receipts printed together in one modal", type=int, default=1)
+    parser.add_argument("--recapture", help="Capture receipts already recorded in the ledger again", action="store_true")
+    parser.add_argument("--trace", help="Run trace file (.json = Chrome trace, .jsonl = one span per line)", default=None)
+    parser.add_argument("--no_trace", help="Do not write a run trace", action="store_true")
     
     # Parse args once
     args = parser.parse_args()
@@ -557,9 +808,17 @@ def main():
 
     # Create window
     window = webview.create_window("Korail Receipt Automation", LOGIN_URL, width=1280, height=800)
+
+    # Receipts saved in earlier runs are skipped before any print modal is opened
+    ledger = None if args.recapture else ReceiptLedger()
+
+    # Page -> Python state notifications (MutationObserver + js_api)
+    bridge = KorailBridge()
+    bridge.attach(window)
     
     # Start thread
-    t = threading.Thread(target=monitor_logic, args=(window, args.start_date, args.end_date, args.save_path))
+    trace_path = None if args.no_trace else (args.trace or default_trace_path('ktx'))
+    t = threading.Thread(target=monitor_logic, args=(window, bridge, args.start_date, args.end_date, args.save_path, args.batch_size, ledger, trace_path))
     t.daemon = True
     t.start()
     
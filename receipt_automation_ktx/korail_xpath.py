@@ -36,6 +36,10 @@ RECEIPT_PRINT_BTN = "/html/body/div[1]/div[3]/div/div/div/div/div[2]/div[3]/div[
 # /html/body/div[5]/div/div/div/div[2]/div[1]/ul/li/div/div
 RECEIPT_MODAL_AREA = "/html/body/div[5]/div/div/div/div[2]/div[1]/ul/li/div/div"
 
+# 영수증 모달 리스트 (여러 장 인쇄 시 영수증마다 li 하나)
+# /html/body/div[5]/div/div/div/div[2]/div[1]/ul
+RECEIPT_MODAL_LIST = "/html/body/div[5]/div/div/div/div[2]/div[1]/ul"
+
 # 영수증 모달 닫기 버튼 (X 버튼)
 # /html/body/div[5]/div/div/div/div[1]/button
 RECEIPT_MODAL_CLOSE_BTN = "/html/body/div[5]/div/div/div/div[1]/button"
@@ -0,0 +1,10 @@
+"""
+저장소 루트를 import 경로에 추가 (공용 모듈 receipt_common 사용)
+receipt_common을 import하기 전에 `import common_path`로 한 번 불러옵니다.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
@@ -1,20 +1,65 @@
 import os
+import tempfile
 
 class Config:
-    # URLs
-    URL_LOGIN = "https://etk.srail.kr/cmc/01/selectLoginForm.do?pageId=TK0701000000"
-    URL_RECEIPT_LIST = "https://etk.srail.kr/hpg/hta/03/selectBreakdownList.do?pageId=TK0102030100"
+    # URLs (SRT_BASE_URL points at another host, e.g. the offline_replay fixture server)
+    BASE_URL = os.environ.get("SRT_BASE_URL", "https://etk.srail.kr")
+    URL_LOGIN = f"{BASE_URL}/cmc/01/selectLoginForm.do?pageId=TK0701000000"
+    URL_RECEIPT_LIST = f"{BASE_URL}/hpg/hta/03/selectBreakdownList.do?pageId=TK0102030100"
     
     # Paths
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     OUTPUT_DIR = os.path.join(BASE_DIR, "receipts")
+    # chromedriver path per Chrome major version (skips the network check on every start)
+    DRIVER_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".receipt_automation", "chromedriver_cache.json")
     
     # Settings
     HEADLESS = False # Default to visible for reliability in this specific task, can be toggled
-    WAIT_TIMEOUT = 10
+    # Log in by hand in the visible window, then hand the session (cookies + web storage) to a headless
+    # Chrome that does the listing, printing and capture off-screen with a fixed viewport
+    HEADLESS_CAPTURE = False
+    CAPTURE_WINDOW_SIZE = (1280, 1024)
+    WAIT_TIMEOUT = 10 # Budget of the slow steps (page load, print popup)
+    # Implicit wait stays 0: a find that matches nothing returns at once instead of blocking
+    # for the full budget. Each step waits explicitly for its own condition with its own budget (seconds).
+    IMPLICIT_WAIT = 0
+    STEP_TIMEOUTS = {
+        "receipt_page": WAIT_TIMEOUT,  # search button after opening the receipt list
+        "search": 2,                   # result page replaced after clicking search
+        "results": 5,                  # result table present
+        "row_checkbox": 2,             # row checkbox clickable
+        "checkbox": 0.5,               # checkbox toggled on
+        "uncheck": 0.5,                # checkbox toggled off
+        "print_btn": 5,
+        "popup_open": WAIT_TIMEOUT,    # print popup window created
+        "popup_render": WAIT_TIMEOUT,  # popup document + web fonts loaded
+        "popup_content": 5,
+        "popup_close": 1,
+        "next_page": WAIT_TIMEOUT,     # result page replaced (or pager moved) after a page link click
+    }
+    USE_LEDGER = True # Skip receipts already saved in earlier runs (receipt_ledger.db)
+    TRACE = True # Write per-phase timings of each run (~/.receipt_automation/traces, RECEIPT_TRACE_DIR)
+
+    # Output: "png" = screenshot of the popup content, "pdf" = vector PDF of the popup via CDP Page.printToPDF
+    OUTPUT_FORMAT = "png"
+    MERGE_PDF = False # pdf mode: also write one PDF with every receipt saved in the run (needs pypdf)
+    PDF_OPTIONS = {"printBackground": True, "preferCSSPageSize": True}
+    # Print popups opened before they are captured (1 = one popup at a time). With more, Chrome renders
+    # the popups in parallel while the main window selects and prints the next rows.
+    POPUPS_IN_FLIGHT = 1
+
+    # Enumerate the result pages over HTTP with the logged-in browser's cookies (session_fetch.py)
+    # before walking them in the browser; pages without receipts to capture are not processed.
+    # Requests replay the page's own search form (hidden fields included). Only list pages are fetched;
+    # receipts are still printed in the browser. The list is only a hint: it is used after its first page
+    # matches the rows the browser shows, and rows are still matched by ledger key. Off by default.
+    FAST_ENUMERATE = False
+    FETCH_WORKERS = 4 # Concurrent list page requests (and HTTP connection pool size)
     
     # Chrome Profile Path (System Temp)
-    PROFILE_DIR = os.path.join(os.environ.get("TEMP"), "srt_chrome_profile")
+    PROFILE_DIR = os.path.join(os.environ.get("TEMP", tempfile.gettempdir()), "srt_chrome_profile")
+    # Profile of the headless capture browser (the visible one holds a lock on PROFILE_DIR)
+    CAPTURE_PROFILE_DIR = os.path.join(os.environ.get("TEMP", tempfile.gettempdir()), "srt_chrome_capture_profile")
     
     # Create output dir if not exists
     if not os.path.exists(OUTPUT_DIR):
@@ -0,0 +1,130 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from config import Config
+
+VERSION_RE = re.compile(r"(\d+)\.\d+\.\d+\.\d+")
+
+# Chrome executables tried on macOS / Linux (Windows reads the version from the registry)
+CHROME_COMMANDS = [
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+]
+
+
+def _version_of(command):
+    """Full version string printed by `command --version`, or None."""
+    path = command if os.path.isfile(command) else shutil.which(command)
+    if not path:
+        return None
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_RE.search(out)
+    return match.group(0) if match else None
+
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+
+def installed_chrome_version():
+    """Version of the installed Chrome without starting it (registry / --version), or None."""
+    if sys.platform == "win32":
+        import winreg
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                    return winreg.QueryValueEx(key, "version")[0]
+            except OSError:
+                continue
+        return None
+    for command in CHROME_COMMANDS:
+        version = _version_of(command)
+        if version:
+            return version
+    return None
+
+
+def _load_cache():
+    try:
+        with open(Config.DRIVER_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    os.makedirs(os.path.dirname(Config.DRIVER_CACHE_PATH), exist_ok=True)
+    tmp_path = Config.DRIVER_CACHE_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, Config.DRIVER_CACHE_PATH)
+
+
+def _selenium_manager_offline():
+    """Driver path Selenium Manager already has on disk (--offline: no version lookups, no downloads)."""
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+    paths = SeleniumManager().binary_paths(["--browser", "chrome", "--offline"])
+    return paths.get("driver_path") or None
+
+
+def _download():
+    """Network fallback: webdriver-manager checks the matching version and downloads it."""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver(log=print):
+    """
+    Returns a chromedriver path matching the installed Chrome, trying in order:
+      1. the local cache keyed by Chrome major version (no subprocess besides the version check)
+      2. Selenium Manager in offline mode (drivers it downloaded before)
+      3. webdriver-manager over the network (only when 1 and 2 have no matching driver)
+    The resolved driver is cached for the next start. Returns None if every step failed,
+    in which case the caller lets Selenium resolve the driver itself.
+    """
+    start = time.perf_counter()
+    chrome_major = _major(installed_chrome_version())
+    cache = _load_cache()
+
+    path, source = None, None
+    entry = cache.get(chrome_major) if chrome_major else None
+    if entry and os.path.isfile(entry.get("path", "")):
+        path, source = entry["path"], "cache"
+
+    for name, resolver in (("selenium-manager offline", _selenium_manager_offline), ("download", _download)):
+        if path:
+            break
+        try:
+            candidate = resolver()
+        except Exception as e:
+            log(f"ChromeDriver {name} 실패: {e}")
+            continue
+        driver_major = _major(_version_of(candidate)) if candidate else None
+        if candidate and (not chrome_major or driver_major == chrome_major):
+            path, source = candidate, name
+        elif candidate:
+            log(f"ChromeDriver 버전 불일치 ({name}): 드라이버 {driver_major}, Chrome {chrome_major}")
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not path:
+        log(f"ChromeDriver를 찾지 못했습니다 ({elapsed_ms:.0f}ms). Selenium 기본 방식으로 시도합니다.")
+        return None
+
+    if source != "cache" and chrome_major:
+        try:
+            cache[chrome_major] = {"path": path, "version": _version_of(path)}
+            _save_cache(cache)
+        except OSError as e:
+            log(f"ChromeDriver 캐시 저장 실패: {e}")
+    log(f"ChromeDriver 확인 ({source}, Chrome {chrome_major or '?'}): {path} - {elapsed_ms:.0f}ms")
+    return path
@@ -158,7 +158,7 @@ class SRTLauncher(QWidget):
                 self.manager.goto_receipt_page()
                 
                 # Pass dates and capture with checkbox logic
-                self.manager.capture_with_checkbox(limit=100, start_date=start_date, end_date=end_date, save_dir=save_path)
+                self.manager.capture_with_checkbox(start_date=start_date, end_date=end_date, save_dir=save_path)
             else:
                 self.signals.log_signal.emit("로그인 실패 또는 중단됨.")
         except Exception as e:
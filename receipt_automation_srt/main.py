@@ -1,39 +1,131 @@
+"""
+Non-interactive SRT receipt capture (Selenium).
+
+    python main.py --start 20260101 --end 20260131 --out ./receipts
+    python main.py --start 20260101 --end 20260131 --limit 10 --format json > summary.json
+
+The login is still done by hand in the browser window (or comes from the saved profile).
+With --format json only the summary goes to stdout; progress logs go to stderr.
+
+Exit codes: 0 every pending receipt saved (or nothing to do), 1 some receipts failed or the
+walk stopped early, 2 bad arguments, 3 not logged in, 4 unexpected error.
+"""
+import argparse
+import contextlib
+import datetime
+import json
 import sys
+import time
+import traceback
 from config import Config
 from srt_manager import SRTManager
 
-def main():
-    print("=" * 50)
-    print(" SRT Dynamic Receipt Automation (Selenium)")
-    print("=" * 50)
-    
-    # 2. Initialize Manager
-    manager = SRTManager()
-    
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_LOGIN = 3
+EXIT_ERROR = 4
+
+
+def _date_arg(value):
     try:
-        # 3. Wait for Manual Login
-        if manager.wait_for_login():
-            # 4. Navigate to Receipt Page
-            manager.goto_receipt_page()
-            
-            # 5. Capture Receipts
-            try:
-                limit_str = input("Number of receipts to capture (Default 1): ").strip()
-                limit = int(limit_str) if limit_str.isdigit() else 1
-            except:
-                limit = 1
-                
-            manager.capture_receipts(limit=limit)
-            
+        if len(value) != 8:
+            raise ValueError
+        datetime.datetime.strptime(value, "%Y%m%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYYMMDD, got {value!r}")
+    return value
+
+
+def parse_args(argv=None):
+    today_str = datetime.datetime.now().strftime("%Y%m%d")
+    parser = argparse.ArgumentParser(description="SRT receipt capture (Selenium)")
+    parser.add_argument("--start", help="Search start date YYYYMMDD", type=_date_arg, default=today_str)
+    parser.add_argument("--end", help="Search end date YYYYMMDD", type=_date_arg, default=today_str)
+    parser.add_argument("--out", help="Directory to save receipts", default=Config.OUTPUT_DIR)
+    parser.add_argument("--limit", help="Stop after this many saved receipts", type=int, default=None)
+    parser.add_argument("--format", help="Summary output", choices=("text", "json"), default="text")
+    parser.add_argument("--login_timeout", help="Seconds to wait for the login (default: no deadline)",
+                        type=float, default=None)
+    parser.add_argument("--headless_capture", help="Capture in a headless browser after the login",
+                        action="store_true")
+    args = parser.parse_args(argv)
+    if args.start > args.end:
+        parser.error("--start is after --end")
+    if args.limit is not None and args.limit < 1:
+        parser.error("--limit must be at least 1")
+    return args
+
+
+def run(args):
+    """Runs one capture and returns (exit code, summary dict)."""
+    if args.headless_capture:
+        Config.HEADLESS_CAPTURE = True
+    summary = {"status": "error", "start": args.start, "end": args.end, "out": args.out,
+               "captured": [], "skipped": 0, "failed": 0, "pages": 0, "merged_pdf": None,
+               "error": None, "timings": {}}
+    started = time.perf_counter()
+    manager = None
+    code = EXIT_ERROR
+    try:
+        manager = SRTManager()
+        login_started = time.perf_counter()
+        logged_in = manager.wait_for_login(timeout=args.login_timeout)
+        summary["timings"]["login_ms"] = round((time.perf_counter() - login_started) * 1000)
+        if not logged_in:
+            summary["status"] = "login_failed"
+            code = EXIT_LOGIN
         else:
-            print("Login failed. Script stopping.")
-            
+            capture_started = time.perf_counter()
+            manager.goto_receipt_page()
+            result = manager.capture_with_checkbox(limit=args.limit, start_date=args.start,
+                                                   end_date=args.end, save_dir=args.out)
+            summary["timings"]["capture_ms"] = round((time.perf_counter() - capture_started) * 1000)
+            summary.update({key: result[key] for key in ("captured", "skipped", "failed", "pages", "merged_pdf")})
+            summary["error"] = result["aborted"]
+            if result["failed"] or result["aborted"]:
+                summary["status"], code = "partial", EXIT_PARTIAL
+            else:
+                summary["status"], code = "ok", EXIT_OK
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        traceback.print_exc()
+        summary["error"] = f"{type(e).__name__}: {e}"
     finally:
-        # Ask to close or keep open? simpler to just close for automation
-        print("Automation finished.")
-        manager.close()
+        if manager:
+            summary["timings"]["phases"] = manager.trace.totals()
+            manager.close()
+        summary["timings"]["total_ms"] = round((time.perf_counter() - started) * 1000)
+    summary["captured_count"] = len(summary["captured"])
+    return code, summary
+
+
+def print_text_summary(summary):
+    print("=" * 50)
+    print(f" 결과: {summary['status']} ({summary['start']} ~ {summary['end']})")
+    print(f" 저장 {summary['captured_count']}건, 이미 저장됨 {summary['skipped']}건, 실패 {summary['failed']}건")
+    for item in summary["captured"]:
+        print(f"  {item['file']} ({item['ms']}ms)")
+    if summary["error"]:
+        print(f" 오류: {summary['error']}")
+    print(f" 소요 시간: {summary['timings']['total_ms'] / 1000:.1f}s")
+    print("=" * 50)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.format == "json":
+        # Keep stdout for the summary; every log line of the run goes to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            code, summary = run(args)
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print("=" * 50)
+        print(" SRT Dynamic Receipt Automation (Selenium)")
+        print("=" * 50)
+        code, summary = run(args)
+        print_text_summary(summary)
+    return code
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
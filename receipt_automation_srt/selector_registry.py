@@ -0,0 +1,161 @@
+import time
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from config import Config
+from xpath_config import XPathConfig
+
+
+def text_xpath(text, tag="*"):
+    """XPath for a tag whose normalized text contains text (text anchor strategy)."""
+    return f"//{tag}[contains(normalize-space(.), '{text}')]"
+
+
+def role_css(role, name):
+    """CSS for an ARIA role (explicit or implicit button) whose label contains name."""
+    implicit = {"button": ["button", "input[type=button]", "input[type=submit]"]}
+    tags = [f"[role='{role}']"] + implicit.get(role, [])
+    return ", ".join(f"{tag}[aria-label*='{name}'], {tag}[title*='{name}']" for tag in tags)
+
+
+# Logical target -> ordered strategies (kind, By, value). The first strategy is the original XPath;
+# the others keep the tool working when the SRT layout shifts.
+SELECTORS = {
+    "MY_PAGE_BTN": [
+        ("xpath", By.XPATH, XPathConfig.MY_PAGE_BTN),
+        ("css", By.CSS_SELECTOR, "button.btn-navi.my"),
+        ("text", By.XPATH, text_xpath("마이페이지", "button")),
+    ],
+    "SEARCH_BTN": [
+        ("xpath", By.XPATH, XPathConfig.SEARCH_BTN),
+        ("css", By.CSS_SELECTOR, "#search-form div.tal_c > button"),
+        ("text", By.XPATH, text_xpath("조회하기", "button")),
+        ("role", By.CSS_SELECTOR, role_css("button", "조회")),
+    ],
+    "RECEIPT_LIST_TABLE_BODY": [
+        ("xpath", By.XPATH, XPathConfig.RECEIPT_LIST_TABLE_BODY),
+        ("css", By.CSS_SELECTOR, "#list-form table > tbody"),
+    ],
+    "PAGINATION_CONTAINER": [
+        ("xpath", By.XPATH, XPathConfig.PAGINATION_CONTAINER),
+        ("css", By.CSS_SELECTOR, "div.sub_con_area div.paging"),
+    ],
+    "NEXT_PAGE_BTN": [
+        ("xpath", By.XPATH, XPathConfig.NEXT_PAGE_BTN),
+        ("css", By.CSS_SELECTOR, "div.sub_con_area div.paging a.next"),
+        ("text", By.XPATH, "//div[contains(@class, 'paging')]//a[normalize-space(.)='다음']"),
+        ("xpath", By.XPATH, XPathConfig.NEXT_PAGE_BTN_INDEX),  # positional, last resort
+    ],
+    "PRINT_BTN": [
+        ("xpath", By.XPATH, XPathConfig.PRINT_BTN),
+        ("css", By.CSS_SELECTOR, "div.sub_con_area div.tal_c > button.btn_emerald"),
+        ("text", By.XPATH, text_xpath("영수증", "button")),
+        ("role", By.CSS_SELECTOR, role_css("button", "영수증")),
+    ],
+    "POPUP_CONTENT": [
+        ("xpath", By.XPATH, XPathConfig.POPUP_CONTENT),
+        ("css", By.CSS_SELECTOR, "#wrap > div:nth-of-type(2) > div:first-child"),
+    ],
+}
+
+
+class SelectorRegistry:
+    """
+    Resolves logical targets through their fallback strategies and caches the element.
+
+    A cached element is reused until it goes stale (document replaced or node removed),
+    so repeated lookups of the same button cost no extra find calls. Probing runs with
+    implicit wait 0 so a missing primary XPath costs one round trip; waiting for a target
+    is an explicit WebDriverWait over all strategies with the caller's budget.
+    """
+
+    def __init__(self, driver, selectors=SELECTORS, log=None):
+        self.driver = driver
+        self.selectors = selectors
+        self.log = log
+        self._cache = {}  # (window handle, name) -> WebElement
+        self.stats = {}   # name -> {"hits": {label: n}, "cached", "misses", "ms"}
+
+    def _entry(self, name):
+        return self.stats.setdefault(name, {"hits": {}, "cached": 0, "misses": 0, "ms": 0.0})
+
+    def invalidate(self, name=None):
+        if name is None:
+            self._cache.clear()
+        else:
+            for key in [k for k in self._cache if k[1] == name]:
+                del self._cache[key]
+
+    def _probe(self, name):
+        strategies = self.selectors[name]
+        if Config.IMPLICIT_WAIT:
+            self.driver.implicitly_wait(0)
+        try:
+            for index, (kind, by, value) in enumerate(strategies):
+                try:
+                    found = self.driver.find_elements(by, value)
+                except WebDriverException:
+                    found = []
+                if found:
+                    label = f"{index}:{kind}"
+                    if index > 0 and label not in self._entry(name)["hits"] and self.log:
+                        self.log(f"선택자 대체 전략 사용: {name} -> {label} ({value})")
+                    return found[0], label
+        finally:
+            if Config.IMPLICIT_WAIT:
+                self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
+        return None, None
+
+    def find(self, name, timeout=0):
+        """Returns the element for name, or None if no strategy matched within timeout seconds."""
+        entry = self._entry(name)
+        key = (self.driver.current_window_handle, name)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            try:
+                cached.is_enabled()  # raises if the node is gone
+                entry["cached"] += 1
+                return cached
+            except StaleElementReferenceException:
+                del self._cache[key]
+
+        def resolved(_driver):
+            found = self._probe(name)
+            return found if found[0] is not None else False
+
+        start = time.perf_counter()
+        try:
+            # timeout=0 probes exactly once
+            element, label = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(resolved)
+        except TimeoutException:
+            element, label = None, None
+
+        entry["ms"] += (time.perf_counter() - start) * 1000
+        if element is None:
+            entry["misses"] += 1
+            return None
+        entry["hits"][label] = entry["hits"].get(label, 0) + 1
+        self._cache[key] = element
+        return element
+
+    def click(self, name, timeout=0):
+        """Clicks the target; a stale cached element is re-resolved once. Returns False if not found."""
+        for _ in range(2):
+            element = self.find(name, timeout)
+            if element is None:
+                return False
+            try:
+                element.click()
+                return True
+            except StaleElementReferenceException:
+                self.invalidate(name)
+        return False
+
+    def summary(self):
+        """One line per target: strategy hits, cache hits, misses, total resolve time."""
+        lines = []
+        for name, st in sorted(self.stats.items()):
+            hits = ", ".join(f"{label}={n}" for label, n in sorted(st["hits"].items())) or "-"
+            lines.append(f"{name}: {hits} cached={st['cached']} misses={st['misses']} {st['ms']:.0f}ms")
+        return lines
@@ -0,0 +1,161 @@
+"""
+브라우저 없이 SRT 이용내역 조회
+수동 로그인한 브라우저의 쿠키를 requests.Session으로 옮겨 이용내역 목록 페이지를 HTTP로 직접 가져옵니다.
+- 요청은 브라우저에서 읽은 조회 폼(#search-form)의 action/method와 숨은 필드까지 모든 값을 그대로 사용합니다
+  (페이지 번호 필드 이름도 폼이나 페이지 링크에서 읽음)
+- 첫 페이지에서 전체 페이지 수를 읽고, 나머지 페이지는 작업자 풀로 동시에 가져옵니다
+- 연결은 HTTPAdapter 풀에서 재사용합니다 (페이지마다 TLS 연결을 새로 맺지 않음)
+- 결과 행은 브라우저 추출(JS_READ_RECEIPT_ROWS)과 같은 형태이므로 파일명/ledger 키 생성이 그대로 동작합니다
+브라우저는 실제로 인쇄할 영수증을 렌더링할 때만 사용합니다.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+
+
+class _ListPageParser(HTMLParser):
+    """#list-form 표의 tbody 행을 셀 텍스트 목록으로 수집 (<br>은 줄바꿈)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._form_depth = 0  # #list-form 내부 중첩 깊이 (0 = 밖)
+        self._in_tbody = False
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            if self._form_depth or attrs.get("id") == "list-form":
+                self._form_depth += 1
+            return
+        if not self._form_depth:
+            return
+        if tag == "tbody":
+            self._in_tbody = True
+        elif tag == "tr" and self._in_tbody:
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+        elif tag == "br" and self._cell is not None:
+            self._cell.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "form" and self._form_depth:
+            self._form_depth -= 1
+        elif tag == "tbody":
+            self._in_tbody = False
+        elif tag == "td" and self._cell is not None:
+            self._row.append(re.sub(r"[ \t\r\f\v]*\n[ \t\r\f\v]*", "\n", "".join(self._cell)).strip())
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_list_page(html, page_field="pageNo"):
+    """
+    이용내역 목록 HTML 파싱 (page_field: 페이지 링크의 페이지 번호 파라미터 이름)
+
+    Returns:
+        {"count": 전체 행 수, "rows": [{"index", "status", "date", "train", "dep", "arr", "price"}],
+         "pages": 페이지 링크 중 가장 큰 번호 (링크가 없으면 1)}
+    """
+    parser = _ListPageParser()
+    parser.feed(html)
+    parser.close()
+    rows = []
+    # 0:'', 1:날짜, 2:열차, 3:출발, 4:도착, ... 8:발권상태, 9:금액 (셀이 11개 미만인 행은 제외)
+    for index, cells in enumerate(parser.rows):
+        if len(cells) < 11:
+            continue
+        rows.append({"index": index, "status": cells[8], "date": cells[1], "train": cells[2],
+                     "dep": cells[3], "arr": cells[4], "price": cells[9]})
+    page_links = re.findall(rf"[?&;]{re.escape(page_field)}=(\d+)", html)
+    pages = max([int(n) for n in page_links] or [1])
+    return {"count": len(parser.rows), "rows": rows, "pages": pages}
+
+
+def session_from_cookies(cookies, user_agent=None, pool_size=8):
+    """
+    브라우저 쿠키로 로그인된 requests.Session 생성
+
+    Args:
+        cookies: [{"name", "value", "domain", "path"}] (Selenium get_cookies() 형식)
+        user_agent: 브라우저와 같은 User-Agent (세션이 UA에 묶여 있는 경우 대비)
+        pool_size: 연결 풀 크기 (동시 작업자 수 이상)
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"],
+                            domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    return session
+
+
+def fetch_list_page(session, form, page_no=1, timeout=10):
+    """
+    목록 한 페이지를 브라우저의 조회 폼과 같은 요청으로 가져와 파싱 결과 반환
+
+    Args:
+        form: {"action", "method", "fields": [[name, value], ...], "page_field"} (브라우저에서 읽은 #search-form)
+    """
+    page_field = form["page_field"]
+    fields = [(name, value) for name, value in form["fields"] if name != page_field]
+    fields.append((page_field, str(page_no)))
+    if form["method"] == "post":
+        resp = session.post(form["action"], data=fields, timeout=timeout)
+    else:
+        resp = session.get(form["action"], params=fields, timeout=timeout)
+    resp.raise_for_status()
+    if resp.encoding is None or resp.encoding.lower() == "iso-8859-1":
+        resp.encoding = resp.apparent_encoding
+    page = parse_list_page(resp.text, page_field)
+    page["page_no"] = page_no
+    return page
+
+
+class PageFetcher:
+    """
+    목록 페이지 미리 가져오기
+    첫 페이지는 바로 가져와 전체 페이지 수를 확인하고, 나머지 페이지는 작업자 풀에서 백그라운드로 요청합니다.
+    브라우저가 현재 페이지의 영수증을 캡처하는 동안 다음 페이지 행이 준비됩니다.
+    페이지 번호가 묶음(1~10)으로만 보이는 경우, 받은 페이지에서 더 큰 번호가 보이면 그만큼 더 요청합니다.
+    """
+
+    def __init__(self, session, form, workers=4, timeout=10):
+        self._request = (session, form)
+        self._timeout = timeout
+        self.first = fetch_list_page(session, form, 1, timeout)
+        self.page_count = 1
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._futures = {}
+        self._extend(self.first["pages"])
+
+    def _extend(self, page_count):
+        for n in range(self.page_count + 1, page_count + 1):
+            self._futures[n] = self._pool.submit(fetch_list_page, *self._request, n, self._timeout)
+        self.page_count = max(self.page_count, page_count)
+
+    def page(self, page_no):
+        """page_no 페이지의 parse_list_page 결과 (아직 받는 중이면 완료될 때까지 대기)"""
+        page = self.first if page_no == 1 else self._futures[page_no].result()
+        self._extend(page["pages"])
+        return page
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
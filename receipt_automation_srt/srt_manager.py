@@ -1,18 +1,109 @@
 import time
 import os
+import base64
 import pyperclip
 import re
 import datetime
+import json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from config import Config
+from driver_resolver import resolve_chromedriver
+from session_fetch import session_from_cookies, PageFetcher
 from xpath_config import XPathConfig
+from selector_registry import SelectorRegistry
+import common_path  # repo root on sys.path (receipt_common)
+from receipt_common.pdf_merge import merge_pdfs, merged_pdf_path
+from receipt_common.receipt_ledger import ReceiptLedger
+from receipt_common.run_trace import RunTrace
+from receipt_common.wait_log import WaitLog
+from waits import (wait_until, wait_for_element, document_ready, fonts_ready, mark_document,
+                   document_replaced, new_window, window_count, element_selected)
+
+# Reads every result row in one round trip (arguments[0] = list tbody).
+# Columns: 0:'', 1:Date, 2:Train, 3:Dep, 4:Arr, ... 8:Status, 9:Price
+JS_READ_RECEIPT_ROWS = """
+var rows = arguments[0].querySelectorAll(':scope > tr');
+var out = [];
+function text(cells, k) { return cells[k].innerText.trim(); }
+for (var i = 0; i < rows.length; i++) {
+    var cells = rows[i].querySelectorAll(':scope > td');
+    if (cells.length < 11) continue;
+    out.push({index: i, status: text(cells, 8), date: text(cells, 1), train: text(cells, 2),
+              dep: text(cells, 3), arr: text(cells, 4), price: text(cells, 9)});
+}
+return JSON.stringify({count: rows.length, first: rows.length ? rows[0].innerText : null, rows: out});
+"""
+
+# Web storage of the logged-in page, restored in the headless capture browser
+JS_READ_STORAGE = """
+return JSON.stringify({origin: location.origin, local: Object.assign({}, localStorage),
+                       session: Object.assign({}, sessionStorage)});
+"""
+
+# Runs before any page script in the capture browser; {storage} = JS_READ_STORAGE result.
+# Keys the site already set in this browser are left alone.
+JS_RESTORE_STORAGE = """
+(function() {{
+    var saved = {storage};
+    if (location.origin !== saved.origin) return;
+    try {{
+        [[saved.local, window.localStorage], [saved.session, window.sessionStorage]].forEach(function(pair) {{
+            for (var key in pair[0]) {{
+                if (pair[1].getItem(key) === null) pair[1].setItem(key, pair[0][key]);
+            }}
+        }});
+    }} catch (e) {{}}
+}})();
+"""
+
+# arguments[0] = pagination container; highest page number in link texts, pageNo=N hrefs and goPage(N) handlers
+JS_READ_PAGE_COUNT = """
+var max = 1;
+var nodes = arguments[0].querySelectorAll('*');
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var text = el.children.length ? '' : el.textContent.trim();
+    if (/^\\d+$/.test(text)) max = Math.max(max, parseInt(text, 10));
+    var code = (el.getAttribute('href') || '') + ' ' + (el.getAttribute('onclick') || '');
+    var re = /pageNo=(\\d+)|\\w+\\(\\s*'?(\\d+)/g, m;
+    while ((m = re.exec(code)) !== null) max = Math.max(max, parseInt(m[1] || m[2], 10));
+}
+return max;
+"""
+
+# The live search form as the site submits it (hidden inputs included), for the HTTP list fetch.
+# The page number field comes from the form, or else from the query of the pager links (arguments[0], may be null).
+JS_READ_SEARCH_FORM = """
+var form = document.getElementById('search-form');
+if (!form) return null;
+var fields = [];
+new FormData(form).forEach(function(value, name) {
+    if (typeof value === 'string') fields.push([name, value]);
+});
+var pageField = null;
+fields.forEach(function(f) { if (!pageField && /page.*(no|index|num)/i.test(f[0])) pageField = f[0]; });
+var links = arguments[0] ? arguments[0].querySelectorAll('a[href]') : [];
+for (var i = 0; i < links.length && !pageField; i++) {
+    var m = /[?&](\\w*page\\w*)=\\d+(?:&|$)/i.exec(links[i].getAttribute('href'));
+    if (m) pageField = m[1];
+}
+return JSON.stringify({action: form.action || location.href,
+                       method: (form.getAttribute('method') || 'get').toLowerCase(),
+                       fields: fields, page_field: pageField});
+"""
+
+# Number of the page the pager marks as current (<strong>, or an .on/.active/.current/aria-current item); null if none
+JS_READ_CURRENT_PAGE = """
+var marked = arguments[0].querySelectorAll('strong, .on, .active, .current, [aria-current]');
+for (var i = 0; i < marked.length; i++) {
+    var text = marked[i].textContent.trim();
+    if (/^\\d+$/.test(text)) return parseInt(text, 10);
+}
+return null;
+"""
 
 class SRTManager:
     def __init__(self, headless=Config.HEADLESS, log_callback=None):
@@ -33,11 +124,23 @@ class SRTManager:
         self.options.add_experimental_option('excludeSwitches', ['enable-logging'])
         
         self.driver = None
+        self.selectors = None # SelectorRegistry bound to the driver (fallback strategies + element cache)
+        self.waits = WaitLog() # How long each condition wait actually took
+        self.trace = RunTrace("srt") # Per-phase spans, written on close() when Config.TRACE is on
+
+        # Receipts saved in earlier runs are skipped before the print popup is opened
+        self.ledger = ReceiptLedger() if Config.USE_LEDGER else None
 
     def start_driver(self):
         if not self.driver:
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=self.options)
-            self.driver.implicitly_wait(Config.WAIT_TIMEOUT)
+            with self.trace.span("driver_resolve"):
+                driver_path = resolve_chromedriver(log=self._log)
+            with self.trace.span("browser_start"):
+                service = Service(driver_path) if driver_path else Service()
+                self.driver = webdriver.Chrome(service=service, options=self.options)
+            # No implicit wait: every step below waits explicitly with its own budget
+            self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
+            self.selectors = SelectorRegistry(self.driver, log=self._log)
 
     def _log(self, msg):
         timestamp = time.strftime("[%H:%M:%S]")
@@ -47,56 +150,446 @@ class SRTManager:
             self.log_callback(formatted_msg)
 
     def close(self):
+        if self.selectors and self.selectors.stats:
+            self._log("선택자 통계 (대상: 전략=횟수, 캐시 적중, 실패, 누적 시간):")
+            for line in self.selectors.summary():
+                self._log(f"  {line}")
+            self.selectors = None
+        if self.waits.records:
+            self._log("대기 통계:")
+            for line in self.waits.summary():
+                self._log(f"  {line}")
+            self.waits = WaitLog()
+        if Config.TRACE:
+            try:
+                path = self.trace.save()
+                self._log(f"실행 트레이스 저장: {path}")
+                for line in self.trace.summary():
+                    self._log(f"  {line}")
+            except OSError as e:
+                self._log(f"트레이스 저장 실패: {e}")
+            self.trace = RunTrace("srt")
         if self.driver:
             self.driver.quit()
             self.driver = None
+        if self.ledger:
+            self.ledger.close()
+            self.ledger = None
 
-    def wait_for_login(self):
+    def wait_for_login(self, timeout=None):
+        """Waits for the manual login (timeout in seconds, None = no deadline). Returns True once logged in."""
         self.start_driver()
         self._log(f"로그인 페이지로 이동 중: {Config.URL_LOGIN}")
         self.driver.get(Config.URL_LOGIN)
         
         self._log("사용자 로그인 대기 중... (브라우저에서 직접 로그인해주세요)")
         
-        while True:
+        def login_state():
+            # Check if browser is closed
+            try:
+                _ = self.driver.current_window_handle
+            except:
+                return "closed"
             try:
                 # Check for "My Page" element to confirm login
                 # XPath: /html/body/div[1]/header/div/div/div/div[2]/div/div/button
                 # Also check if text contains '마이페이지' as requested (though XPath is strict, text check is safer)
-                
-                # First, ensure main page is loaded?
-                # User asked to check if main page is open.
-                # If we are redirected to main page, URL might change to https://etk.srail.kr/main.do
-                
-                my_page_btn = self.driver.find_elements(By.XPATH, XPathConfig.MY_PAGE_BTN)
-                
-                if my_page_btn:
-                    btn_text = my_page_btn[0].text
-                    if "마이페이지" in btn_text:
-                        self._log("로그인 성공 확인 (마이페이지 감지됨).")
-                        return True
-                
-                # Check if browser is closed
-                try:
-                    _ = self.driver.current_window_handle
-                except:
-                    self._log("브라우저가 닫혔습니다. 작업을 중단합니다.")
-                    return False
-                    
-                time.sleep(1)
-                
-            except Exception as e:
+                my_page_btn = self.selectors.find("MY_PAGE_BTN")
+                if my_page_btn and "마이페이지" in my_page_btn.text:
+                    return "logged_in"
+            except Exception:
                 # If checking fails (e.g. alert open, switching pages), just continue waiting
                 pass
+            return None
+        
+        # No deadline by default: the user logs in by hand. Polling backs off to once per second.
+        with self.trace.span("login"):
+            state = wait_until(login_state, timeout, "login", self.waits, max_interval=1)
+        if state == "closed":
+            self._log("브라우저가 닫혔습니다. 작업을 중단합니다.")
+            return False
+        if not state:
+            self._log(f"로그인 대기 시간({timeout}초)이 지났습니다. 작업을 중단합니다.")
+            return False
+        self._log("로그인 성공 확인 (마이페이지 감지됨).")
+        if Config.HEADLESS_CAPTURE:
+            self.handoff_to_headless()
+        return True
+
+    def _capture_options(self):
+        """Options of the headless capture browser: own profile, fixed viewport, same user agent."""
+        options = Options()
+        options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--window-size={},{}'.format(*Config.CAPTURE_WINDOW_SIZE))
+        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        options.add_argument(f"user-data-dir={Config.CAPTURE_PROFILE_DIR}")
+        options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        return options
+
+    def handoff_to_headless(self):
+        """
+        Moves the logged-in session from the visible browser to a headless one.
+        All cookies (every domain, via CDP) are set before the first request and the page's
+        local/session storage is restored by a script that runs before the site's own scripts.
+        The headless browser must see the login (My Page button) on the page the user ended up on;
+        only then is the visible window closed. Returns False and keeps the visible browser otherwise.
+        """
+        worker = None
+        try:
+            with self.trace.span("handoff") as span:
+                landing_url = self.driver.current_url
+                cookies = self.driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+                storage = self.driver.execute_script(JS_READ_STORAGE)
+                span["cookies"] = len(cookies)
+
+                driver_path = resolve_chromedriver(log=self._log)
+                service = Service(driver_path) if driver_path else Service()
+                worker = webdriver.Chrome(service=service, options=self._capture_options())
+                worker.implicitly_wait(Config.IMPLICIT_WAIT)
+                worker.execute_cdp_cmd("Network.setCookies", {"cookies": [
+                    {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+                     if key in cookie and not (key == "expires" and cookie.get("session"))}
+                    for cookie in cookies
+                ]})
+                worker.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                       {"source": JS_RESTORE_STORAGE.format(storage=storage)})
+
+                worker.get(landing_url)
+                selectors = SelectorRegistry(worker, log=self._log)
+                selectors.stats = self.selectors.stats # One selector summary for the whole run
+                if not wait_until(lambda: selectors.find("MY_PAGE_BTN"), Config.WAIT_TIMEOUT, "handoff", self.waits):
+                    raise Exception("로그인 상태가 옮겨지지 않았습니다")
+        except Exception as e:
+            self._log(f"백그라운드 브라우저 전환 실패 (현재 창에서 계속): {e}")
+            if worker:
+                worker.quit()
+            return False
+
+        self.driver.quit()
+        self.driver = worker
+        self.selectors = selectors
+        self._log("로그인 세션을 백그라운드(headless) 브라우저로 옮겼습니다. 이후 작업은 화면 밖에서 진행됩니다.")
+        return True
+
+    def _read_receipt_rows(self):
+        """
+        Reads the whole result table with a single execute_script call.
+        Returns {"count", "first", "rows": [{"index", "status", "date", "train", "dep", "arr", "price"}]}
+        (rows with fewer than 11 cells are left out) or None if the table is not there.
+        """
+        tbody = self.selectors.find("RECEIPT_LIST_TABLE_BODY", Config.STEP_TIMEOUTS["results"])
+        if tbody is None:
+            return None
+        with self.trace.span("read_rows") as span:
+            page = json.loads(self.driver.execute_script(JS_READ_RECEIPT_ROWS, tbody))
+            span["rows"] = page["count"]
+        return page
+
+    def _parse_receipt_row(self, row, year_prefix):
+        """
+        Builds the file name and ledger key of one row.
+        Filename format: srt_yy년mm월dd일(요일)(시분-시분)_출발지_목적지_가격.png (or .pdf)
+        """
+        # Cell texts, e.g. date "1월 23일\n(금)", dep "수서\n19:08", arr "나주\n21:19", price "41,300"
+        raw_date = row["date"]
+        raw_dep = row["dep"]
+        raw_arr = row["arr"]
+        raw_price = row["price"].replace(",", "")
+
+        # The list shows no year; it is taken from the search start date (or the current year)
+        date_match = re.search(r"(\d+)월\s*(\d+)일\s*(\(.\))", raw_date.replace("\n", ""))
+        if date_match:
+            month = date_match.group(1).zfill(2)
+            day = date_match.group(2).zfill(2)
+            day_of_week = date_match.group(3) # (금)
+            formatted_date = f"{year_prefix}년{month}월{day}일{day_of_week}"
+        else:
+            formatted_date = f"{year_prefix}년{raw_date.replace(' ', '')}"
+
+        # "수서\n19:08" -> place, HHMM
+        dep_match = re.search(r"([^\d\n]+)\s*(\d{2}):(\d{2})", raw_dep.replace("\n", " "))
+        arr_match = re.search(r"([^\d\n]+)\s*(\d{2}):(\d{2})", raw_arr.replace("\n", " "))
+
+        dep_place = arr_place = dep_time = arr_time = ""
+        if dep_match:
+            dep_place = dep_match.group(1).strip()
+            dep_time = dep_match.group(2) + dep_match.group(3) # 1908
+        if arr_match:
+            arr_place = arr_match.group(1).strip()
+            arr_time = arr_match.group(2) + arr_match.group(3) # 2119
+
+        filename = f"srt_{formatted_date}({dep_time}-{arr_time})_{dep_place}_{arr_place}_{raw_price}.{Config.OUTPUT_FORMAT}"
+        # Clean invalid chars
+        filename = re.sub(r'[\\/*?:"<>|]', "", filename)
+
+        # Stable identity for the ledger (same row -> same key across runs)
+        key = "|".join(
+            " ".join(part.split()) for part in
+            (year_prefix, raw_date, row["train"], raw_dep, raw_arr, raw_price)
+        )
+        return {"filename": filename, "key": key, "date": formatted_date,
+                "dep": dep_place, "arr": arr_place, "price": raw_price}
+
+    def _start_page_fetcher(self):
+        """
+        Starts fetching the result pages over HTTP with the browser's session cookies, sending the
+        search form exactly as the page holds it: page 1 now (for the page count), the rest in the
+        background while the browser captures. Only list pages are fetched; receipts are still printed
+        in the browser. Returns None when the fast path is unavailable; the browser walk then checks every page.
+        """
+        try:
+            with self.trace.span("enumerate") as span:
+                form = json.loads(self.driver.execute_script(
+                    JS_READ_SEARCH_FORM, self.selectors.find("PAGINATION_CONTAINER")) or "null")
+                if not form or not form["page_field"]:
+                    self._log("조회 폼에서 페이지 번호 필드를 찾지 못해 HTTP 목록 조회를 건너뜁니다.")
+                    return None
+                session = session_from_cookies(
+                    self.driver.get_cookies(),
+                    user_agent=self.driver.execute_script("return navigator.userAgent"),
+                    pool_size=Config.FETCH_WORKERS,
+                )
+                fetcher = PageFetcher(session, form, workers=Config.FETCH_WORKERS)
+                span["pages"] = fetcher.page_count
+        except Exception as e:
+            self._log(f"HTTP 목록 조회 실패 (브라우저로 진행): {e}")
+            return None
+
+        if not fetcher.first["rows"]:
+            # Also what a logged-out response looks like; don't trust it to skip anything
+            fetcher.close()
+            return None
+        self._log(f"HTTP 목록 조회: 전체 {fetcher.page_count}페이지")
+        return fetcher
+
+    def _pending_rows(self, page, year_prefix):
+        """
+        Ledger keys of an HTTP-fetched page still to capture (issued and not in the ledger),
+        and how many issued rows were left out because the ledger already has them.
+        """
+        pending = []
+        already_saved = 0
+        for row in page["rows"]:
+            if "발권완료" not in row["status"]:
+                continue
+            key = self._parse_receipt_row(row, year_prefix)["key"]
+            if self.ledger and self.ledger.is_captured("srt", key):
+                already_saved += 1
+                continue
+            pending.append(key)
+        return pending, already_saved
+
+    def _row_keys(self, rows, year_prefix):
+        return [self._parse_receipt_row(row, year_prefix)["key"] for row in rows]
+
+    def _read_page_count(self):
+        """Highest page number the pagination container links to (1 if there is no pagination)."""
+        container = self.selectors.find("PAGINATION_CONTAINER")
+        if container is None:
+            return 1
+        try:
+            return int(self.driver.execute_script(JS_READ_PAGE_COUNT, container))
+        except Exception:
+            return 1
+
+    def _read_current_page(self):
+        """Page number the pager marks as current, or None if it marks none."""
+        container = self.selectors.find("PAGINATION_CONTAINER")
+        if container is None:
+            return None
+        return self.driver.execute_script(JS_READ_CURRENT_PAGE, container)
+
+    def _goto_page(self, target, current):
+        """
+        Navigates from page current to page target by clicking its number link; when the link
+        is not in the visible number block, steps with the next button until it is.
+        After each click the page actually shown is read back from the pager.
+        Returns False if the page could not be reached.
+        """
+        with self.trace.span("goto_page", page=target, start=current):
+            while current < target:
+                links = self.driver.find_elements(By.XPATH, XPathConfig.PAGE_NUMBER_LINK_TEMPLATE.format(target))
+                link = next((el for el in links if el.is_displayed()), None)
+                if link is None:
+                    link = self.selectors.find("NEXT_PAGE_BTN")
+                    if link is None:
+                        return False
+                    step = current + 1
+                else:
+                    step = target
+                mark_document(self.driver)
+                link.click()
+
+                def moved():
+                    # Full page load, or a pager that updates in place
+                    if document_replaced(self.driver)():
+                        return True
+                    self.selectors.invalidate("PAGINATION_CONTAINER")
+                    shown = self._read_current_page()
+                    return shown is not None and shown != current
+                wait_until(moved, Config.STEP_TIMEOUTS["next_page"], "next_page", self.waits)
+                self.selectors.invalidate("PAGINATION_CONTAINER")
+                shown = self._read_current_page()
+                if shown is None:
+                    # Pager marks no current page; rely on the page that was clicked
+                    shown = step if document_replaced(self.driver)() else current
+                if shown <= current:
+                    return False
+                current = shown
+        return current == target
+
+    def _uncheck_row(self, chk_xpath):
+        """Unselects a row checkbox again (robust retry with JS clicks)."""
+        try:
+            for attempt in range(3):
+                chk = self.driver.find_element(By.XPATH, chk_xpath)
+                if chk.is_selected():
+                    self._log(f"체크박스 해제 시도 {attempt+1}...")
+                    # Use JS click for reliability
+                    self.driver.execute_script("arguments[0].click();", chk)
+                    wait_until(element_selected(chk, False), Config.STEP_TIMEOUTS["uncheck"], "uncheck", self.waits)
+                else:
+                    self._log("체크박스 해제 확인됨.")
+                    break
             
-            time.sleep(1)
+            # Final check
+            chk = self.driver.find_element(By.XPATH, chk_xpath)
+            if chk.is_selected():
+                self._log("경고: 체크박스가 여전히 선택되어 있습니다.")
+        except Exception as e:
+            self._log(f"체크박스 해제 중 오류: {e}")
+
+    def _open_receipt_popup(self, row_num):
+        """
+        Selects row row_num (1-based) and clicks print. The main window stays current and the row
+        stays selected until the popup is done with it (unselected here only if no popup opened).
+        Returns the popup's window handle, or None if no popup opened.
+        """
+        # XPath: //*[@id='list-form']/fieldset/div/table/tbody/tr[row_num]/td[1]/input
+        chk_xpath = XPathConfig.CHECKBOX_XPATH_TEMPLATE.format(row_num)
+        with self.trace.span("select"):
+            chk = wait_for_element(self.driver, (By.XPATH, chk_xpath), Config.STEP_TIMEOUTS["row_checkbox"],
+                                   "row_checkbox", self.waits)
+            if chk is None:
+                raise Exception("row checkbox not found")
+            chk.click()
+            wait_until(element_selected(chk), Config.STEP_TIMEOUTS["checkbox"], "checkbox", self.waits)
+        
+        handles_before = self.driver.window_handles
+        popup = None
+        try:
+            with self.trace.span("print"):
+                if not self.selectors.click("PRINT_BTN", Config.STEP_TIMEOUTS["print_btn"]):
+                    raise Exception("PRINT_BTN not found")
+                popup = wait_until(new_window(self.driver, handles_before), Config.STEP_TIMEOUTS["popup_open"],
+                                   "popup_open", self.waits)
+                return popup
+        finally:
+            if not popup:
+                self._uncheck_row(chk_xpath)
+
+    def _wait_popup_loaded(self, popup, main_window):
+        """Waits until the popup's document has loaded (it has read the selected rows by then)."""
+        try:
+            self.driver.switch_to.window(popup)
+            wait_until(document_ready(self.driver), Config.STEP_TIMEOUTS["popup_render"], "popup_load", self.waits)
+        except Exception as e:
+            self._log(f"팝업 로딩 확인 실패: {e}")
+        finally:
+            self.driver.switch_to.window(main_window)
+
+    def _capture_popup(self, popup, filepath):
+        """
+        Switches to a print popup, waits for its render and writes the receipt
+        (PNG of the content area, or the whole popup as PDF). The popup is closed either way.
+        """
+        self.driver.switch_to.window(popup)
+        try:
+            # Content should be captured without print dialog now
+            # Wait render: document loaded and web fonts applied
+            with self.trace.span("popup_ready"):
+                wait_until(lambda: document_ready(self.driver)() and fonts_ready(self.driver)(),
+                           Config.STEP_TIMEOUTS["popup_render"], "popup_render", self.waits)
+            if Config.OUTPUT_FORMAT == "pdf":
+                with self.trace.span("capture"):
+                    data = self._print_popup_pdf()
+            else:
+                target = self.selectors.find("POPUP_CONTENT", Config.STEP_TIMEOUTS["popup_content"])
+                if target is None:
+                    raise Exception("POPUP_CONTENT not found")
+                # Render + PNG encode happen in the browser; the write is timed separately
+                with self.trace.span("capture"):
+                    data = target.screenshot_as_png
+            with self.trace.span("file_write", bytes=len(data)):
+                with open(filepath, "wb") as f:
+                    f.write(data)
+        finally:
+            self.selectors.invalidate("POPUP_CONTENT")
+            remaining = len(self.driver.window_handles) - 1
+            self.driver.close()
+            wait_until(window_count(self.driver, remaining), Config.STEP_TIMEOUTS["popup_close"],
+                       "popup_close", self.waits)
+
+    def _drain_popups(self, in_flight, main_window, result, saved_pdfs):
+        """
+        Captures the open print popups in the order they were opened, then returns to the main window.
+        Rows not unselected yet (one popup at a time) are unselected after their popup is closed.
+        """
+        while in_flight:
+            job = in_flight.pop(0)
+            receipt = job["receipt"]
+            try:
+                self._capture_popup(job["popup"], job["filepath"])
+            except Exception as e:
+                self._log(f"영수증 저장 실패: {e}")
+                result["failed"] += 1
+                self.trace.end(job["span"], error=str(e))
+                continue
+            finally:
+                if job["chk_xpath"]:
+                    self.driver.switch_to.window(main_window)
+                    self._uncheck_row(job["chk_xpath"])
+            self._log(f"저장 완료: {job['filepath']}")
+            result["captured"].append({
+                "file": job["filepath"], "date": receipt["date"],
+                "route": f"{receipt['dep']}-{receipt['arr']}", "price": receipt["price"],
+                "page": job["page"], "row": job["row"],
+                "ms": round((time.perf_counter() - job["start"]) * 1000),
+            })
+            if Config.OUTPUT_FORMAT == "pdf":
+                saved_pdfs.append(job["filepath"])
+            if self.ledger:
+                self.ledger.record(
+                    "srt", receipt["key"],
+                    travel_date=receipt["date"],
+                    route=f"{receipt['dep']}-{receipt['arr']}",
+                    price=receipt["price"],
+                    file_path=job["filepath"],
+                )
+            self.trace.end(job["span"])
+        self.driver.switch_to.window(main_window)
+
+    def _print_popup_pdf(self):
+        """Prints the current (popup) window with CDP Page.printToPDF and returns the PDF bytes."""
+        result = self.driver.execute_cdp_cmd("Page.printToPDF", Config.PDF_OPTIONS)
+        return base64.b64decode(result["data"])
 
     def goto_receipt_page(self):
         self._log(f"영수증 목록 페이지로 이동: {Config.URL_RECEIPT_LIST}")
-        self.driver.get(Config.URL_RECEIPT_LIST)
-        time.sleep(2)
+        with self.trace.span("receipt_page"):
+            self.driver.get(Config.URL_RECEIPT_LIST)
+            wait_until(lambda: self.selectors.find("SEARCH_BTN"), Config.STEP_TIMEOUTS["receipt_page"], "receipt_page", self.waits)
 
-    def capture_with_checkbox(self, limit=100, start_date=None, end_date=None, save_dir=None):
+    def capture_with_checkbox(self, limit=None, start_date=None, end_date=None, save_dir=None):
+        """
+        Captures the issued receipts of the search range (stops after `limit` saved receipts if given).
+        Returns {"captured": [{"file", "date", "route", "price", "page", "row", "ms"}],
+                 "skipped": already in the ledger, "failed": receipts that could not be saved,
+                 "pages": pages opened in the browser, "merged_pdf": path or None,
+                 "aborted": reason the walk stopped early or None}
+        """
         # Set Dates if provided
         if start_date and end_date:
             try:
@@ -132,9 +625,12 @@ class SRTManager:
 
         # Search
         try:
-            search_btn = self.driver.find_element(By.XPATH, XPathConfig.SEARCH_BTN)
-            search_btn.click()
-            time.sleep(2)
+            with self.trace.span("search"):
+                mark_document(self.driver)
+                if not self.selectors.click("SEARCH_BTN", Config.STEP_TIMEOUTS["receipt_page"]):
+                    raise Exception("SEARCH_BTN not found")
+                # The search submits the form; the old 2s sleep is now only the upper bound
+                wait_until(document_replaced(self.driver), Config.STEP_TIMEOUTS["search"], "search", self.waits)
         except:
             self._log("조회 버튼 클릭 실패")
 
@@ -144,201 +640,146 @@ class SRTManager:
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
-        page_num = 1
-        previous_first_row_text = None
+        saved_pdfs = [] # PDFs written in this run (merged at the end when Config.MERGE_PDF)
+        result = {"captured": [], "skipped": 0, "failed": 0, "pages": 0, "merged_pdf": None, "aborted": None}
+        year_prefix = start_date[2:4] if start_date else str(datetime.datetime.now().year)[2:]
+
+        # The HTTP fast path prefetches every page's rows in the background (None = check every page in the browser)
+        fetcher = None
+        if Config.FAST_ENUMERATE and start_date and end_date:
+            fetcher = self._start_page_fetcher()
+        # Page count is read up front; pages are visited by number instead of comparing first rows
+        page_count = self._read_page_count()
+        page_num = 1 # Page the browser is on
+        target = 1 # Next page to process
         
-        while True:
-            self._log(f"페이지 {page_num} 처리 중...")
+        verified = False # The HTTP list may skip pages only once its page 1 matched the browser's
+        
+        while target <= page_count:
+            pending = None
+            if fetcher and verified:
+                try:
+                    pending, already_saved = self._pending_rows(fetcher.page(target), year_prefix)
+                except Exception as e:
+                    self._log(f"HTTP 목록 {target}페이지 조회 실패 (브라우저로 확인): {e}")
+                page_count = fetcher.page_count
+                if pending == []:
+                    result["skipped"] += already_saved
+                    # Nothing to capture here; the browser does not even navigate to this page
+                    target += 1
+                    continue
+            
+            if target != page_num:
+                if not self._goto_page(target, page_num):
+                    self._log(f"{target}페이지로 이동하지 못했습니다.")
+                    result["aborted"] = f"page {target} not reachable"
+                    break
+                page_num = target
+            result["pages"] += 1
+            self._log(f"페이지 {page_num}/{page_count} 처리 중...")
             
             try:
-                tbody = self.driver.find_element(By.XPATH, XPathConfig.RECEIPT_LIST_TABLE_BODY)
-                rows = tbody.find_elements(By.TAG_NAME, "tr")
+                page = self._read_receipt_rows()
+                rows = page["rows"] if page else []
                 
-                if not rows:
+                if not page or not page["count"]:
                     self._log("데이터가 없습니다.")
                     break
                 
-                current_first_row_text = rows[0].text
-                if current_first_row_text == previous_first_row_text:
-                    self._log("마지막 페이지입니다.")
-                    break
-                previous_first_row_text = current_first_row_text
+                if fetcher and not verified:
+                    # Page 1 is already on screen; the HTTP list is trusted only if it shows the same rows
+                    if self._row_keys(fetcher.first["rows"], year_prefix) == self._row_keys(rows, year_prefix):
+                        verified = True
+                        page_count = fetcher.page_count
+                    else:
+                        self._log("HTTP 목록이 화면의 목록과 달라 모든 페이지를 브라우저에서 확인합니다.")
+                        fetcher.close()
+                        fetcher = None
                 
                 # Inject JS to block print dialog in opened windows
-                # This overrides window.open to hook into the new window and disable its print function
+                # This overrides window.open to hook into the new window and disable its print function.
+                # Once the print handler has run, the popup's name is cleared so the next print opens
+                # a new window instead of reusing one that is still waiting to be captured.
                 js_block_print = """
                 if (!window.oldOpen) {
                     window.oldOpen = window.open;
                     window.open = function(url, name, specs) {
                         var newWin = window.oldOpen(url, name, specs);
                         newWin.print = function() { console.log('Print blocked by automation'); };
+                        setTimeout(function() { try { newWin.name = ''; } catch (e) {} }, 0);
                         return newWin;
                     };
                 }
                 """
                 self.driver.execute_script(js_block_print)
                 
-                # Iterate rows by index to avoid staleness
-                count = len(rows)
-                for i in range(count):
-                    try:
-                        # Re-find row properly
-                        tbody = self.driver.find_element(By.XPATH, XPathConfig.RECEIPT_LIST_TABLE_BODY)
-                        row = tbody.find_elements(By.TAG_NAME, "tr")[i]
-                        cols = row.find_elements(By.TAG_NAME, "td")
-                        
-                        if len(cols) < 11: continue
-
-                        # 0:'', 1:Date, 2:Train, 3:Dep, 4:Arr, ... 8:Status, 9:Price
-                        status = cols[8].text.strip()
+                # Rows were read in one round trip; only rows to print touch the page again.
+                # Up to Config.POPUPS_IN_FLIGHT print popups are opened before they are captured,
+                # so Chrome renders them in parallel while the main window selects the next rows.
+                main_window = self.driver.current_window_handle
+                in_flight = []
+                try:
+                    for row in rows:
+                        if limit is not None and len(result["captured"]) + len(in_flight) >= limit:
+                            break
+                        if "발권완료" not in row["status"]:
+                            continue
+                        i = row["index"]
+                        receipt = self._parse_receipt_row(row, year_prefix)
+                        if self.ledger and self.ledger.is_captured("srt", receipt["key"]):
+                            self._log(f"이미 저장된 영수증 건너뜀: {receipt['filename']}")
+                            result["skipped"] += 1
+                            continue
                         
-                        if "발권완료" in status:
-                            # Extract Data
-                            # Date: 1월 23일\n(금) -> 01월23일(금)
-                            raw_date = cols[1].text.strip() # "1월 23일\n(금)"
-                            # Train: SRT\n665
-                            # Dep: 수서\n19:08
-                            # Arr: 나주\n21:19
-                            # Price: 41,300
-                            
-                            raw_dep = cols[3].text.strip() # "수서\n19:08"
-                            raw_arr = cols[4].text.strip() # "나주\n21:19"
-                            raw_price = cols[9].text.strip().replace(",", "") # "41,300" -> "41300"
-                            
-                            # Parse components
-                            # Year is tricky. Assuming current year or passed year? 
-                            # If passed start_date starts with 2024, assume 2024?
-                            # Filename format: yy년mm월dd일(요일)(시분-시분)_출발지_목적지_가격
-                            
-                            # Date parsing
-                            # raw_date looks like: "1월 23일\n(금)"
-                            # Remove newlines
-                            date_str = raw_date.replace("\n", "").replace(" ", "") # "1월23일(금)"
-                            
-                            # Add Year? User requested "yy년..."
-                            # Let's derive year from start_date if available (e.g. 2026), or current.
-                            # But SRT list might cross years.
-                            # Assuming start_date year prefix.
-                            year_prefix = start_date[2:4] if start_date else str(datetime.datetime.now().year)[2:]
-                            
-                            final_date_str = f"{year_prefix}년{date_str}" 
-                            # date_str already has "mm월dd일(요일)" roughly? 
-                            # Actually "1월23일(금)" -> we need "mm월dd일(요일)" format exactly.
-                            # If raw is "1월 23일", we need to pad 0 if needed? "01월23일"?
-                            # SRT shows "1월 23일".
-                            
-                            # Regex to robustly parse "X월 Y일(Z)"
-                            import re
-                            date_match = re.search(r"(\d+)월\s*(\d+)일\s*(\(.\))", raw_date.replace("\n", ""))
-                            if date_match:
-                                month = date_match.group(1).zfill(2)
-                                day = date_match.group(2).zfill(2)
-                                day_of_week = date_match.group(3) # (금)
-                                
-                                formatted_date = f"{year_prefix}년{month}월{day}일{day_of_week}"
-                            else:
-                                formatted_date = f"{year_prefix}년{raw_date.replace(' ', '')}"
-
-                            # Time parsing
-                            # "수서\n19:08"
-                            dep_match = re.search(r"([^\d\n]+)\s*(\d{2}):(\d{2})", raw_dep.replace("\n", " "))
-                            arr_match = re.search(r"([^\d\n]+)\s*(\d{2}):(\d{2})", raw_arr.replace("\n", " "))
-                            
-                            time_str = ""
-                            dep_place = ""
-                            arr_place = ""
-                            
-                            if dep_match:
-                                dep_place = dep_match.group(1).strip()
-                                dep_time = dep_match.group(2) + dep_match.group(3) # 1908
-                            if arr_match:
-                                arr_place = arr_match.group(1).strip()
-                                arr_time = arr_match.group(2) + arr_match.group(3) # 2119
-                                
-                            time_part = f"({dep_time}-{arr_time})"
-                            
-                            filename = f"srt_{formatted_date}{time_part}_{dep_place}_{arr_place}_{raw_price}.png"
-                            
-                            # Clean invalid chars
-                            filename = re.sub(r'[\\/*?:"<>|]', "", filename)
-                            filepath = os.path.join(save_dir, filename)
-                            
-                            self._log(f"캡처 시도: {filename}")
-                            
-                            # 1. Check Checkbox
-                            # XPath: //*[@id='list-form']/fieldset/div/table/tbody/tr[i+1]/td[1]/input
-                            chk_xpath = XPathConfig.CHECKBOX_XPATH_TEMPLATE.format(i+1)
-                            self.driver.find_element(By.XPATH, chk_xpath).click()
-                            time.sleep(0.5)
-                            
-                            # 2. Click Print Button
-                            self.driver.find_element(By.XPATH, XPathConfig.PRINT_BTN).click()
-                            time.sleep(2)
-                            
-                            # 3. Switch to Popup
-                            main_window = self.driver.current_window_handle
-                            all_windows = self.driver.window_handles
-                            if len(all_windows) > 1:
-                                popup = [w for w in all_windows if w != main_window][-1]
-                                self.driver.switch_to.window(popup)
-                                
-                                # Content should be captured without print dialog now
-                                time.sleep(2) # Wait render
-                                
-                                # 4. Capture content
-                                try:
-                                    target = self.driver.find_element(By.XPATH, XPathConfig.POPUP_CONTENT)
-                                    target.screenshot(filepath)
-                                    self._log(f"저장 완료: {filepath}")
-                                except Exception as e:
-                                    self._log(f"스크린샷 저장 실패: {e}")
-                                    
-                                # 5. Close Popup
-                                self.driver.close()
-                                self.driver.switch_to.window(main_window)
-                                time.sleep(1)
-                            else:
-                                self._log("인쇄 팝업이 뜨지 않았습니다.")
-                                
-                            # 6. Uncheck Checkbox (Robust Retry)
-                            try:
-                                for attempt in range(3):
-                                    chk = self.driver.find_element(By.XPATH, chk_xpath)
-                                    if chk.is_selected():
-                                        self._log(f"체크박스 해제 시도 {attempt+1}...")
-                                        # Use JS click for reliability
-                                        self.driver.execute_script("arguments[0].click();", chk)
-                                        time.sleep(0.5)
-                                    else:
-                                        self._log("체크박스 해제 확인됨.")
-                                        break
-                                
-                                # Final check
-                                chk = self.driver.find_element(By.XPATH, chk_xpath)
-                                if chk.is_selected():
-                                    self._log("경고: 체크박스가 여전히 선택되어 있습니다.")
-                            except Exception as e:
-                                self._log(f"체크박스 해제 중 오류: {e}")
-                            
-                    except Exception as e:
-                        self._log(f"항목 {i+1} 처리 중 오류: {e}")
+                        self._log(f"캡처 시도: {receipt['filename']}")
+                        job = {"receipt": receipt, "filepath": os.path.join(save_dir, receipt["filename"]),
+                               "page": page_num, "row": i+1, "start": time.perf_counter(),
+                               "span": self.trace.begin("receipt", page=page_num, row=i+1)}
+                        try:
+                            job["popup"] = self._open_receipt_popup(i+1)
+                        except Exception as e:
+                            self._log(f"항목 {i+1} 처리 중 오류: {e}")
+                            result["failed"] += 1
+                            self.trace.end(job["span"], error=str(e))
+                            continue
+                        if not job["popup"]:
+                            self._log("인쇄 팝업이 뜨지 않았습니다.")
+                            result["failed"] += 1
+                            self.trace.end(job["span"], error="no popup")
+                            continue
+                        job["chk_xpath"] = XPathConfig.CHECKBOX_XPATH_TEMPLATE.format(i+1)
+                        if Config.POPUPS_IN_FLIGHT > 1:
+                            # Pipelined: the next row is selected while this popup is still open,
+                            # so this row is unselected once the popup has loaded its document
+                            self._wait_popup_loaded(job["popup"], main_window)
+                            self._uncheck_row(job["chk_xpath"])
+                            job["chk_xpath"] = None
+                        in_flight.append(job)
+                        if len(in_flight) >= Config.POPUPS_IN_FLIGHT:
+                            self._drain_popups(in_flight, main_window, result, saved_pdfs)
+                finally:
+                    # Popups still open when the row loop ends (or fails) are captured as well
+                    self._drain_popups(in_flight, main_window, result, saved_pdfs)
                         
             except Exception as e:
                 if "invalid session id" in str(e).lower():
                     self._log("세션 종료됨.")
+                    result["aborted"] = "session closed"
                     break
                 self._log(f"오류: {e}")
 
-            # Pagination
-            try:
-                next_btn_xpath = XPathConfig.NEXT_PAGE_BTN_INDEX
-                next_btns = self.driver.find_elements(By.XPATH, next_btn_xpath)
-                if next_btns:
-                    next_btns[0].click()
-                    time.sleep(2)
-                    page_num += 1
-                else:
-                    self._log("마지막 페이지.")
-                    break
-            except:
+            if limit is not None and len(result["captured"]) >= limit:
+                self._log(f"요청한 {limit}건을 저장했습니다.")
                 break
+            if fetcher is None:
+                # Number blocks slide (1-10, 11-20, ...); pages beyond the first block show up as we go
+                page_count = max(page_count, self._read_page_count())
+            target += 1
+
+        if fetcher:
+            fetcher.close()
+
+        if Config.MERGE_PDF and saved_pdfs:
+            with self.trace.span("merge_pdf", files=len(saved_pdfs)):
+                result["merged_pdf"] = merge_pdfs(saved_pdfs, merged_pdf_path(save_dir, "srt"), log=self._log)
+        return result
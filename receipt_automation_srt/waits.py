@@ -0,0 +1,91 @@
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+def wait_until(predicate, timeout, name="wait", log=None, interval=0.05, backoff=1.5, max_interval=0.5):
+    """
+    Polls predicate() until it returns a truthy value or the deadline passes.
+
+    The poll interval starts at `interval` and grows by `backoff` up to `max_interval`,
+    so fast conditions return within a few ms and slow ones don't hammer the driver.
+    Exceptions from the predicate (stale elements, page in transition) count as "not yet".
+    timeout=None waits without a deadline. Returns the last predicate value.
+    """
+    start = time.perf_counter()
+    deadline = None if timeout is None else start + timeout
+    result = None
+    while True:
+        try:
+            result = predicate()
+        except WebDriverException:
+            result = None
+        if result:
+            break
+        now = time.perf_counter()
+        if deadline is not None and now >= deadline:
+            break
+        sleep_for = interval if deadline is None else min(interval, deadline - now)
+        time.sleep(max(sleep_for, 0))
+        interval = min(interval * backoff, max_interval)
+
+    if log is not None:
+        log.record(name, time.perf_counter() - start, bool(result))
+    return result
+
+
+def wait_for_element(driver, locator, timeout, name="element", log=None, condition=EC.element_to_be_clickable):
+    """
+    WebDriverWait for one element (condition(locator), clickable by default) with a per-step budget.
+    Meant for a driver running with implicit wait 0. Returns the element, or None on timeout.
+    """
+    start = time.perf_counter()
+    try:
+        element = WebDriverWait(driver, timeout, poll_frequency=0.05).until(condition(locator))
+    except TimeoutException:
+        element = None
+    if log is not None:
+        log.record(name, time.perf_counter() - start, element is not None)
+    return element
+
+
+# --- Predicates (each returns a zero-argument callable) ---
+
+def document_ready(driver):
+    return lambda: driver.execute_script("return document.readyState") == "complete"
+
+
+def fonts_ready(driver):
+    """Web fonts finished loading (screenshots taken earlier render fallback glyphs)."""
+    return lambda: driver.execute_script("return !document.fonts || document.fonts.status === 'loaded'")
+
+
+def mark_document(driver):
+    """Tags the current document; pair with document_replaced() to detect a navigation."""
+    driver.execute_script("window.__waitMarker = true;")
+
+
+def document_replaced(driver):
+    """True once the marked document was replaced by a new one that finished loading."""
+    return lambda: driver.execute_script(
+        "return !window.__waitMarker && document.readyState === 'complete'"
+    )
+
+
+def new_window(driver, known_handles):
+    """Returns the handle of a window that was not in known_handles (popup created)."""
+    known = set(known_handles)
+
+    def check():
+        fresh = [h for h in driver.window_handles if h not in known]
+        return fresh[-1] if fresh else None
+    return check
+
+
+def window_count(driver, count):
+    return lambda: len(driver.window_handles) == count
+
+
+def element_selected(element, selected=True):
+    return lambda: element.is_selected() == selected
@@ -20,8 +20,10 @@ class XPathConfig:
     
     # Pagination
     PAGINATION_CONTAINER = "//*[@id='wrap']/div[4]/div/div[4]/div[4]"
-    NEXT_PAGE_BTN = "//*[@id='wrap']/div[4]/div/div[4]/div[4]/a[contains(@class, 'next') or contains(text(), '다음')]"
+    NEXT_PAGE_BTN = "//*[@id='wrap']/div[4]/div/div[4]/div[4]//a[normalize-space(.)='다음' or contains(concat(' ', normalize-space(@class), ' '), ' next ')]"
     NEXT_PAGE_BTN_INDEX = "//*[@id='wrap']/div[4]/div/div[4]/div[4]/a[4]" 
+    # Page number link in the pagination container
+    PAGE_NUMBER_LINK_TEMPLATE = "//*[@id='wrap']/div[4]/div/div[4]/div[4]//a[normalize-space(.)='{}']"
 
     # New Checkbox Capture Flow
     # Checkbox in td[1]
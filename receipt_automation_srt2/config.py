@@ -1,14 +1,43 @@
 import os
 
 class Config:
-    # URLs
-    URL_LOGIN = "https://etk.srail.kr/cmc/01/selectLoginForm.do?pageId=TK0701000000"
-    URL_RECEIPT_LIST = "https://etk.srail.kr/hpg/hta/03/selectBreakdownList.do?pageId=TK0102030100"
+    # URLs (SRT_BASE_URL 지정 시 다른 서버 사용 - 예: offline_replay 픽스처 서버)
+    BASE_URL = os.environ.get("SRT_BASE_URL", "https://etk.srail.kr")
+    URL_LOGIN = f"{BASE_URL}/cmc/01/selectLoginForm.do?pageId=TK0701000000"
+    URL_RECEIPT_LIST = f"{BASE_URL}/hpg/hta/03/selectBreakdownList.do?pageId=TK0102030100"
     
     # Paths
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     DEFAULT_SAVE_DIR = os.path.join(os.path.expanduser("~"), "Desktop", "출장복명")
     SETTINGS_FILE = os.path.join(BASE_DIR, "settings.json")
     
+    # 요소/팝업 대기 최대 시간 (초) - 조건이 만족되면 즉시 진행
+    WAIT_TIMEOUT = 10
+    
+    # 이미 저장한 영수증은 다음 실행에서 건너뜀 (receipt_ledger.db)
+    USE_LEDGER = True
+
+    # 로그 레벨 (DEBUG / INFO / WARNING / ERROR)과 UI에 보관할 최근 로그 줄 수
+    LOG_LEVEL = "INFO"
+    LOG_RING_SIZE = 1000
+
+    # 단계별 소요 시간을 트레이스 파일로 저장 (~/.receipt_automation/traces, RECEIPT_TRACE_DIR로 변경)
+    TRACE = True
+
+    # 저장 형식: "png" / "jpeg" / "webp" = 영수증 본문 영역만 잘라낸 스크린샷 (CDP Page.captureScreenshot),
+    # "pdf" = CDP Page.printToPDF로 팝업을 벡터 PDF로 저장
+    OUTPUT_FORMAT = "png"
+    SCREENSHOT_QUALITY = 85  # jpeg / webp 품질 (0~100, png는 무시)
+    # pdf 형식일 때 이번 실행에서 저장한 영수증을 하나의 PDF로도 저장 (pypdf 필요)
+    MERGE_PDF = False
+    PDF_OPTIONS = {"print_background": True, "prefer_css_page_size": True}
+
+    # 보이는 창에서 직접 로그인한 뒤 세션(쿠키 + 웹 스토리지)을 headless 브라우저로 옮겨
+    # 목록 조회/인쇄/캡처를 화면 밖에서 고정 크기 창으로 진행
+    HEADLESS_CAPTURE = False
+    CAPTURE_WINDOW_SIZE = (1280, 1024)
+
     # Browser Profile - persistent profile for "회원 아이디 저장" support
     PROFILE_DIR = os.path.join(os.environ.get("TEMP", "."), "srt_chrome_profile_v2")
+    # headless 캡처 브라우저 프로필 (보이는 브라우저가 PROFILE_DIR을 사용 중이므로 별도)
+    CAPTURE_PROFILE_DIR = os.path.join(os.environ.get("TEMP", "."), "srt_chrome_capture_profile_v2")
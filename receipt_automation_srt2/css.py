@@ -24,7 +24,6 @@ class CSS:
     
     # 조회 결과 리스트
     CHECKBOX_TEMPLATE = "#list-form > fieldset > div > table > tbody > tr:nth-child({row}) > td:nth-child(1) > input[type=checkbox]"  # 체크박스
-    TICKET_STATUS_TEMPLATE = "#list-form > fieldset > div > table > tbody > tr:nth-child({row}) > td:nth-child(9)"  # 발권상태
     RESULT_ROWS = "#list-form > fieldset > div > table > tbody > tr"  # 전체 결과 행
     
     # 영수증 인쇄 버튼
@@ -33,3 +32,4 @@ class CSS:
     # 팝업창 영수증 정보 - 수정된 선택자 (금액과 날짜가 바뀌어 있었음)
     POPUP_AMOUNT = "div.stlm table tbody tr:first-child td"  # 금액 (실제로는 여기가 금액)
     POPUP_DATE = "div.jrny > ul > li"  # 날짜 (여정 정보에서 날짜 추출)
+    POPUP_CONTENT = "#wrap > div:nth-of-type(2) > div:nth-of-type(1)"  # 영수증 본문 (스크린샷 영역)
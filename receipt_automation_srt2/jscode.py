@@ -4,12 +4,102 @@ SRT 영수증 자동화에 필요한 JavaScript 코드
 """
 
 class JSCode:
-    # select 요소 값 설정 및 change 이벤트 발생
-    # {selector}: CSS 선택자
-    # {value}: 설정할 값
-    SELECT_VALUE_AND_TRIGGER_CHANGE = """
-    document.querySelector('{selector}').value = '{value}';
-    document.querySelector('{selector}').dispatchEvent(new Event('change', {{ bubbles: true }}));
+    # 조회 기간 select 여러 개를 순서대로 설정 (Promise - await_promise로 실행)
+    # {steps}: [[CSS 선택자, 값], ...] JSON 배열 (연 -> 월 -> 일 순서)
+    # {timeout_ms}: 전체 최대 대기 시간
+    # 월을 바꾸면 일 option이 다시 만들어지므로, 각 단계는 해당 option이 생길 때까지 페이지 안에서 기다립니다
+    # (MutationObserver - 변경 즉시 진행). 마지막에 DOM 변경이 {quiet_ms}ms 동안 없을 때까지 기다려
+    # 모든 값이 그대로인지 확인하고, 늦게 다시 만들어진 select부터는 한 번 더 설정합니다.
+    # 반환: JSON 문자열 {{ok, applied: {{선택자: 실제 값}}, failed: 실패한 선택자 또는 null, ms}}
+    SET_SELECT_VALUES = """
+    (async function() {{
+        var steps = {steps};
+        var started = Date.now();
+        var deadline = started + {timeout_ms};
+
+        function findOption(select, value) {{
+            if (!select) return null;
+            var options = Array.prototype.slice.call(select.options);
+            return options.find(function(o) {{ return o.value === value; }}) ||
+                   options.find(function(o) {{ return o.value !== '' && Number(o.value) === Number(value); }}) || null;
+        }}
+
+        // check()가 참이 될 때까지 DOM 변경마다 다시 확인 (시간 초과 시 null)
+        function waitFor(check) {{
+            var found = check();
+            if (found) return Promise.resolve(found);
+            return new Promise(function(resolve) {{
+                var timer = null;
+                var observer = new MutationObserver(function() {{
+                    var value = check();
+                    if (value) {{ observer.disconnect(); clearTimeout(timer); resolve(value); }}
+                }});
+                observer.observe(document.documentElement, {{childList: true, subtree: true, attributes: true}});
+                timer = setTimeout(function() {{ observer.disconnect(); resolve(check()); }},
+                                   Math.max(0, deadline - Date.now()));
+            }});
+        }}
+
+        // DOM 변경이 quietMs 동안 없을 때까지 대기 (change 핸들러의 비동기 option 재생성 대비)
+        function settle(quietMs) {{
+            return new Promise(function(resolve) {{
+                var timer = null;
+                function done() {{ observer.disconnect(); resolve(); }}
+                function restart() {{
+                    clearTimeout(timer);
+                    timer = setTimeout(done, Math.min(quietMs, Math.max(0, deadline - Date.now())));
+                }}
+                var observer = new MutationObserver(restart);
+                observer.observe(document.documentElement, {{childList: true, subtree: true, attributes: true}});
+                restart();
+            }});
+        }}
+
+        async function apply(selector, value) {{
+            var option = await waitFor(function() {{ return findOption(document.querySelector(selector), value); }});
+            if (!option) return false;
+            var select = document.querySelector(selector);
+            if (select.value !== option.value) {{
+                select.value = option.value;
+                select.dispatchEvent(new Event('change', {{ bubbles: true }}));
+            }}
+            return true;
+        }}
+
+        function applied() {{
+            var values = {{}};
+            steps.forEach(function(step) {{
+                var select = document.querySelector(step[0]);
+                values[step[0]] = select ? select.value : null;
+            }});
+            return values;
+        }}
+
+        function mismatch() {{
+            return steps.find(function(step) {{
+                var option = findOption(document.querySelector(step[0]), step[1]);
+                return !option || document.querySelector(step[0]).value !== option.value;
+            }});
+        }}
+
+        for (var i = 0; i < steps.length; i++) {{
+            if (!(await apply(steps[i][0], steps[i][1]))) {{
+                return JSON.stringify({{ok: false, applied: applied(), failed: steps[i][0], ms: Date.now() - started}});
+            }}
+        }}
+        // change 핸들러가 비동기로 option을 다시 만들면 값이 초기화될 수 있으므로 DOM이 잠잠해진 뒤 다시 확인
+        // (값이 바뀐 select 이후 단계는 그 select에 의존하므로 모두 다시 설정)
+        for (var attempt = 0; attempt < 3; attempt++) {{
+            await settle({quiet_ms});
+            var step = mismatch();
+            if (!step) break;
+            for (var k = steps.indexOf(step); k < steps.length; k++) {{
+                if (!(await apply(steps[k][0], steps[k][1]))) break;
+            }}
+        }}
+        var left = mismatch();
+        return JSON.stringify({{ok: !left, applied: applied(), failed: left ? left[0] : null, ms: Date.now() - started}});
+    }})()
     """
     
     # 인쇄 다이얼로그 차단 - 강화 버전
@@ -53,11 +143,78 @@ class JSCode:
     })();
     """
     
-    # 요소의 텍스트 내용 추출
-    # {selector}: CSS 선택자
-    GET_TEXT_CONTENT = """
+    # 결과 표의 모든 행을 한 번에 추출 (JSON 배열 문자열)
+    # {selector}: 결과 행(tr) CSS 선택자
+    # 셀 순서 - 0:체크박스, 1:날짜, 2:열차, 3:출발, 4:도착, ... 8:발권상태, 9:금액
+    SCAN_RESULT_ROWS = """
     (function() {{
-        var elem = document.querySelector('{selector}');
-        return elem ? elem.textContent.trim() : null;
+        var rows = document.querySelectorAll('{selector}');
+        return JSON.stringify(Array.prototype.map.call(rows, function(tr, i) {{
+            var cells = tr.querySelectorAll('td');
+            function text(k) {{ return cells[k] ? cells[k].innerText.trim() : ''; }}
+            var checkbox = cells[0] ? cells[0].querySelector('input[type=checkbox]') : null;
+            return {{row: i + 1, complete: cells.length >= 11, status: text(8), date: text(1), train: text(2),
+                     dep: text(3), arr: text(4), price: text(9), checked: !!(checkbox && checkbox.checked)}};
+        }}));
     }})()
     """
+    
+    # 선택자 목록을 순서대로 시도해 첫 번째로 찾은 요소의 텍스트 추출
+    # {selectors}: CSS 선택자 JSON 배열
+    # 반환: JSON 문자열 [선택자 순번, 텍스트] 또는 null
+    GET_FIRST_MATCH_TEXT = """
+    (function() {{
+        var selectors = {selectors};
+        for (var i = 0; i < selectors.length; i++) {{
+            var elem = document.querySelector(selectors[i]);
+            if (elem) return JSON.stringify([i, elem.textContent.trim()]);
+        }}
+        return null;
+    }})()
+    """
+    
+    # 선택자 목록을 순서대로 시도해 첫 번째로 찾은 (크기가 있는) 요소의 문서 기준 영역
+    # {selectors}: CSS 선택자 JSON 배열
+    # 스크롤 위치를 더하고 넘치는 내용(scrollWidth/Height)까지 포함하므로 창보다 긴 영수증도 잘리지 않음
+    # 반환: JSON 문자열 [선택자 순번, {{x, y, width, height}}] 또는 null
+    GET_FIRST_MATCH_RECT = """
+    (function() {{
+        var selectors = {selectors};
+        for (var i = 0; i < selectors.length; i++) {{
+            var elem = document.querySelector(selectors[i]);
+            if (!elem) continue;
+            var rect = elem.getBoundingClientRect();
+            var width = Math.max(rect.width, elem.scrollWidth);
+            var height = Math.max(rect.height, elem.scrollHeight);
+            if (width < 1 || height < 1) continue;
+            var x = Math.floor(rect.left + window.scrollX);
+            var y = Math.floor(rect.top + window.scrollY);
+            return JSON.stringify([i, {{x: x, y: y, width: Math.ceil(rect.left + window.scrollX + width) - x,
+                                         height: Math.ceil(rect.top + window.scrollY + height) - y}}]);
+        }}
+        return null;
+    }})()
+    """
+    
+    # 로그인한 페이지의 웹 스토리지 (headless 캡처 브라우저로 옮길 때 사용)
+    # 반환: JSON 문자열 {origin, local, session}
+    READ_STORAGE = """
+    JSON.stringify({origin: location.origin, local: Object.assign({}, localStorage),
+                    session: Object.assign({}, sessionStorage)})
+    """
+    
+    # 캡처 브라우저에서 페이지 스크립트보다 먼저 실행되어 웹 스토리지 복원
+    # {storage}: READ_STORAGE 결과 (사이트가 이미 설정한 키는 그대로 둠)
+    RESTORE_STORAGE = """
+    (function() {{
+        var saved = {storage};
+        if (location.origin !== saved.origin) return;
+        try {{
+            [[saved.local, window.localStorage], [saved.session, window.sessionStorage]].forEach(function(pair) {{
+                for (var key in pair[0]) {{
+                    if (pair[1].getItem(key) === null) pair[1].setItem(key, pair[0][key]);
+                }}
+            }});
+        }} catch (e) {{}}
+    }})();
+    """
@@ -4,11 +4,12 @@ import os
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QDateEdit, QPushButton,
-    QMessageBox, QFileDialog, QLineEdit
+    QMessageBox, QFileDialog, QLineEdit, QPlainTextEdit
 )
-from PyQt6.QtCore import QDate, pyqtSignal, QObject, Qt
+from PyQt6.QtCore import QDate, pyqtSignal, QObject, Qt, QTimer
 from PyQt6.QtGui import QFont
 from config import Config
+from log import recent as recent_logs
 
 
 class WorkerSignals(QObject):
@@ -22,11 +23,17 @@ class SRTLauncher(QWidget):
         super().__init__()
         self.signals = WorkerSignals()
         self.signals.finished_signal.connect(self.on_finished)
+        self.log_seq = 0  # 마지막으로 화면에 표시한 로그 번호
         self.initUI()
 
+        # 로그는 작업 스레드가 링 버퍼에 쌓고, UI는 타이머로 새 줄만 가져감 (asyncio 루프를 기다리지 않음)
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.poll_logs)
+        self.log_timer.start(200)
+
     def initUI(self):
         self.setWindowTitle("SRT 영수증 자동화")
-        self.setGeometry(300, 300, 560, 340)
+        self.setGeometry(300, 300, 560, 560)
         self.setStyleSheet("background-color: #ffffff;")
 
         layout = QVBoxLayout()
@@ -176,6 +183,22 @@ class SRTLauncher(QWidget):
         self.start_btn.clicked.connect(self.start_automation)
         layout.addWidget(self.start_btn)
 
+        # ── 진행 로그 ──
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(Config.LOG_RING_SIZE)
+        self.log_view.setFont(QFont("맑은 고딕", 9))
+        self.log_view.setStyleSheet("""
+            QPlainTextEdit {
+                padding: 6px;
+                border: 1px solid #ddd;
+                border-radius: 6px;
+                background-color: #fafafa;
+                color: #333;
+            }
+        """)
+        layout.addWidget(self.log_view, 1)
+
         self.setLayout(layout)
 
     # ── 설정 저장/로드 ──
@@ -203,8 +226,16 @@ class SRTLauncher(QWidget):
             self.path_input.setText(folder)
             self.save_settings()
 
+    # ── 진행 로그 ──
+    def poll_logs(self):
+        entries = recent_logs(self.log_seq)
+        if entries:
+            self.log_seq = entries[-1][0]
+            self.log_view.appendPlainText("\n".join(line for _, _, line in entries))
+
     # ── 작업 완료 ──
     def on_finished(self):
+        self.poll_logs()
         self.start_btn.setEnabled(True)
         self.start_btn.setText("영수증 자동 저장")
         QMessageBox.information(self, "완료", "작업이 종료되었습니다.")
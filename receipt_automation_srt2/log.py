@@ -1,12 +1,126 @@
+"""
+로그 출력: [시간] [파일명] [함수명] 메시지
+- 호출 위치는 sys._getframe으로 바로 위 프레임만 읽습니다
+  (inspect.stack()은 스택 전체의 프레임 정보와 소스 줄을 만들어 호출마다 수 ms가 걸림)
+- 레벨(DEBUG/INFO/WARNING/ERROR)보다 낮은 로그는 호출 즉시 버립니다
+- 문자열 조립과 출력은 백그라운드 스레드가 큐에서 꺼내 처리하므로 asyncio 루프가 출력을 기다리지 않습니다
+- 최근 로그는 고정 크기 링 버퍼에 남고, UI는 recent()로 마지막으로 읽은 번호 이후만 가져갑니다
+"""
+import atexit
+import collections
 import datetime
-import inspect
 import os
+import queue
+import sys
+import threading
+from config import Config
 
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
 
-def log(msg):
+
+class _LogWriter:
+    """로그 큐 + 출력 스레드 + 링 버퍼"""
+
+    def __init__(self, level, ring_size):
+        self.level = level
+        self._queue = queue.Queue()
+        self._ring = collections.deque(maxlen=ring_size)  # (번호, 레벨, 완성된 줄)
+        self._ring_lock = threading.Lock()
+        self._seq = 0
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def emit(self, level, msg, depth):
+        """depth: emit을 기준으로 호출한 코드까지의 프레임 수"""
+        if level < self.level:
+            return
+        code = sys._getframe(depth).f_code
+        self._queue.put((datetime.datetime.now(), level, code.co_filename, code.co_name, msg))
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _format(self, record):
+        when, level, filename, funcname, msg = record
+        tag = "" if level == INFO else f"[{LEVEL_NAMES.get(level, level)}] "
+        return f"[{when:%H:%M:%S}] [{os.path.basename(filename)}] [{funcname}] {tag}{msg}"
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                line = self._format(record)
+                with self._ring_lock:
+                    self._seq += 1
+                    self._ring.append((self._seq, record[1], line))
+                try:
+                    print(line)
+                except (OSError, ValueError):
+                    pass  # 콘솔이 없는 실행 (pythonw) - 링 버퍼에는 남음
+            finally:
+                self._queue.task_done()
+
+    def recent(self, after=0):
+        """번호가 after보다 큰 로그 [(번호, 레벨, 줄)] - 링 버퍼에서 밀려난 로그는 빠짐"""
+        with self._ring_lock:
+            if not self._ring or self._ring[-1][0] <= after:
+                return []
+            return [entry for entry in self._ring if entry[0] > after]
+
+    def flush(self):
+        """큐에 쌓인 로그를 모두 출력할 때까지 대기"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=2)
+
+
+_LEVELS_BY_NAME = {name: level for level, name in LEVEL_NAMES.items()}
+_writer = _LogWriter(_LEVELS_BY_NAME.get(Config.LOG_LEVEL.upper(), INFO), Config.LOG_RING_SIZE)
+# 종료 직전 로그가 출력 스레드와 함께 사라지지 않도록 남은 큐를 비움
+atexit.register(_writer.stop)
+
+
+def log(msg, level=INFO):
     """로그 출력: [시간] [파일명] [함수명] 메시지"""
-    now = datetime.datetime.now().strftime("%H:%M:%S")
-    frame = inspect.stack()[1]
-    filename = os.path.basename(frame.filename)
-    funcname = frame.function
-    print(f"[{now}] [{filename}] [{funcname}] {msg}")
+    _writer.emit(level, msg, 2)
+
+
+def debug(msg):
+    _writer.emit(DEBUG, msg, 2)
+
+
+def warning(msg):
+    _writer.emit(WARNING, msg, 2)
+
+
+def error(msg):
+    _writer.emit(ERROR, msg, 2)
+
+
+def set_level(level):
+    """이 레벨보다 낮은 로그는 버림"""
+    _writer.level = level
+
+
+def recent(after=0):
+    """UI 표시용 최근 로그 (마지막으로 받은 번호를 after로 넘기면 그 이후만 반환)"""
+    return _writer.recent(after)
+
+
+def flush():
+    _writer.flush()
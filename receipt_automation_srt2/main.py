@@ -10,7 +10,7 @@ import traceback
 from PyQt6.QtWidgets import QApplication
 from launcher import SRTLauncher
 from srt_manager import SRTManager
-from log import log
+from log import log, error
 
 
 def run_automation(start_date, end_date, save_path, signals):
@@ -50,7 +50,7 @@ def run_automation(start_date, end_date, save_path, signals):
                 if manager:
                     await manager.close()
         except Exception as e:
-            log(traceback.format_exc())
+            error(traceback.format_exc())
             # 에러 발생 시 브라우저 닫기
             if manager:
                 await manager.close()
@@ -63,7 +63,7 @@ def run_automation(start_date, end_date, save_path, signals):
     try:
         loop.run_until_complete(_run())
     except Exception:
-        print(traceback.format_exc())
+        error(traceback.format_exc())
     finally:
         # 남은 태스크 정리
         try:
@@ -0,0 +1,158 @@
+"""
+선택자 레지스트리
+논리 대상(버튼, 팝업 항목)마다 탐색 전략을 순서대로 등록해 두고 처음 성공한 전략의 요소를 사용합니다.
+- 전략 순서: CSS(기존 css.py 선택자) -> 보조 CSS -> XPath -> 텍스트
+- 찾은 요소는 탭별로 캐시하고, 문서에서 분리되면(isConnected == false) 다시 찾습니다.
+- 대상별로 어떤 전략이 맞았는지, 찾는 데 걸린 시간을 기록합니다.
+"""
+import asyncio
+import json
+import time
+from css import CSS
+from jscode import JSCode
+from log import log
+
+
+# 논리 대상 -> (전략 종류, 값) 목록. 첫 번째가 기존 선택자입니다.
+SELECTORS = {
+    "SEARCH_BUTTON": [
+        ("css", CSS.SEARCH_BUTTON),
+        ("css", "#search-form button.btn_blue"),
+        ("xpath", "//form[@id='search-form']//button[contains(normalize-space(.), '조회')]"),
+        ("text", "조회하기"),
+    ],
+    "PRINT_BUTTON": [
+        ("css", CSS.PRINT_BUTTON),
+        ("css", "div.sub_con_area div.tal_c > button.btn_emerald"),
+        ("xpath", "//button[contains(normalize-space(.), '영수증') and contains(normalize-space(.), '인쇄')]"),
+        ("text", "영수증 인쇄"),
+    ],
+    # 팝업 텍스트 대상은 CSS 전략만 사용 (한 번의 evaluate로 순서대로 시도)
+    "POPUP_AMOUNT": [
+        ("css", CSS.POPUP_AMOUNT),
+        ("css", "div.stlm td"),
+    ],
+    "POPUP_DATE": [
+        ("css", CSS.POPUP_DATE),
+        ("css", "div.jrny li"),
+    ],
+    # 스크린샷 영역: 영수증 본문을 못 찾으면 페이지 전체 내용으로
+    "POPUP_CONTENT": [
+        ("css", CSS.POPUP_CONTENT),
+        ("css", "#wrap"),
+        ("css", "body"),
+    ],
+}
+
+
+class SelectorRegistry:
+    def __init__(self, selectors=SELECTORS):
+        self.selectors = selectors
+        self._cache = {}  # (탭 id, 대상 이름) -> Element
+        self.stats = {}   # 대상 이름 -> {"hits": {전략: 횟수}, "cached", "misses", "ms"}
+
+    def _entry(self, name):
+        return self.stats.setdefault(name, {"hits": {}, "cached": 0, "misses": 0, "ms": 0.0})
+
+    def _record(self, name, label, started):
+        """전략 적중/실패와 소요 시간 기록 (label이 None이면 실패)"""
+        entry = self._entry(name)
+        entry["ms"] += (time.perf_counter() - started) * 1000
+        if label is None:
+            entry["misses"] += 1
+            return
+        if label not in entry["hits"] and not label.startswith("0:"):
+            log(f"선택자 대체 전략 사용: {name} -> {label}")
+        entry["hits"][label] = entry["hits"].get(label, 0) + 1
+
+    def invalidate(self, tab=None):
+        """캐시 비우기 (tab 지정 시 해당 탭만)"""
+        if tab is None:
+            self._cache.clear()
+        else:
+            for key in [k for k in self._cache if k[0] == id(tab)]:
+                del self._cache[key]
+
+    async def _probe(self, tab, name):
+        for index, (kind, value) in enumerate(self.selectors[name]):
+            try:
+                if kind == "css":
+                    element = await tab.query_selector(value)
+                elif kind == "xpath":
+                    found = await tab.xpath(value, timeout=0)
+                    element = found[0] if found else None
+                else:
+                    element = await tab.find_element_by_text(value, best_match=True)
+            except Exception:
+                element = None
+            if element:
+                return element, f"{index}:{kind}"
+        return None, None
+
+    async def find(self, tab, name, timeout=0):
+        """
+        대상 요소 찾기
+
+        Args:
+            tab: nodriver 탭
+            name: SELECTORS의 대상 이름
+            timeout: 모든 전략이 실패할 때 다시 시도할 최대 시간 (초)
+
+        Returns:
+            Element 또는 None
+        """
+        key = (id(tab), name)
+        cached = self._cache.get(key)
+        if cached is not None:
+            try:
+                if await cached.apply("(el) => el.isConnected"):
+                    self._entry(name)["cached"] += 1
+                    return cached
+            except Exception:
+                pass
+            del self._cache[key]
+
+        started = time.perf_counter()
+        deadline = started + timeout
+        while True:
+            element, label = await self._probe(tab, name)
+            if element is not None or time.perf_counter() >= deadline:
+                break
+            await asyncio.sleep(0.1)
+
+        self._record(name, label, started)
+        if element is not None:
+            self._cache[key] = element
+        return element
+
+    async def get_text(self, tab, name):
+        """CSS 전략을 순서대로 시도해 첫 번째로 찾은 요소의 텍스트 반환 (evaluate 한 번)"""
+        selectors = [value for kind, value in self.selectors[name] if kind == "css"]
+        started = time.perf_counter()
+        result = await tab.evaluate(JSCode.GET_FIRST_MATCH_TEXT.format(selectors=json.dumps(selectors)))
+        try:
+            index, text = json.loads(result) if result else (None, None)
+        except (TypeError, ValueError):
+            index, text = None, None
+        self._record(name, None if index is None else f"{index}:css", started)
+        return text
+
+    async def get_rect(self, tab, name):
+        """CSS 전략을 순서대로 시도해 첫 번째로 찾은 요소의 문서 기준 영역 {x, y, width, height} 반환 (evaluate 한 번)"""
+        selectors = [value for kind, value in self.selectors[name] if kind == "css"]
+        started = time.perf_counter()
+        result = await tab.evaluate(JSCode.GET_FIRST_MATCH_RECT.format(selectors=json.dumps(selectors)))
+        try:
+            index, rect = json.loads(result) if result else (None, None)
+        except (TypeError, ValueError):
+            index, rect = None, None
+        self._record(name, None if index is None else f"{index}:css", started)
+        return rect
+
+    def summary(self):
+        """대상별 한 줄 요약: 전략별 적중 횟수, 캐시 적중, 실패, 누적 시간"""
+        lines = []
+        for name, st in sorted(self.stats.items()):
+            hits = ", ".join(f"{label}={n}" for label, n in sorted(st["hits"].items())) or "-"
+            lines.append(f"{name}: {hits} cached={st['cached']} misses={st['misses']} {st['ms']:.0f}ms")
+        return lines
@@ -1,44 +1,62 @@
-import asyncio
+import base64
+import datetime
+import json
 import os
 import re
 import nodriver as uc
 from config import Config
-from log import log
+from log import log, warning
 from css import CSS
 from jscode import JSCode
+import common_path  # 저장소 루트를 경로에 추가 (receipt_common)
+from receipt_common.receipt_ledger import ReceiptLedger
+from receipt_common.pdf_merge import merge_pdfs, merged_pdf_path
+from selector_registry import SelectorRegistry
+from receipt_common.run_trace import RunTrace
+from receipt_common.wait_log import WaitLog
+from waits import (wait_until, js_true, element_present, mark_document,
+                   document_replaced, tab_closed, PopupWatcher, wait_page_rendered)
 
 
 class SRTManager:
     def __init__(self):
         self.browser = None
+        # 이전 실행에서 저장한 영수증은 인쇄 팝업을 열기 전에 건너뜀
+        self.ledger = ReceiptLedger() if Config.USE_LEDGER else None
+        self.search_year = None  # 조회 시작 연도(yy) - 영수증 식별 키에 사용
+        self.selectors = SelectorRegistry()  # 대체 전략 + 요소 캐시
+        self.waits = WaitLog()  # 조건 대기별 실제 소요 시간
+        self.trace = RunTrace("srt2")  # 단계별 소요 시간 (Config.TRACE이면 통계 출력 시 파일로 저장)
 
     async def start_browser(self):
         """브라우저 시작 - user_data_dir로 프로필 유지 (회원 아이디 저장 지원)"""
         if not self.browser:
-            self.browser = await uc.start(
-                user_data_dir=Config.PROFILE_DIR,
-                headless=False
-            )
+            with self.trace.span("browser_start"):
+                self.browser = await uc.start(
+                    user_data_dir=Config.PROFILE_DIR,
+                    headless=False
+                )
         return self.browser
 
     async def close(self):
         """브라우저 종료"""
+        self._log_stats()
         if self.browser:
             try:
                 self.browser.stop()
             except Exception:
                 pass
             self.browser = None
+        if self.ledger:
+            self.ledger.close()
+            self.ledger = None
 
     async def wait_for_login(self):
         """SRT 로그인 페이지로 이동하고 사용자가 로그인할 때까지 대기"""
         await self.start_browser()
 
         # 탭이 준비될 때까지 대기
-        for _ in range(100):
-            if self.browser.tabs:
-                break
-            await asyncio.sleep(0.1)
+        await wait_until(lambda: self.browser.tabs, Config.WAIT_TIMEOUT, "browser_tab", self.waits)
 
         if not self.browser.tabs:
             log("브라우저 탭을 찾을 수 없습니다.")
@@ -50,34 +68,99 @@ class SRTManager:
 
         log("사용자 로그인 대기 중... (브라우저에서 직접 로그인해주세요)")
 
-        # 로그인 완료 대기 - URL 변경 감지
-        while True:
+        # 로그인 완료 대기 - URL 변경 감지 (직접 로그인하므로 마감 시간 없음)
+        async def login_state():
             try:
                 # 브라우저/탭 연결 상태 확인
                 if not self.browser or not self.browser.tabs:
-                    log("브라우저가 닫혔습니다.")
-                    return False
-
-                tab = self.browser.tabs[0]
+                    return "closed"
 
                 # URL 확인: main.do로 변경되면 로그인 성공
+                tab = self.browser.tabs[0]
                 current_url = tab.target.url if tab.target else ""
                 if current_url and "main.do" in current_url:
-                    log(f"로그인 성공 확인 (URL: {current_url})")
-                    
-                    # 영수증 페이지로 자동 이동
-                    log(f"영수증 페이지로 이동 중: {Config.URL_RECEIPT_LIST}")
-                    await tab.get(Config.URL_RECEIPT_LIST)
-                    await asyncio.sleep(2)  # 페이지 로딩 대기
-                    
-                    log("영수증 페이지 이동 완료")
-                    return True
+                    return current_url
 
             except BaseException as e:
-                # CancelledError 등 모든 예외를 잡아서 루프 유지
+                # CancelledError 등 모든 예외를 잡아서 대기 유지
                 log(f"대기 중 예외 (무시): {type(e).__name__}")
+            return None
 
-            await asyncio.sleep(2)
+        with self.trace.span("login"):
+            current_url = await wait_until(login_state, None, "login", self.waits, max_interval=2)
+        if current_url == "closed":
+            log("브라우저가 닫혔습니다.")
+            return False
+
+        log(f"로그인 성공 확인 (URL: {current_url})")
+
+        # headless 브라우저로 옮기면 영수증 페이지가 이미 열려 있음 (실패하면 보이는 창에서 계속)
+        if Config.HEADLESS_CAPTURE and await self._handoff_to_headless():
+            log("영수증 페이지 이동 완료 (headless 브라우저)")
+            return True
+        
+        # 영수증 페이지로 자동 이동 (조회 버튼이 나타나면 로딩 완료로 판단)
+        tab = self.browser.tabs[0]
+        log(f"영수증 페이지로 이동 중: {Config.URL_RECEIPT_LIST}")
+        with self.trace.span("receipt_page"):
+            await tab.get(Config.URL_RECEIPT_LIST)
+            await wait_until(element_present(tab, CSS.SEARCH_BUTTON), Config.WAIT_TIMEOUT, "receipt_page", self.waits)
+        
+        log("영수증 페이지 이동 완료")
+        return True
+
+    async def _handoff_to_headless(self):
+        """
+        로그인 세션을 보이는 브라우저에서 headless 브라우저로 옮기기
+        모든 쿠키는 첫 요청 전에 CDP로 설정하고, 웹 스토리지는 페이지 스크립트보다 먼저 실행되는 스크립트로 복원합니다.
+        headless 브라우저에서 영수증 페이지(조회 버튼)가 열린 뒤에만 보이는 창을 닫습니다.
+        
+        Returns:
+            True: 영수증 페이지가 열린 headless 브라우저로 전환됨
+            False: 전환 실패 (보이는 브라우저로 계속 진행)
+        """
+        worker = None
+        try:
+            with self.trace.span("handoff") as span:
+                tab = self.browser.tabs[0]
+                cookies = await self.browser.cookies.get_all()
+                storage = await tab.evaluate(JSCode.READ_STORAGE)
+                user_agent = await tab.evaluate("navigator.userAgent")
+                span["cookies"] = len(cookies)
+
+                width, height = Config.CAPTURE_WINDOW_SIZE
+                worker = await uc.start(
+                    user_data_dir=Config.CAPTURE_PROFILE_DIR,
+                    headless=True,
+                    browser_args=[f"--window-size={width},{height}", f"--user-agent={user_agent}"]
+                )
+                await wait_until(lambda: worker.tabs, Config.WAIT_TIMEOUT, "browser_tab", self.waits)
+                worker_tab = worker.tabs[0]
+                await worker_tab.send(uc.cdp.network.set_cookies([
+                    uc.cdp.network.CookieParam(
+                        name=c.name, value=c.value, domain=c.domain, path=c.path,
+                        secure=c.secure, http_only=c.http_only, same_site=c.same_site,
+                        expires=None if c.session else uc.cdp.network.TimeSinceEpoch(c.expires),
+                    )
+                    for c in cookies
+                ]))
+                await worker_tab.send(uc.cdp.page.add_script_to_evaluate_on_new_document(
+                    source=JSCode.RESTORE_STORAGE.format(storage=storage)))
+
+                await worker_tab.get(Config.URL_RECEIPT_LIST)
+                if not await wait_until(element_present(worker_tab, CSS.SEARCH_BUTTON), Config.WAIT_TIMEOUT,
+                                        "handoff", self.waits):
+                    raise Exception("로그인 상태가 옮겨지지 않았습니다")
+        except Exception as e:
+            warning(f"headless 브라우저 전환 실패 (현재 창에서 계속): {e}")
+            if worker:
+                worker.stop()
+            return False
+
+        self.browser.stop()
+        self.browser = worker
+        log("로그인 세션을 headless 브라우저로 옮겼습니다. 이후 작업은 화면 밖에서 진행됩니다.")
+        return True
 
     async def set_date_range(self, start_date, end_date):
         """
@@ -102,37 +185,34 @@ class SRTManager:
         end_month = end_date[4:6]
         end_day = end_date[6:8]
         
+        self.search_year = start_year[2:]
+        
         log(f"날짜 설정: {start_year}-{start_month}-{start_day} ~ {end_year}-{end_month}-{end_day}")
         
+        # 여섯 개 select를 한 번의 evaluate로 설정 (연 -> 월 -> 일, 일 option은 페이지 안에서 생길 때까지 대기)
+        steps = [
+            [CSS.DATE_START_YEAR, start_year], [CSS.DATE_START_MONTH, start_month], [CSS.DATE_START_DAY, start_day],
+            [CSS.DATE_END_YEAR, end_year], [CSS.DATE_END_MONTH, end_month], [CSS.DATE_END_DAY, end_day],
+        ]
         try:
-            # select 요소 값 설정 (JavaScript 필요 - change 이벤트 발생 때문)
-            await self._select_option_by_css(tab, CSS.DATE_START_YEAR, start_year)
-            await asyncio.sleep(0.3)
-            await self._select_option_by_css(tab, CSS.DATE_START_MONTH, start_month)
-            await asyncio.sleep(0.3)
-            await self._select_option_by_css(tab, CSS.DATE_START_DAY, start_day)
-            await asyncio.sleep(0.3)
-            
-            await self._select_option_by_css(tab, CSS.DATE_END_YEAR, end_year)
-            await asyncio.sleep(0.3)
-            await self._select_option_by_css(tab, CSS.DATE_END_MONTH, end_month)
-            await asyncio.sleep(0.3)
-            await self._select_option_by_css(tab, CSS.DATE_END_DAY, end_day)
-            
-            log("날짜 설정 완료")
-            return True
-            
+            with self.trace.span("date_range"):
+                result_json = await tab.evaluate(
+                    JSCode.SET_SELECT_VALUES.format(steps=json.dumps(steps), timeout_ms=int(Config.WAIT_TIMEOUT * 1000),
+                                                    quiet_ms=50),
+                    await_promise=True
+                )
+            result = json.loads(result_json)
         except Exception as e:
-            log(f"날짜 설정 중 오류 발생: {e}")
+            warning(f"날짜 설정 중 오류 발생: {e}")
             return False
-
-    async def _select_option_by_css(self, tab, selector, value):
-        """select 요소의 option 선택 (JSCode 사용)"""
-        js_code = JSCode.SELECT_VALUE_AND_TRIGGER_CHANGE.format(
-            selector=selector,
-            value=value
-        )
-        await tab.evaluate(js_code)
+        
+        self.waits.record("date_range", result["ms"] / 1000, result["ok"])
+        applied = [result["applied"].get(selector) for selector, _ in steps]
+        if not result["ok"]:
+            warning(f"날짜 설정 실패: {result['failed']} (적용된 값: {applied})")
+            return False
+        log("날짜 설정 완료: {}-{}-{} ~ {}-{}-{}".format(*applied))
+        return True
 
     async def click_search_button(self):
         """조회하기 버튼 클릭 - Python API 사용"""
@@ -146,18 +226,21 @@ class SRTManager:
             log("조회하기 버튼 클릭 중...")
             
             # Python API로 요소 찾아서 클릭
-            button = await tab.select(CSS.SEARCH_BUTTON)
+            button = await self.selectors.find(tab, "SEARCH_BUTTON", timeout=Config.WAIT_TIMEOUT)
             if button:
-                await button.click()
-                log("조회하기 버튼 클릭 완료")
-                await asyncio.sleep(2)
+                with self.trace.span("search"):
+                    await mark_document(tab)
+                    await button.click()
+                    log("조회하기 버튼 클릭 완료")
+                    # 조회는 폼 전송(페이지 새로고침) - 기존 2초 대기는 최대 시간으로만 사용
+                    await wait_until(document_replaced(tab), 2, "search", self.waits)
                 return True
             else:
                 log("조회하기 버튼을 찾을 수 없습니다.")
                 return False
                 
         except Exception as e:
-            log(f"조회하기 버튼 클릭 중 오류 발생: {e}")
+            warning(f"조회하기 버튼 클릭 중 오류 발생: {e}")
             return False
 
     async def capture_receipts(self, save_dir):
@@ -170,86 +253,124 @@ class SRTManager:
         
         # 메인 탭에 인쇄 다이얼로그 차단 스크립트 주입
         await self._block_print_dialog(main_tab)
+        # 인쇄 클릭마다 그 클릭으로 열린 팝업(opener가 메인 탭인 새 page 타깃)을 CDP 이벤트로 받음
+        popup_watcher = PopupWatcher(self.browser, main_tab)
         
         try:
-            # 전체 결과 행 개수 확인 - Python API
-            rows = await main_tab.select_all(CSS.RESULT_ROWS)
-            row_count = len(rows)
-            log(f"총 {row_count}개의 결과 발견")
+            # 모든 행의 발권상태/날짜/구간/금액/체크박스를 한 번의 evaluate로 읽음 (행마다 왕복하지 않음)
+            scanned = await self._scan_rows(main_tab)
+            rows = scanned
+            log(f"총 {len(rows)}개의 결과 발견")
+            
+            # 클릭하기 전에 처리 계획 확정: 발권완료 행 중 ledger에 없는 행만 캡처
+            to_capture = []
+            skipped = 0
+            for row in rows:
+                if "발권완료" not in row["status"]:
+                    log(f"행 {row['row']}: {row['status'] or None} - 건너뜀")
+                elif row["key"] and self.ledger and self.ledger.is_captured("srt", row["key"]):
+                    log(f"행 {row['row']}: 이미 저장된 영수증 - 건너뜀")
+                    skipped += 1
+                else:
+                    to_capture.append(row)
+            log(f"저장할 영수증 {len(to_capture)}건 (이미 저장됨 {skipped}건)")
+            
+            # 이전 실행에서 선택된 채로 남은 체크박스는 해제 (인쇄에 함께 포함되지 않도록)
+            for row in scanned:
+                if row["checked"]:
+                    checkbox = await main_tab.select(CSS.CHECKBOX_TEMPLATE.format(row=row["row"]))
+                    if checkbox:
+                        await checkbox.click()
             
             captured_count = 0
+            saved_pdfs = []  # 이번 실행에서 저장한 PDF (Config.MERGE_PDF이면 마지막에 합침)
             
-            # 각 행 처리
-            for row_num in range(1, row_count + 1):
-                # 발권상태 확인 - JavaScript로 텍스트 추출
-                status_selector = CSS.TICKET_STATUS_TEMPLATE.format(row=row_num)
-                status_js = JSCode.GET_TEXT_CONTENT.format(selector=status_selector)
-                try:
-                    status = await main_tab.evaluate(status_js)
-                except Exception as e:
-                    log(f"행 {row_num}: 발권상태 추출 실패 - {e}")
-                    status = None
-                
-                if status and "발권완료" in status:
-                    log(f"행 {row_num}: 발권완료 - 처리 시작")
+            # 발권완료 행만 처리
+            for row in to_capture:
+                row_num = row["row"]
+                receipt_key = row["key"]
+                log(f"행 {row_num}: 발권완료 - 처리 시작")
+                with self.trace.span("receipt", row=row_num):
                     
                     # 체크박스 선택 - Python API
                     checkbox_selector = CSS.CHECKBOX_TEMPLATE.format(row=row_num)
                     try:
-                        checkbox = await main_tab.select(checkbox_selector)
-                        if checkbox:
-                            await checkbox.click()
-                            await asyncio.sleep(0.5)
-                        else:
+                        with self.trace.span("select"):
+                            checkbox = await main_tab.select(checkbox_selector)
+                            if checkbox:
+                                await checkbox.click()
+                                await wait_until(js_true(main_tab, f"document.querySelector({json.dumps(checkbox_selector)}).checked"),
+                                                 0.5, "checkbox", self.waits)
+                        if not checkbox:
                             log(f"행 {row_num}: 체크박스를 찾을 수 없음")
                             continue
                     except Exception as e:
-                        log(f"행 {row_num}: 체크박스 클릭 실패 - {e}")
+                        warning(f"행 {row_num}: 체크박스 클릭 실패 - {e}")
                         continue
                     
                     # 영수증 인쇄 버튼 클릭하기 전에 인쇄 차단 스크립트 재주입
                     await self._block_print_dialog(main_tab)
                     
                     # 영수증 인쇄 버튼 클릭 - Python API
+                    popup_watcher.expect()
+                    print_span = self.trace.begin("print")
                     try:
-                        print_button = await main_tab.select(CSS.PRINT_BUTTON)
+                        print_button = await self.selectors.find(main_tab, "PRINT_BUTTON", timeout=Config.WAIT_TIMEOUT)
                         if print_button:
                             await print_button.click()
-                            await asyncio.sleep(2)  # 팝업 열릴 때까지 대기
                         else:
                             log(f"행 {row_num}: 인쇄 버튼을 찾을 수 없음")
+                            self.trace.end(print_span, error="not found")
                             continue
                     except Exception as e:
-                        log(f"행 {row_num}: 인쇄 버튼 클릭 실패 - {e}")
+                        warning(f"행 {row_num}: 인쇄 버튼 클릭 실패 - {e}")
+                        self.trace.end(print_span, error=str(e))
                         continue
-                    
-                    # 팝업 탭 찾기
-                    popup_tab = None
-                    for tab in self.browser.tabs:
-                        if tab != main_tab:
-                            popup_tab = tab
-                            break
+
+                    # 팝업 탭 찾기 (Target.targetCreated 이벤트가 오는 즉시)
+                    popup_tab = await popup_watcher.wait(Config.WAIT_TIMEOUT, "popup_open", self.waits)
+                    self.trace.end(print_span)
                     
                     if popup_tab:
                         log(f"행 {row_num}: 팝업창 발견")
                         
-                        # 팝업에도 즉시 인쇄 차단 주입
-                        await self._block_print_dialog(popup_tab)
-                        await asyncio.sleep(1)  # 팝업 완전히 로딩될 때까지 대기
-                        
-                        # 금액과 날짜 추출
-                        filename = await self._extract_filename_from_popup(popup_tab)
-                        
+                        with self.trace.span("popup_ready"):
+                            # 팝업은 아직 about:blank이거나 로딩 중이므로 앞으로 열릴 문서에 인쇄 차단 등록
+                            await self._block_print_dialog(popup_tab, new_documents=True)
+                            # 팝업 완전히 로딩될 때까지 대기 (load 이벤트 + 웹 폰트)
+                            await wait_page_rendered(popup_tab, Config.WAIT_TIMEOUT, "popup_render", self.waits)
+                            # 등록 전에 이미 시작된 문서도 막도록 로딩 후 한 번 더 주입
+                            await self._block_print_dialog(popup_tab)
+
+                            # 금액과 날짜 추출
+                            filename = await self._extract_filename_from_popup(popup_tab)
+
                         if filename:
-                            # 스크린샷 저장
-                            filepath = os.path.join(save_dir, f"{filename}.png")
-                            await popup_tab.save_screenshot(filepath)
-                            log(f"행 {row_num}: 저장 완료 - {filename}.png")
+                            # 스크린샷 또는 PDF 저장 (렌더링 + 인코딩 + 파일 쓰기)
+                            filepath = os.path.join(save_dir, f"{filename}.{Config.OUTPUT_FORMAT}")
+                            with self.trace.span("capture"):
+                                if Config.OUTPUT_FORMAT == "pdf":
+                                    await self._save_pdf(popup_tab, filepath)
+                                    saved_pdfs.append(filepath)
+                                else:
+                                    await self._save_screenshot(popup_tab, filepath)
+                            log(f"행 {row_num}: 저장 완료 - {os.path.basename(filepath)}")
                             captured_count += 1
+                            
+                            if receipt_key and self.ledger:
+                                self.ledger.record(
+                                    "srt", receipt_key,
+                                    travel_date=row["date"],
+                                    route=f"{' '.join(row['dep'].split())}-{' '.join(row['arr'].split())}",
+                                    price=row["price"].replace(",", ""),
+                                    file_path=filepath,
+                                )
                         
                         # 팝업 닫기
-                        await popup_tab.close()
-                        await asyncio.sleep(0.5)
+                        with self.trace.span("popup_close"):
+                            self.selectors.invalidate(popup_tab)
+                            await popup_tab.close()
+                            await wait_until(tab_closed(self.browser, popup_tab), 0.5, "popup_close", self.waits)
                     else:
                         log(f"행 {row_num}: 팝업창을 찾을 수 없음")
                     
@@ -260,32 +381,114 @@ class SRTManager:
                             await checkbox.click()
                     except:
                         pass
-                    
-                else:
-                    log(f"행 {row_num}: {status} - 건너뜀")
             
             log(f"영수증 캡처 완료: 총 {captured_count}건")
+            if Config.MERGE_PDF and saved_pdfs:
+                with self.trace.span("merge_pdf", files=len(saved_pdfs)):
+                    merge_pdfs(saved_pdfs, merged_pdf_path(save_dir, "srt"), log=log)
+            self._log_stats()
             
         except Exception as e:
-            log(f"영수증 캡처 중 오류 발생: {e}")
+            warning(f"영수증 캡처 중 오류 발생: {e}")
+        finally:
+            popup_watcher.close()
+
+    def _receipt_key(self, date, train, departure, arrival, price):
+        """영수증 식별 키 (같은 영수증은 실행마다 같은 키)"""
+        year_prefix = self.search_year or str(datetime.datetime.now().year)[2:]
+        parts = (year_prefix, date, train, departure, arrival, price.replace(",", ""))
+        return "|".join(" ".join(part.split()) for part in parts)
 
-    async def _block_print_dialog(self, tab):
-        """인쇄 다이얼로그 차단 (JSCode 사용)"""
+    async def _scan_rows(self, tab):
+        """
+        결과 표의 모든 행을 한 번의 evaluate로 읽기
+        
+        Returns:
+            [{"row"(1부터), "status", "date", "train", "dep", "arr", "price", "checked", "key"}]
+            셀이 11개 미만인 행은 key가 None (읽기 실패 시 빈 목록)
+        """
+        try:
+            rows_json = await tab.evaluate(JSCode.SCAN_RESULT_ROWS.format(selector=CSS.RESULT_ROWS))
+            rows = json.loads(rows_json) if rows_json else []
+        except Exception as e:
+            warning(f"결과 행 읽기 실패 - {e}")
+            return []
+        
+        for row in rows:
+            row["key"] = (self._receipt_key(row["date"], row["train"], row["dep"], row["arr"], row["price"])
+                          if row["complete"] else None)
+        return rows
+
+    def _log_stats(self):
+        """선택자/대기 통계 출력 및 실행 트레이스 저장 (출력 후 초기화)"""
+        if self.selectors.stats:
+            log("선택자 통계 (대상: 전략=횟수, 캐시 적중, 실패, 누적 시간):")
+            for line in self.selectors.summary():
+                log(f"  {line}")
+            self.selectors.stats = {}
+        if self.waits.records:
+            log("대기 통계:")
+            for line in self.waits.summary():
+                log(f"  {line}")
+            self.waits = WaitLog()
+        if Config.TRACE and self.trace.summary():
+            try:
+                path = self.trace.save()
+                log(f"실행 트레이스 저장: {path}")
+                for line in self.trace.summary():
+                    log(f"  {line}")
+            except OSError as e:
+                warning(f"트레이스 저장 실패: {e}")
+            self.trace = RunTrace("srt2")
+
+    async def _save_pdf(self, tab, filepath):
+        """팝업 탭을 CDP Page.printToPDF로 PDF 저장 (스크린샷 합성 없이 벡터 출력)"""
+        data, _ = await tab.send(uc.cdp.page.print_to_pdf(**Config.PDF_OPTIONS))
+        with open(filepath, "wb") as f:
+            f.write(base64.b64decode(data))
+
+    async def _save_screenshot(self, tab, filepath):
+        """
+        팝업의 영수증 본문 영역만 CDP Page.captureScreenshot으로 저장
+        clip + captureBeyondViewport로 창 밖으로 넘치는 부분까지 한 장에 담고, 창 테두리/여백은 제외합니다.
+        """
+        params = {"format_": Config.OUTPUT_FORMAT, "capture_beyond_viewport": True}
+        if Config.OUTPUT_FORMAT != "png":
+            params["quality"] = Config.SCREENSHOT_QUALITY
+        rect = await self.selectors.get_rect(tab, "POPUP_CONTENT")
+        if rect:
+            params["clip"] = uc.cdp.page.Viewport(x=rect["x"], y=rect["y"], width=rect["width"],
+                                                  height=rect["height"], scale=1)
+        else:
+            warning("영수증 영역을 찾을 수 없어 보이는 화면 전체를 저장합니다.")
+        data = await tab.send(uc.cdp.page.capture_screenshot(**params))
+        with open(filepath, "wb") as f:
+            f.write(base64.b64decode(data))
+
+    async def _block_print_dialog(self, tab, new_documents=False):
+        """
+        인쇄 다이얼로그 차단 (JSCode 사용)
+        
+        Args:
+            new_documents: True이면 현재 문서 대신 이 탭에 앞으로 로드될 문서마다 페이지 스크립트보다 먼저 실행
+                (Page.addScriptToEvaluateOnNewDocument)
+        """
         try:
-            await tab.evaluate(JSCode.BLOCK_PRINT_DIALOG)
+            if new_documents:
+                await tab.send(uc.cdp.page.add_script_to_evaluate_on_new_document(source=JSCode.BLOCK_PRINT_DIALOG))
+            else:
+                await tab.evaluate(JSCode.BLOCK_PRINT_DIALOG)
         except Exception as e:
-            log(f"인쇄 차단 스크립트 주입 실패: {e}")
+            warning(f"인쇄 차단 스크립트 주입 실패: {e}")
 
     async def _extract_filename_from_popup(self, popup_tab):
         """팝업창에서 금액과 날짜 추출 - JavaScript 사용"""
         try:
-            # 금액 추출 - JavaScript
-            amount_js = JSCode.GET_TEXT_CONTENT.format(selector=CSS.POPUP_AMOUNT)
-            amount_raw = await popup_tab.evaluate(amount_js)
+            # 금액 추출 - JavaScript (선택자 대체 전략 포함)
+            amount_raw = await self.selectors.get_text(popup_tab, "POPUP_AMOUNT")
             
-            # 날짜 추출 - JavaScript
-            date_js = JSCode.GET_TEXT_CONTENT.format(selector=CSS.POPUP_DATE)
-            date_raw = await popup_tab.evaluate(date_js)
+            # 날짜 추출 - JavaScript (선택자 대체 전략 포함)
+            date_raw = await self.selectors.get_text(popup_tab, "POPUP_DATE")
             
             if amount_raw and date_raw:
                 # 금액 정리
@@ -313,9 +516,9 @@ class SRTManager:
                 log(f"생성된 파일명: {filename}")
                 return filename
             else:
-                log(f"데이터 추출 실패 - amount: {amount_raw}, date: {date_raw}")
+                warning(f"데이터 추출 실패 - amount: {amount_raw}, date: {date_raw}")
             
         except Exception as e:
-            log(f"파일명 추출 중 오류: {e}")
+            warning(f"파일명 추출 중 오류: {e}")
         
         return None
@@ -0,0 +1,204 @@
+"""
+조건 대기 유틸리티
+고정 sleep 대신 조건이 만족되는 즉시 진행합니다.
+- 폴링 간격은 짧게 시작해서 점점 늘어납니다 (exponential backoff)
+- 각 대기에는 마감 시간(deadline)이 있고, 실제로 걸린 시간을 기록합니다
+"""
+import asyncio
+import inspect
+import json
+import time
+from nodriver import cdp
+
+
+async def wait_until(predicate, timeout, name="wait", log=None, interval=0.05, backoff=1.5, max_interval=0.5):
+    """
+    조건이 참이 될 때까지 대기
+
+    Args:
+        predicate: 인자 없는 함수 또는 코루틴 함수 (참 값을 반환하면 종료)
+        timeout: 최대 대기 시간 (초, None이면 무제한)
+        name: 기록용 대기 이름
+        log: WaitLog (None이면 기록하지 않음)
+        interval / backoff / max_interval: 폴링 간격 시작값, 증가 배수, 최대값
+
+    Returns:
+        마지막 predicate 결과 (시간 초과 시 거짓 값)
+    """
+    start = time.perf_counter()
+    deadline = None if timeout is None else start + timeout
+    result = None
+    while True:
+        try:
+            result = predicate()
+            if inspect.isawaitable(result):
+                result = await result
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 페이지 전환 중 평가 실패 등은 "아직 아님"으로 처리
+            result = None
+        if result:
+            break
+        now = time.perf_counter()
+        if deadline is not None and now >= deadline:
+            break
+        sleep_for = interval if deadline is None else min(interval, deadline - now)
+        await asyncio.sleep(max(sleep_for, 0))
+        interval = min(interval * backoff, max_interval)
+
+    if log is not None:
+        log.record(name, time.perf_counter() - start, bool(result))
+    return result
+
+
+# --- 조건 함수 (인자 없는 코루틴 함수 반환) ---
+
+def js_true(tab, expression):
+    """JavaScript 식이 참이면 True"""
+    async def check():
+        return bool(await tab.evaluate(expression))
+    return check
+
+
+def document_ready(tab):
+    return js_true(tab, "document.readyState === 'complete'")
+
+
+def fonts_ready(tab):
+    """웹 폰트 로딩 완료 (그 전에 찍은 스크린샷은 대체 글꼴로 렌더링됨)"""
+    return js_true(tab, "!document.fonts || document.fonts.status === 'loaded'")
+
+
+def element_present(tab, selector):
+    return js_true(tab, f"!!document.querySelector({json.dumps(selector)})")
+
+
+async def mark_document(tab):
+    """현재 문서에 표시를 남김 (document_replaced와 함께 페이지 이동 감지에 사용)"""
+    await tab.evaluate("window.__waitMarker = true")
+
+
+def document_replaced(tab):
+    """표시한 문서가 새 문서로 바뀌고 로딩이 끝났으면 True"""
+    return js_true(tab, "!window.__waitMarker && document.readyState === 'complete'")
+
+
+def tab_closed(browser, tab):
+    """탭이 브라우저 탭 목록에서 사라지면 True"""
+    target_id = tab.target.target_id
+
+    async def check():
+        await browser.update_targets()
+        return all(t.target.target_id != target_id for t in browser.tabs)
+    return check
+
+
+# --- CDP 이벤트 대기 (폴링 없이 이벤트가 오는 즉시 진행) ---
+
+def _remove_handler(connection, event_type, handler):
+    try:
+        connection.handlers[event_type].remove(handler)
+    except (KeyError, ValueError):
+        pass
+
+
+class PopupWatcher:
+    """
+    opener_tab이 연 팝업을 Target.targetCreated 이벤트로 받음
+    클릭 전에 expect(), 클릭 후 wait()를 호출하면 그 클릭이 연 탭만 돌려줍니다.
+    (openerId가 opener_tab인 page 타깃만 받으므로 다른 탭이 열려 있어도 섞이지 않음)
+    """
+
+    def __init__(self, browser, opener_tab):
+        self.browser = browser
+        self.opener_id = opener_tab.target.target_id
+        self._future = None
+        browser.connection.add_handler(cdp.target.TargetCreated, self._on_target_created)
+
+    def _on_target_created(self, event):
+        info = event.target_info
+        if info.type_ == "page" and info.opener_id == self.opener_id and self._future and not self._future.done():
+            self._future.set_result(info.target_id)
+
+    def expect(self):
+        """다음에 열릴 팝업 대기 시작 (클릭 직전에 호출)"""
+        self._future = asyncio.get_running_loop().create_future()
+
+    async def wait(self, timeout, name="popup_open", log=None):
+        """expect() 이후 열린 팝업 탭 (시간 초과 시 None)"""
+        start = time.perf_counter()
+        tab = None
+        try:
+            target_id = await asyncio.wait_for(self._future, timeout)
+            # nodriver가 같은 이벤트로 탭 객체를 만들므로 보통 바로 찾음
+            tab = next((t for t in self.browser.tabs if t.target.target_id == target_id), None)
+            if tab is None:
+                await self.browser.update_targets()
+                tab = next((t for t in self.browser.tabs if t.target.target_id == target_id), None)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._future = None
+        if log is not None:
+            log.record(name, time.perf_counter() - start, tab is not None)
+        return tab
+
+    def close(self):
+        _remove_handler(self.browser.connection, cdp.target.TargetCreated, self._on_target_created)
+
+
+async def wait_page_rendered(tab, timeout, name="popup_render", log=None):
+    """
+    Page.loadEventFired / Page.lifecycleEvent(load)가 오면 바로 확인하고, 이어서 document.fonts.ready를 기다림
+    구독 전에 이미 로딩이 끝났을 수 있으므로 구독 직후 한 번 확인합니다 (about:blank 초기 문서는 제외).
+
+    Returns:
+        문서 + 웹 폰트 로딩이 끝났으면 True (시간 초과 시 False)
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    loaded = asyncio.Event()
+
+    def on_load(event):
+        loaded.set()
+
+    def on_lifecycle(event):
+        if event.name == "load":
+            loaded.set()
+
+    tab.add_handler(cdp.page.LoadEventFired, on_load)
+    tab.add_handler(cdp.page.LifecycleEvent, on_lifecycle)
+    ok = False
+    try:
+        await tab.send(cdp.page.enable())
+        await tab.send(cdp.page.set_lifecycle_events_enabled(enabled=True))
+        ready = False
+        while True:
+            loaded.clear()
+            try:
+                ready = bool(await tab.evaluate("document.readyState === 'complete' && location.href !== 'about:blank'"))
+            except Exception:
+                ready = False  # 문서 전환 중 - 다음 로드 이벤트에서 다시 확인
+            remaining = deadline - time.perf_counter()
+            if ready or remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(loaded.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        if ready:
+            # 폰트가 적용되기 전에 찍은 스크린샷은 대체 글꼴로 렌더링됨
+            ok = bool(await asyncio.wait_for(
+                tab.evaluate("document.fonts ? document.fonts.ready.then(function() { return true; }) : true",
+                             await_promise=True),
+                max(deadline - time.perf_counter(), 0.01),
+            ))
+    except asyncio.TimeoutError:
+        ok = False
+    finally:
+        _remove_handler(tab, cdp.page.LoadEventFired, on_load)
+        _remove_handler(tab, cdp.page.LifecycleEvent, on_lifecycle)
+    if log is not None:
+        log.record(name, time.perf_counter() - start, ok)
+    return ok
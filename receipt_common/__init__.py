@@ -0,0 +1,5 @@
+"""
+KTX / SRT / SRT v2 도구가 함께 쓰는 모듈
+각 도구 폴더의 common_path.py가 저장소 루트를 import 경로에 추가하므로, 도구를 자기 폴더에서 실행해도
+`from receipt_common.<모듈> import ...`로 같은 파일을 사용합니다 (수정은 이 폴더에서 한 번만).
+"""
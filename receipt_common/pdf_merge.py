@@ -0,0 +1,43 @@
+"""
+PDF 영수증 합치기
+실행 한 번에 저장한 영수증 PDF들을 하나의 PDF로 묶습니다 (pypdf 필요 - 선택 설치).
+"""
+import datetime
+import os
+
+
+def merged_pdf_path(save_dir, prefix):
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(save_dir, f"{prefix}_영수증모음_{stamp}.pdf")
+
+
+def merge_pdfs(paths, out_path, log=print):
+    """
+    paths의 PDF를 순서대로 이어 out_path에 저장
+
+    Returns:
+        저장한 경로 (pypdf가 없거나 실패하면 None - 개별 PDF는 그대로 남음)
+    """
+    if not paths:
+        return None
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        log("PDF 합치기를 건너뜁니다: pypdf가 설치되어 있지 않습니다 (pip install pypdf).")
+        return None
+
+    writer = PdfWriter()
+    try:
+        for path in paths:
+            writer.append(path)
+        tmp_path = out_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            writer.write(f)
+        os.replace(tmp_path, out_path)
+    except Exception as e:
+        log(f"PDF 합치기 실패: {e}")
+        return None
+    finally:
+        writer.close()
+    log(f"영수증 {len(paths)}건을 하나의 PDF로 저장: {out_path}")
+    return out_path
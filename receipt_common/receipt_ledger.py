@@ -0,0 +1,72 @@
+"""
+영수증 캡처 기록 (ledger)
+이미 저장한 영수증을 로컬 SQLite에 기록해 두고, 다음 실행에서 같은 영수증은 인쇄/캡처를 건너뜁니다.
+KTX / SRT / SRT v2 도구가 같은 파일을 공유하며, site 컬럼으로 구분합니다.
+"""
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+
+DEFAULT_LEDGER_PATH = os.path.join(os.path.expanduser("~"), ".receipt_automation", "receipt_ledger.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    site        TEXT NOT NULL,
+    receipt_key TEXT NOT NULL,
+    travel_date TEXT,
+    route       TEXT,
+    price       TEXT,
+    file_path   TEXT,
+    image_hash  TEXT,
+    captured_at TEXT,
+    PRIMARY KEY (site, receipt_key)
+)
+"""
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ReceiptLedger:
+    def __init__(self, db_path=DEFAULT_LEDGER_PATH):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+
+    def is_captured(self, site, receipt_key):
+        """기록이 있고 저장된 파일이 아직 존재하면 True"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_path FROM receipts WHERE site = ? AND receipt_key = ?",
+                (site, receipt_key),
+            ).fetchone()
+        return bool(row and row[0] and os.path.exists(row[0]))
+
+    def record(self, site, receipt_key, travel_date="", route="", price="", file_path="", image_hash=None):
+        """캡처 완료된 영수증 기록 (같은 키는 덮어씀)"""
+        if image_hash is None and file_path and os.path.exists(file_path):
+            image_hash = file_sha256(file_path)
+        captured_at = datetime.datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO receipts "
+                "(site, receipt_key, travel_date, route, price, file_path, image_hash, captured_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (site, receipt_key, travel_date, route, price, file_path, image_hash, captured_at),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,138 @@
+import datetime
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Traces of all tools go to one folder so runs can be compared side by side (RECEIPT_TRACE_DIR overrides)
+DEFAULT_TRACE_DIR = os.environ.get(
+    "RECEIPT_TRACE_DIR",
+    os.path.join(os.path.expanduser("~"), ".receipt_automation", "traces"),
+)
+
+
+def default_trace_path(backend):
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(DEFAULT_TRACE_DIR, f"trace_{backend}_{stamp}.json")
+
+
+class RunTrace:
+    """
+    Per-phase spans of one run with nanosecond timestamps.
+
+    save() writes Chrome trace format (.json, open in chrome://tracing or Perfetto)
+    or one JSON object per line (.jsonl) with raw start/end/duration in ns.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.started_at = datetime.datetime.now().isoformat(timespec="milliseconds")
+        self._origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._events = []   # (name, start_ns, end_ns, thread id, args); end_ns None = instant
+        self._open = {}     # token -> (name, start_ns, thread id, args)
+        self._next_token = 0
+
+    def _now(self):
+        return time.perf_counter_ns() - self._origin_ns
+
+    def _add(self, name, start_ns, end_ns, tid, args):
+        with self._lock:
+            self._events.append((name, start_ns, end_ns, tid, args))
+
+    @contextmanager
+    def span(self, name, **args):
+        """with trace.span("print", row=3): ... records the duration of the block."""
+        start = self._now()
+        try:
+            yield args  # the block may add result fields to args
+        finally:
+            self._add(name, start, self._now(), threading.get_ident(), args)
+
+    def begin(self, name, **args):
+        """Starts a span that ends in another call (state machines). Returns a token for end()."""
+        with self._lock:
+            self._next_token += 1
+            token = self._next_token
+            self._open[token] = (name, self._now(), threading.get_ident(), args)
+        return token
+
+    def end(self, token, **args):
+        with self._lock:
+            opened = self._open.pop(token, None)
+        if opened:
+            name, start, tid, begin_args = opened
+            self._add(name, start, self._now(), tid, {**begin_args, **args})
+
+    def instant(self, name, **args):
+        self._add(name, self._now(), None, threading.get_ident(), args)
+
+    def save(self, path=None):
+        """Writes the trace and returns its path (spans still open are closed at save time)."""
+        path = path or default_trace_path(self.backend)
+        with self._lock:
+            now = self._now()
+            events = list(self._events) + [
+                (name, start, now, tid, {**args, "unfinished": True})
+                for name, start, tid, args in self._open.values()
+            ]
+        events.sort(key=lambda e: e[1])
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if path.endswith(".jsonl"):
+            with open(path, "w", encoding="utf-8") as f:
+                for name, start, end, tid, args in events:
+                    record = {"backend": self.backend, "name": name, "start_ns": start, "tid": tid}
+                    if end is not None:
+                        record["end_ns"] = end
+                        record["dur_ns"] = end - start
+                    if args:
+                        record["args"] = args
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return path
+
+        pid = os.getpid()
+        trace_events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.backend}}]
+        for name, start, end, tid, args in events:
+            event = {"name": name, "cat": self.backend, "pid": pid, "tid": tid, "ts": start / 1000}
+            if end is None:
+                event.update(ph="i", s="t")
+            else:
+                event.update(ph="X", dur=(end - start) / 1000)
+            if args:
+                event["args"] = args
+            trace_events.append(event)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "traceEvents": trace_events,
+                "displayTimeUnit": "ns",
+                "otherData": {"backend": self.backend, "started_at": self.started_at},
+            }, f, ensure_ascii=False)
+        return path
+
+    def totals(self):
+        """{span name: {"count", "total_ms", "avg_ms"}}, slowest first (machine-readable summary)."""
+        totals = {}
+        with self._lock:
+            events = list(self._events)
+        for name, start, end, _, _ in events:
+            if end is None:
+                continue
+            total, count = totals.get(name, (0, 0))
+            totals[name] = (total + end - start, count + 1)
+        return {
+            name: {"count": count, "total_ms": round(total / 1e6, 1), "avg_ms": round(total / count / 1e6, 1)}
+            for name, (total, count) in sorted(totals.items(), key=lambda kv: -kv[1][0])
+        }
+
+    def summary(self):
+        """Total / count per span name, slowest first."""
+        return [
+            f"{name}: {t['count']}회, 합계 {t['total_ms'] / 1e3:.2f}s, 평균 {t['avg_ms']:.0f}ms"
+            for name, t in self.totals().items()
+        ]
@@ -0,0 +1,29 @@
+"""
+조건 대기 기록
+각 도구의 조건 대기(고정 sleep 대신 조건이 만족되는 즉시 진행)가 실제로 걸린 시간을 이름별로 모읍니다.
+"""
+
+
+class WaitLog:
+    """Records how long each named wait actually took (and whether it was satisfied)."""
+
+    def __init__(self):
+        self.records = []  # (name, seconds, ok)
+
+    def record(self, name, seconds, ok):
+        self.records.append((name, seconds, ok))
+
+    def summary(self):
+        """One line per wait name: count, timeouts, total / average / max seconds."""
+        grouped = {}
+        for name, seconds, ok in self.records:
+            grouped.setdefault(name, []).append((seconds, ok))
+        lines = []
+        for name, items in grouped.items():
+            times = [s for s, _ in items]
+            timeouts = sum(1 for _, ok in items if not ok)
+            lines.append(
+                f"{name}: {len(items)}회, 시간초과 {timeouts}회, "
+                f"합계 {sum(times):.2f}s, 평균 {sum(times) / len(times):.2f}s, 최대 {max(times):.2f}s"
+            )
+        return lines